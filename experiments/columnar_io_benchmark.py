@@ -0,0 +1,42 @@
+import tempfile
+import time
+from random import Random
+
+from sampo.schemas.columnar import dump_wg, load_wg
+from sampo.schemas.graph import WorkGraph
+from experiments.wg_reinit_benchmark import synthetic_wide_graph
+
+SIZES = [10_000, 50_000]
+
+
+def measure_io(wg: WorkGraph, folder: str) -> tuple[float, float, float, float]:
+    """
+    :return: JSON dump, JSON load, columnar dump and columnar load wall times in seconds
+    """
+    start = time.perf_counter()
+    wg.dump(folder, 'wg')
+    json_dump = time.perf_counter() - start
+
+    start = time.perf_counter()
+    WorkGraph.loadf(folder, 'wg')
+    json_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dump_wg(wg, folder, 'wg')
+    columnar_dump = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_wg(folder, 'wg')
+    columnar_load = time.perf_counter() - start
+
+    return json_dump, json_load, columnar_dump, columnar_load
+
+
+if __name__ == '__main__':
+    rand = Random(231)
+    for size in SIZES:
+        wg = synthetic_wide_graph(size, rand)
+        with tempfile.TemporaryDirectory() as folder:
+            json_dump, json_load, columnar_dump, columnar_load = measure_io(wg, folder)
+        print(f'{wg.vertex_count} nodes: JSON dump {json_dump:.2f} s, load {json_load:.2f} s; '
+              f'columnar dump {columnar_dump:.2f} s, load {columnar_load:.2f} s')
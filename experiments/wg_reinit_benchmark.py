@@ -0,0 +1,76 @@
+import time
+import tracemalloc
+from random import Random
+
+from sampo.schemas.graph import WorkGraph, GraphNode, EdgeType
+from sampo.schemas.requirements import WorkerReq
+from sampo.schemas.time import Time
+from sampo.schemas.works import WorkUnit
+
+SIZES = [10_000, 50_000, 100_000]
+LAYER_WIDTH = 1_000
+MAX_PARENTS = 3
+KINDS = ['driver', 'fitter', 'handyman', 'electrician', 'manager', 'engineer']
+
+
+def synthetic_wide_graph(size: int, rand: Random) -> WorkGraph:
+    """
+    Builds layered graph of the given size with `LAYER_WIDTH` works in each layer.
+    Each work depends on 1..`MAX_PARENTS` works of the previous layer.
+    """
+    nodes: list[GraphNode] = []
+    prev_layer: list[GraphNode] = []
+    layer: list[GraphNode] = []
+    for i in range(size):
+        reqs = [WorkerReq(kind, Time(rand.randint(1, 50)), 1, 10)
+                for kind in rand.sample(KINDS, k=rand.randint(1, 3))]
+        parents = [(parent, 0, EdgeType.FinishStart)
+                   for parent in rand.sample(prev_layer, k=min(len(prev_layer), rand.randint(1, MAX_PARENTS)))]
+        node = GraphNode(WorkUnit(str(i), f'work {i}', reqs), parents)
+        nodes.append(node)
+        layer.append(node)
+        if len(layer) == LAYER_WIDTH:
+            prev_layer, layer = layer, []
+    return WorkGraph.from_nodes(nodes, rand=rand)
+
+
+def measure(wg: WorkGraph) -> tuple[float, float]:
+    """
+    :return: reinit wall time in seconds and peak traced memory in MB
+    """
+    # tracing slows down the execution, so time and memory are measured in separate runs
+    start = time.perf_counter()
+    wg.reinit()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    wg.reinit()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+
+def measure_node_memory(size: int, rand: Random) -> float:
+    """
+    :return: memory retained by the built and initialized graph per node in KB,
+             including work units, requirements and edges
+    """
+    tracemalloc.start()
+    wg = synthetic_wide_graph(size, rand)
+    # touch lazily computed node attributes
+    for node in wg.nodes:
+        node.get_inseparable_chain_with_self()
+        _ = node.children_set
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / wg.vertex_count / 2 ** 10
+
+
+if __name__ == '__main__':
+    rand = Random(231)
+    for size in SIZES:
+        wg = synthetic_wide_graph(size, rand)
+        elapsed, peak = measure(wg)
+        print(f'{wg.vertex_count} nodes: reinit {elapsed:.3f} s, peak memory {peak:.1f} MB')
+
+    print(f'{SIZES[-1]} nodes: {measure_node_memory(SIZES[-1], Random(231)):.2f} KB per node')
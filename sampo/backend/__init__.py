@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from random import Random
-from typing import TypeVar
+from typing import TypeVar, Callable
 
 # import sampo.scheduler
 
@@ -38,6 +38,15 @@ class ComputationalBackend(ABC):
         self._only_lft_initialization = None
         self._is_multiobjective = None
 
+    @abstractmethod
+    def map_with_timeout(self, action: Callable[[T], R], values: list[T], timeout: float | None = None) \
+            -> list[R | None]:
+        """
+        Applies action to all values concurrently.
+        The computations, that aren't finished in `timeout` seconds, get None as a result.
+        """
+        ...
+
     @abstractmethod
     def cache_scheduler_info(self,
                              wg: WorkGraph,
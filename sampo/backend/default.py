@@ -1,3 +1,7 @@
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
 from random import Random
 from typing import Callable
 
@@ -9,12 +13,114 @@ from sampo.schemas import WorkGraph, Contractor, LandscapeConfiguration, WorkTim
 from sampo.schemas.schedule_spec import ScheduleSpec
 from sampo.schemas.time_estimator import DefaultWorkEstimator
 
+# the action and its values are inherited by forked processes, so they are never pickled
+_forked_action = None
+_forked_values = None
+
+
+def _apply_forked_action(connection: multiprocessing.connection.Connection, index: int):
+    try:
+        result = (True, _forked_action(_forked_values[index]))
+    except Exception as e:
+        result = (False, e)
+    try:
+        connection.send(result)
+    except Exception as e:
+        # the result or the exception isn't picklable
+        connection.send((False, RuntimeError(repr(e))))
+    finally:
+        connection.close()
+
+
+def can_fork() -> bool:
+    """
+    :return: whether the current process can fork the children, e.g. the daemon pool workers can't
+    """
+    return 'fork' in multiprocessing.get_all_start_methods() and not multiprocessing.current_process().daemon
+
+
+def map_forked(action: Callable[[T], R], values: list[T], timeout: float, processes: int) -> list[R | None]:
+    """
+    Applies action to each value in a separate forked process, at most `processes` of them run at once.
+    The computation, that isn't finished in `timeout` seconds since its start, is terminated and gets None.
+
+    :param action: any callable, it isn't pickled, but the results it returns should be picklable
+    :param values:
+    :param timeout: time limit for each computation in seconds
+    :param processes: maximum number of the processes running at once
+    :return: results in the order of values
+    """
+    global _forked_action, _forked_values
+
+    context = multiprocessing.get_context('fork')
+    results = [None] * len(values)
+    # receiving connection -> (process, index of value, deadline)
+    running = {}
+    next_index = 0
+    _forked_action, _forked_values = action, values
+    try:
+        while next_index < len(values) or running:
+            while next_index < len(values) and len(running) < processes:
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_apply_forked_action, args=(sender, next_index), daemon=True)
+                process.start()
+                sender.close()
+                running[receiver] = (process, next_index, time.monotonic() + timeout)
+                next_index += 1
+
+            nearest_deadline = min(deadline for _, _, deadline in running.values())
+            for receiver in multiprocessing.connection.wait(list(running),
+                                                            max(nearest_deadline - time.monotonic(), 0)):
+                process, index, _ = running.pop(receiver)
+                try:
+                    is_finished, result = receiver.recv()
+                except EOFError:
+                    is_finished, result = False, RuntimeError(f'Process exited with code {process.exitcode}')
+                receiver.close()
+                process.join()
+                if not is_finished:
+                    raise result
+                results[index] = result
+
+            now = time.monotonic()
+            for receiver, (process, index, deadline) in list(running.items()):
+                if deadline <= now:
+                    del running[receiver]
+                    process.terminate()
+                    process.join()
+                    receiver.close()
+        return results
+    finally:
+        for receiver, (process, _, _) in running.items():
+            process.terminate()
+            process.join()
+            receiver.close()
+        _forked_action, _forked_values = None, None
+
 
 class DefaultComputationalBackend(ComputationalBackend):
 
     def map(self, action: Callable[[T], R], values: list[T]) -> list[R]:
         return [action(v) for v in values]
 
+    def map_with_timeout(self, action: Callable[[T], R], values: list[T], timeout: float | None = None) \
+            -> list[R | None]:
+        """
+        Applies action to all values. Without `timeout` values are processed sequentially in the current process.
+        With `timeout` each value is processed in a separate forked process, at most one process per CPU at once,
+        and the computation, that isn't finished in `timeout` seconds since its start, is terminated and gets None.
+        If 'fork' start method isn't available or the current process can't have children, e.g. it's a pool worker,
+        values are processed sequentially without time limit.
+
+        :param action: any callable, it isn't pickled, but the results it returns should be picklable
+        :param values:
+        :param timeout: time limit for each computation in seconds, None means no limit
+        :return: results in the order of values
+        """
+        if timeout is None or len(values) == 0 or not can_fork():
+            return self.map(action, values)
+        return map_forked(action, values, timeout, min(len(values), os.cpu_count() or 1))
+
     def cache_scheduler_info(self,
                              wg: WorkGraph,
                              contractors: list[Contractor],
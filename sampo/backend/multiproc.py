@@ -1,4 +1,5 @@
 import math
+import time
 from typing import Callable
 
 import sampo.scheduler
@@ -9,7 +10,7 @@ import pathos.multiprocessing
 
 from sampo.api.genetic_api import ChromosomeType, FitnessFunction, ScheduleGenerationScheme
 from sampo.backend import T, R
-from sampo.backend.default import DefaultComputationalBackend
+from sampo.backend.default import DefaultComputationalBackend, can_fork, map_forked
 from sampo.scheduler.genetic.operators import Individual
 from sampo.scheduler.genetic.utils import create_toolbox_using_cached_chromosomes, init_chromosomes_f
 from sampo.scheduler.heft import HEFTScheduler, HEFTBetweenScheduler
@@ -88,6 +89,42 @@ class MultiprocessingComputationalBackend(DefaultComputationalBackend):
     def map(self, action: Callable[[T], R], values: list[T]) -> list[R]:
         return self._pool.map(action, values)
 
+    def map_with_timeout(self, action: Callable[[T], R], values: list[T], timeout: float | None = None) \
+            -> list[R | None]:
+        """
+        Applies action to all values in `n_cpus` processes.
+        The computation, that isn't finished in `timeout` seconds since its start, gets None as a result.
+        With `timeout` the values are processed in forked processes, so the action isn't pickled.
+        If 'fork' start method isn't available, the pool processes the values by rounds of `n_cpus`,
+        and it's recreated after the round with the unfinished computations.
+
+        :param action: any callable, it's pickled for each value if it's computed by the pool
+        :param values:
+        :param timeout: time limit for each computation in seconds, None means no limit
+        :return: results in the order of values
+        """
+        if timeout is not None and len(values) > 0 and can_fork():
+            return map_forked(action, values, timeout, min(len(values), self._n_cpus))
+
+        self._ensure_pool_created()
+        if timeout is None:
+            return self.map(action, values)
+
+        results = []
+        for begin in range(0, len(values), self._n_cpus):
+            pending = [self._pool.apply_async(action, (value,)) for value in values[begin:begin + self._n_cpus]]
+            # the round is started by the idle pool, so all its computations have the same deadline
+            deadline = time.monotonic() + timeout
+            for result in pending:
+                result.wait(max(deadline - time.monotonic(), 0))
+                results.append(result.get() if result.ready() else None)
+            if not all(result.ready() for result in pending):
+                # the only way to stop the computations that are still running
+                self._pool.terminate()
+                self._pool = None
+                self._ensure_pool_created()
+        return results
+
     def _ensure_pool_created(self):
         if self._pool is not None:
             return
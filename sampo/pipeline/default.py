@@ -26,26 +26,8 @@ from sampo.utilities.name_mapper import NameMapper, read_json
 
 
 def contractors_can_perform_work_graph(contractors: list[Contractor], wg: WorkGraph) -> bool:
-    is_at_least_one_contractor_can_perform = True
-    num_contractors_can_perform_node = 0
-
-    for node in wg.nodes:
-        reqs = node.work_unit.worker_reqs
-        for contractor in contractors:
-            offers = contractor.workers
-            for req in reqs:
-                if req.min_count > offers[req.kind].count:
-                    is_at_least_one_contractor_can_perform = False
-                    break
-            if is_at_least_one_contractor_can_perform:
-                num_contractors_can_perform_node += 1
-                break
-            is_at_least_one_contractor_can_perform = True
-        if num_contractors_can_perform_node == 0:
-            return False
-        num_contractors_can_perform_node = 0
-
-    return True
+    # each work should be performed by at least one contractor
+    return bool(wg.arrays.capability_matrix(contractors).any(axis=1).all())
 
 
 class DefaultInputPipeline(InputPipeline):
@@ -1,5 +1,8 @@
+from concurrent.futures import Executor
 from typing import Type, Callable, Iterable
 
+import numpy as np
+
 from sampo.scheduler.base import Scheduler, SchedulerType
 from sampo.scheduler.utils import (WorkerContractorPool, get_worker_contractor_pool,
                                    get_head_nodes_with_connections_mappings)
@@ -54,6 +57,9 @@ class GenericScheduler(Scheduler):
         self._timeline_type = timeline_type
         self.prioritization = prioritization_f
         self.optimize_resources = optimize_resources_f
+        # if set, contractors for each work are evaluated concurrently by this executor,
+        # it makes sense for many contractors, e.g. `ThreadPoolExecutor`
+        self.contractor_search_executor: Executor | None = None
 
     def get_default_res_opt_function(self, get_finish_time=get_finish_time_default) \
             -> Callable[
@@ -99,7 +105,7 @@ class GenericScheduler(Scheduler):
                                                                              assigned_parent_time, work_estimator)
                 return c_st, c_ft, workers
 
-            return run_contractor_search(contractors, run_with_contractor)
+            return run_contractor_search(contractors, run_with_contractor, self.contractor_search_executor)
 
         return optimize_resources_def
 
@@ -117,9 +123,13 @@ class GenericScheduler(Scheduler):
 
         ordered_nodes = self.prioritization(head_nodes, node_id2parent_ids, node_id2child_ids, self.work_estimator)
 
+        # contractors, that can perform each of ordered nodes
+        arrays = wg.arrays
+        capable = arrays.capability_matrix(contractors)[[arrays.id2index[node.id] for node in ordered_nodes]]
+
         schedule, schedule_start_time, timeline = \
             self.build_scheduler(ordered_nodes, contractors, landscape, spec, self.work_estimator,
-                                 assigned_parent_time, timeline)
+                                 assigned_parent_time, timeline, capable)
         schedule = Schedule.from_scheduled_works(
             schedule,
             wg
@@ -137,7 +147,8 @@ class GenericScheduler(Scheduler):
                         spec: ScheduleSpec = ScheduleSpec(),
                         work_estimator: WorkTimeEstimator = DefaultWorkEstimator(),
                         assigned_parent_time: Time = Time(0),
-                        timeline: Timeline | None = None) \
+                        timeline: Timeline | None = None,
+                        capable: np.ndarray | None = None) \
             -> tuple[Iterable[ScheduledWork], Time, Timeline]:
         """
         Find optimal number of workers who ensure the nearest finish time.
@@ -151,6 +162,8 @@ class GenericScheduler(Scheduler):
         :param timeline: the previous used timeline can be specified to handle previously scheduled works
         :param assigned_parent_time: start time of the whole schedule(time shift)
         :param work_estimator:
+        :param capable: ordered nodes x contractors capability matrix, if given, only capable contractors are
+        considered for each node
         :return:
         """
         worker_pool = get_worker_contractor_pool(contractors)
@@ -164,7 +177,10 @@ class GenericScheduler(Scheduler):
             work_unit = node.work_unit
             work_spec = spec.get_work_spec(work_unit.id)
 
-            start_time, finish_time, contractor, best_worker_team = self.optimize_resources(node, contractors,
+            node_contractors = contractors if capable is None \
+                else [contractors[i] for i in np.flatnonzero(capable[index])]
+
+            start_time, finish_time, contractor, best_worker_team = self.optimize_resources(node, node_contractors,
                                                                                             work_spec, worker_pool,
                                                                                             node2swork,
                                                                                             assigned_parent_time,
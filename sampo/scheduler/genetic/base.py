@@ -1,7 +1,9 @@
 import random
+from functools import partial
 from typing import Optional
 
 from sampo.api.genetic_api import ChromosomeType
+from sampo.base import SAMPO
 from sampo.scheduler.base import Scheduler, SchedulerType
 from sampo.scheduler.genetic.operators import FitnessFunction, TimeFitness
 from sampo.scheduler.genetic.schedule_builder import build_schedules, build_schedules_with_cache
@@ -23,6 +25,47 @@ from sampo.schemas.time import Time
 from sampo.schemas.time_estimator import WorkTimeEstimator, DefaultWorkEstimator
 from sampo.utilities.validation import validate_schedule
 
+# initial schedule heuristics: scheduler class and resource optimizer parameter
+FIRST_POPULATION_HEURISTICS = {
+    'heft_end': (HEFTScheduler, None),
+    'heft_between': (HEFTBetweenScheduler, None),
+    '12.5%': (HEFTScheduler, 8),
+    '25%': (HEFTScheduler, 4),
+    '75%': (HEFTScheduler, 4 / 3),
+    '87.5%': (HEFTScheduler, 8 / 7)
+}
+
+
+def _init_first_population_schedule(wg: WorkGraph,
+                                    contractors: list[Contractor],
+                                    landscape: LandscapeConfiguration,
+                                    spec: ScheduleSpec,
+                                    work_estimator: WorkTimeEstimator,
+                                    deadline: Time | None,
+                                    heuristic: tuple[type[Scheduler], float | None]) \
+        -> tuple[Schedule | None, list[str] | None, ScheduleSpec | None]:
+    """
+    Builds initial schedule with the given heuristic.
+    Node order is returned as ids, so the result can be passed between processes without the graph
+
+    :param heuristic: scheduler class and `k` of AverageReqResourceOptimizer, if None the deadline is used
+    :return: schedule, ids of nodes in the scheduling order and spec
+    """
+    scheduler_class, k = heuristic
+    try:
+        if k is not None or deadline is None:
+            scheduler = scheduler_class(work_estimator=work_estimator) if k is None \
+                else scheduler_class(work_estimator=work_estimator, resource_optimizer=AverageReqResourceOptimizer(k))
+            schedule, _, _, node_order = scheduler.schedule_with_cache(wg, contractors, spec, landscape=landscape)[0]
+            modified_spec = spec
+        else:
+            (schedule, _, _, node_order), modified_spec = AverageBinarySearchResourceOptimizingScheduler(
+                scheduler_class(work_estimator=work_estimator)
+            ).schedule_with_cache(wg, contractors, deadline, spec, landscape=landscape)
+        return schedule, [node.id for node in node_order], modified_spec
+    except NoSufficientContractorError:
+        return None, None, None
+
 
 class GeneticScheduler(Scheduler):
     """
@@ -79,6 +122,7 @@ class GeneticScheduler(Scheduler):
         self._time_border = None
         self._max_plateau_steps = None
         self._deadline = None
+        self._first_population_timeout = None
 
     def __str__(self) -> str:
         return f'GeneticScheduler[' \
@@ -125,6 +169,10 @@ class GeneticScheduler(Scheduler):
     def set_max_plateau_steps(self, max_plateau_steps: int):
         self._max_plateau_steps = max_plateau_steps
 
+    # Time limit for each heuristic, that builds initial schedule
+    def set_first_population_timeout(self, timeout: float):
+        self._first_population_timeout = timeout
+
     def set_deadline(self, deadline: Time):
         """
         Set the project deadline
@@ -152,9 +200,11 @@ class GeneticScheduler(Scheduler):
                                   spec: ScheduleSpec = ScheduleSpec(),
                                   work_estimator: WorkTimeEstimator = None,
                                   deadline: Time = None,
-                                  weights=None):
+                                  weights=None,
+                                  timeout: float | None = None):
         """
-        Algorithm, that generate initial population
+        Algorithm, that generate initial population.
+        Initial schedules of heuristics, that aren't built in `timeout` seconds, are skipped
 
         :param landscape:
         :param wg: graph of works
@@ -163,6 +213,7 @@ class GeneticScheduler(Scheduler):
         :param work_estimator:
         :param deadline:
         :param weights:
+        :param timeout: time limit for each heuristic in seconds, None means no limit
         :return:
         """
 
@@ -172,45 +223,23 @@ class GeneticScheduler(Scheduler):
         schedule, _, _, node_order = LFTScheduler(work_estimator=work_estimator).schedule_with_cache(wg, contractors,
                                                                                                      spec,
                                                                                                      landscape=landscape)[0]
-        init_lft_schedule = (schedule, node_order, spec)
-
-        def init_k_schedule(scheduler_class, k) -> tuple[Schedule | None, list[GraphNode] | None, ScheduleSpec | None]:
-            try:
-                schedule, _, _, node_order = (scheduler_class(work_estimator=work_estimator,
-                                                              resource_optimizer=AverageReqResourceOptimizer(k))
-                                              .schedule_with_cache(wg, contractors, spec, landscape=landscape))[0]
-                return schedule, node_order, spec
-            except NoSufficientContractorError:
-                return None, None, None
-
-        if deadline is None:
-            def init_schedule(scheduler_class) -> tuple[Schedule | None, list[GraphNode] | None, ScheduleSpec | None]:
-                try:
-                    schedule, _, _, node_order = (scheduler_class(work_estimator=work_estimator)
-                                                  .schedule_with_cache(wg, contractors, spec, landscape=landscape))[0]
-                    return schedule, node_order, spec
-                except NoSufficientContractorError:
-                    return None, None, None
+        init_schedules = {'lft': (schedule, node_order, spec, weights[0])}
 
-        else:
-            def init_schedule(scheduler_class) -> tuple[Schedule | None, list[GraphNode] | None, ScheduleSpec | None]:
-                try:
-                    (schedule, _, _, node_order), modified_spec = AverageBinarySearchResourceOptimizingScheduler(
-                        scheduler_class(work_estimator=work_estimator)
-                    ).schedule_with_cache(wg, contractors, deadline, spec, landscape=landscape)
-                    return schedule, node_order, modified_spec
-                except NoSufficientContractorError:
-                    return None, None, None
-
-        return {
-            "lft": (*init_lft_schedule, weights[0]),
-            "heft_end": (*init_schedule(HEFTScheduler), weights[1]),
-            "heft_between": (*init_schedule(HEFTBetweenScheduler), weights[2]),
-            "12.5%": (*init_k_schedule(HEFTScheduler, 8), weights[3]),
-            "25%": (*init_k_schedule(HEFTScheduler, 4), weights[4]),
-            "75%": (*init_k_schedule(HEFTScheduler, 4 / 3), weights[5]),
-            "87.5%": (*init_k_schedule(HEFTScheduler, 8 / 7), weights[6])
-        }
+        # the rest of the heuristics are independent, so they are computed concurrently
+        names = list(FIRST_POPULATION_HEURISTICS.keys())
+        seeds = SAMPO.backend.map_with_timeout(partial(_init_first_population_schedule, wg, contractors, landscape,
+                                                       spec, work_estimator, deadline),
+                                               list(FIRST_POPULATION_HEURISTICS.values()), timeout)
+
+        for name, seed, weight in zip(names, seeds, weights[1:]):
+            if seed is None:
+                SAMPO.logger.warning(f'Initial schedule {name} was not built in {timeout} s, skipping it')
+                continue
+            schedule, node_ids, seed_spec = seed
+            node_order = [wg[node_id] for node_id in node_ids] if node_ids is not None else None
+            init_schedules[name] = (schedule, node_order, seed_spec, weight)
+
+        return init_schedules
 
     def upgrade_pop(self,
                     wg: WorkGraph,
@@ -273,7 +302,8 @@ class GeneticScheduler(Scheduler):
         :return:
         """
         init_schedules = GeneticScheduler.generate_first_population(wg, contractors, landscape, spec,
-                                                                    self.work_estimator, self._deadline, self._weights)
+                                                                    self.work_estimator, self._deadline, self._weights,
+                                                                    self._first_population_timeout)
 
         mutate_order, mutate_resources, mutate_zones, size_of_population = self.get_params(wg.vertex_count)
         deadline = None if self._optimize_resources else self._deadline
@@ -75,6 +75,39 @@ def convert_schedule_to_chromosome(work_id2index: dict[str, int],
     return order_chromosome, resource_chromosome, resource_border_chromosome, spec, zone_changes_chromosome
 
 
+def convert_assignment_to_chromosome(work_id2index: dict[str, int],
+                                     worker_name2index: dict[str, int],
+                                     contractor2index: dict[str, int],
+                                     contractor_borders: np.ndarray,
+                                     order: list[GraphNode],
+                                     node_id2workers: dict[str, tuple[Contractor, list[Worker]]],
+                                     spec: ScheduleSpec,
+                                     landscape: LandscapeConfiguration) -> ChromosomeType:
+    """
+    Transform works order and workers assigned to works to chromosome without building the schedule
+
+    :param order: works order that should appear in the chromosome
+    :param node_id2workers: assigned contractor and workers for each work in order
+    :return:
+    """
+    order_chromosome: np.ndarray = np.array([work_id2index[work.id] for work in order])
+
+    # +1 stores contractors line
+    resource_chromosome = np.zeros((len(order_chromosome), len(worker_name2index) + 1), dtype=int)
+    zone_changes_chromosome = np.zeros((len(order_chromosome), len(landscape.zone_config.start_statuses)), dtype=int)
+
+    for node in order:
+        index = work_id2index[node.id]
+        contractor, workers = node_id2workers[node.id]
+        for worker in workers:
+            resource_chromosome[index, worker_name2index[worker.name]] = worker.count
+            resource_chromosome[index, -1] = contractor2index[contractor.id]
+
+    resource_border_chromosome = np.copy(contractor_borders)
+
+    return order_chromosome, resource_chromosome, resource_border_chromosome, spec, zone_changes_chromosome
+
+
 def convert_chromosome_to_schedule(chromosome: ChromosomeType,
                                    worker_pool: WorkerContractorPool,
                                    index2node: dict[int, GraphNode],
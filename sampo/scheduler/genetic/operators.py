@@ -1,3 +1,4 @@
+import heapq
 import math
 import random
 from copy import deepcopy
@@ -11,12 +12,14 @@ from deap.base import Toolbox
 from sampo.api.genetic_api import ChromosomeType, FitnessFunction, Individual
 from sampo.base import SAMPO
 from sampo.scheduler.genetic.converter import (convert_schedule_to_chromosome, convert_chromosome_to_schedule,
-                                               ScheduleGenerationScheme)
+                                               convert_assignment_to_chromosome, ScheduleGenerationScheme)
 from sampo.scheduler.lft.base import RandomizedLFTScheduler
 from sampo.scheduler.topological.base import RandomizedTopologicalScheduler
 from sampo.scheduler.utils import WorkerContractorPool
 from sampo.schemas.contractor import Contractor
+from sampo.schemas.exceptions import NoSufficientContractorError
 from sampo.schemas.graph import GraphNode, WorkGraph
+from sampo.schemas.graph_arrays import WorkGraphArrays
 from sampo.schemas.landscape import LandscapeConfiguration
 from sampo.schemas.resources import Worker
 from sampo.schemas.schedule import Schedule
@@ -276,18 +279,25 @@ def generate_chromosomes(n: int,
     Do not use `generate_chromosome` function.
     """
 
+    bounds = None
+    rng = np.random.default_rng(rand.getrandbits(32))
+
     def randomized_init(is_topological: bool = False) -> ChromosomeType:
+        nonlocal bounds
         if is_topological:
-            seed = int(rand.random() * 1000000)
-            schedule, _, _, node_order = RandomizedTopologicalScheduler(work_estimator,
-                                                                        seed).schedule_with_cache(wg, contractors, spec,
-                                                                                                  landscape=landscape)[0]
-        else:
-            schedule, _, _, node_order = RandomizedLFTScheduler(work_estimator=work_estimator,
-                                                                rand=rand).schedule_with_cache(wg, contractors, spec,
-                                                                                               landscape=landscape)[0]
-        return convert_schedule_to_chromosome(work_id2index, worker_name2index, contractor2index, contractor_borders,
-                                              schedule, spec, landscape, node_order)
+            # sample chromosome directly, without building the schedule
+            if bounds is None:
+                bounds = get_random_resources_bounds(wg, worker_name2index, work_id2index, contractor_borders, spec)
+            order = randomized_topological_order(wg.arrays, rand)
+            resources = randomized_resources(*bounds, contractor_borders, rng)
+            zone_changes = np.zeros((len(order), len(landscape.zone_config.start_statuses)), dtype=int)
+            return order, resources, np.copy(contractor_borders), spec, zone_changes
+
+        # only the assignment and the order are needed, so the timeline isn't simulated
+        node_order, node_id2workers = RandomizedLFTScheduler(work_estimator=work_estimator,
+                                                             rand=rand).prioritize(wg, contractors, spec)
+        return convert_assignment_to_chromosome(work_id2index, worker_name2index, contractor2index,
+                                                contractor_borders, node_order, node_id2workers, spec, landscape)
 
     if only_lft_initialization:
         chromosomes = [toolbox.Individual(randomized_init(is_topological=False)) for _ in range(n - 1)]
@@ -333,6 +343,77 @@ def generate_chromosomes(n: int,
     return chromosomes[:n]
 
 
+def get_random_resources_bounds(wg: WorkGraph,
+                                worker_name2index: dict[str, int],
+                                work_id2index: dict[str, int],
+                                contractor_borders: np.ndarray,
+                                spec: ScheduleSpec) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes the bounds to sample resources part of chromosome within.
+    Works are indexed in the order of `work_id2index`, workers amounts assigned in spec are fixed.
+
+    :return: mask of contractors, that can perform each work, min and max amounts of workers for each work
+    """
+    arrays = wg.arrays
+    _, min_req, max_req = arrays.requirements_matrices(worker_name2index.keys())
+    min_amounts = min_req[arrays.head_order]
+    max_amounts = max_req[arrays.head_order]
+
+    for work_id, index in work_id2index.items():
+        for worker_name, amount in spec.get_work_spec(work_id).assigned_workers.items():
+            if worker_name in worker_name2index:
+                min_amounts[index, worker_name2index[worker_name]] = amount
+                max_amounts[index, worker_name2index[worker_name]] = amount
+
+    capable = (min_amounts[:, np.newaxis, :] <= contractor_borders[np.newaxis, :, :]).all(axis=2)
+    if not capable.any(axis=1).all():
+        raise NoSufficientContractorError('There is no contractor that can perform some works')
+    return capable, min_amounts, max_amounts
+
+
+def randomized_topological_order(arrays: WorkGraphArrays, rand: random.Random) -> np.ndarray:
+    """
+    Samples random topological order of head nodes with Kahn's algorithm.
+    As in `TopologicalScheduler`, works with lower priority values go first.
+
+    :return: order part of chromosome
+    """
+    priorities = arrays.priorities[arrays.head_order].tolist()
+    children_indptr = arrays.head_children_indptr.tolist()
+    children_indices = arrays.head_children_indices.tolist()
+    parents_left = np.diff(arrays.head_parents_indptr).tolist()
+
+    eligible = [(priorities[work], rand.random(), work) for work, count in enumerate(parents_left) if count == 0]
+    heapq.heapify(eligible)
+    order = []
+    while eligible:
+        _, _, work = heapq.heappop(eligible)
+        order.append(work)
+        for child in children_indices[children_indptr[work]:children_indptr[work + 1]]:
+            parents_left[child] -= 1
+            if parents_left[child] == 0:
+                heapq.heappush(eligible, (priorities[child], rand.random(), child))
+    return np.array(order)
+
+
+def randomized_resources(capable: np.ndarray, min_amounts: np.ndarray, max_amounts: np.ndarray,
+                         contractor_borders: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Samples contractor for each work uniformly among capable ones
+    and amounts of workers uniformly within requirements and the contractor's borders.
+
+    :return: resources part of chromosome
+    """
+    capable_count = capable.sum(axis=1)
+    # take the k-th capable contractor of each work
+    k = (rng.random(len(capable)) * capable_count).astype(int)
+    contractors = (np.cumsum(capable, axis=1) > k[:, np.newaxis]).argmax(axis=1)
+
+    max_amounts = np.minimum(max_amounts, contractor_borders[contractors])
+    amounts = min_amounts + (rng.random(min_amounts.shape) * (max_amounts - min_amounts + 1)).astype(int)
+    return np.hstack((amounts, contractors[:, np.newaxis])).astype(int)
+
+
 def generate_chromosome(wg: WorkGraph,
                         contractors: list[Contractor],
                         work_id2index: dict[str, int],
@@ -6,7 +6,7 @@ from deap.base import Toolbox
 from sampo.api.genetic_api import ChromosomeType
 from sampo.scheduler.genetic.converter import convert_schedule_to_chromosome, ScheduleGenerationScheme
 from sampo.scheduler.genetic.operators import init_toolbox
-from sampo.scheduler.utils import get_worker_contractor_pool, get_head_nodes_with_connections_mappings
+from sampo.scheduler.utils import get_worker_contractor_pool
 from sampo.schemas import WorkGraph, Contractor, Schedule, GraphNode, LandscapeConfiguration, WorkTimeEstimator, Time
 from sampo.schemas.schedule_spec import ScheduleSpec
 
@@ -45,29 +45,23 @@ def prepare_optimized_data_structures(wg: WorkGraph,
         contractor2index[contractor_id]: worker for contractor_id, worker in workers_of_type.items()
     } for worker_name, workers_of_type in worker_pool.items()}
 
-    contractor_borders = np.zeros((len(contractor2index), len(worker_name2index)), dtype=int)
-    for ind, contractor in enumerate(contractors):
-        for ind_worker, worker in enumerate(contractor.workers.values()):
-            contractor_borders[ind, ind_worker] = worker.count
+    # shared array view of the graph, is built once per WorkGraph
+    arrays = wg.arrays
 
-    nodes, node_id2parent_ids, node_id2child_ids = get_head_nodes_with_connections_mappings(wg)
+    contractor_borders = arrays.capacity_matrix(contractors, worker_name2index.keys())
+
+    nodes = arrays.head_nodes()
     node_indices = list(range(len(nodes)))
 
     index2node: dict[int, GraphNode] = {index: node for index, node in enumerate(nodes)}
     work_id2index: dict[str, int] = {node.id: index for index, node in index2node.items()}
-    children = {work_id2index[node_id]: set(work_id2index[child_id] for child_id in child_ids)
-                for node_id, child_ids in node_id2child_ids.items()}
-    parents = {work_id2index[node_id]: set(work_id2index[parent_id] for parent_id in parent_ids)
-               for node_id, parent_ids in node_id2parent_ids.items()}
-
-    priorities = np.array([index2node[i].work_unit.priority for i in range(len(index2node))])
-
-    resources_border = np.zeros((2, len(worker_pool), len(index2node)))
-    for work_index, node in index2node.items():
-        for req in node.work_unit.worker_reqs:
-            worker_index = worker_name2index[req.kind]
-            resources_border[0, worker_index, work_index] = req.min_count
-            resources_border[1, worker_index, work_index] = req.max_count
+    children = {index: set(arrays.head_children_of(index).tolist()) for index in node_indices}
+    parents = {index: set(arrays.head_parents_of(index).tolist()) for index in node_indices}
+
+    priorities = arrays.priorities[arrays.head_order]
+
+    _, min_req, max_req = arrays.requirements_matrices(worker_name2index.keys())
+    resources_border = np.stack((min_req[arrays.head_order].T, max_req[arrays.head_order].T)).astype(float)
 
     return (worker_pool, index2node, index2zone, work_id2index, worker_name2index, index2contractor_obj,
             worker_pool_indices, contractor2index, contractor_borders, node_indices, priorities, parents,
@@ -1,7 +1,10 @@
 import random
-import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
 from functools import partial
-from typing import Type, Iterable
+from typing import Type, Iterable, Hashable
+
+import numpy as np
 
 from sampo.scheduler.base import Scheduler, SchedulerType
 from sampo.scheduler.timeline import Timeline, MomentumTimeline
@@ -13,20 +16,34 @@ from sampo.scheduler.lft.prioritization import lft_prioritization, lft_randomize
 from sampo.scheduler.lft.time_computaion import get_chain_duration
 
 from sampo.schemas import (Contractor, WorkGraph, GraphNode, LandscapeConfiguration, Schedule, ScheduledWork,
-                           Time, WorkUnit)
+                           Time, WorkUnit, Worker)
+from sampo.schemas.graph_arrays import contractors_key
 from sampo.schemas.schedule_spec import ScheduleSpec
 from sampo.utilities.validation import validate_schedule
 
 from sampo.schemas.exceptions import IncorrectAmountOfWorker, NoSufficientContractorError
 
 
+def get_contractors_capacity(contractors: list[Contractor], worker_pool: WorkerContractorPool) \
+        -> dict[str, np.ndarray]:
+    """
+    :return: amounts of workers of each kind for each contractor, -1 if contractor doesn't have such workers
+    """
+    return {kind: np.array([workers[contractor.id].count if contractor.id in workers else -1
+                            for contractor in contractors])
+            for kind, workers in worker_pool.items()}
+
+
 def get_contractors_and_workers_amounts_for_work(work_unit: WorkUnit, contractors: list[Contractor],
-                                                 spec: ScheduleSpec, worker_pool: WorkerContractorPool) \
+                                                 spec: ScheduleSpec, worker_pool: WorkerContractorPool,
+                                                 contractors_capacity: dict[str, np.ndarray] | None = None) \
         -> tuple[list[Contractor], np.ndarray]:
     """
     This function selects contractors that can perform the work.
     For each selected contractor, the maximum possible amount of workers is assigned,
     if they are not specified in the ScheduleSpec, otherwise the amount from the ScheduleSpec is used.
+
+    :param contractors_capacity: precomputed result of `get_contractors_capacity`
     """
     work_reqs = work_unit.worker_reqs
     work_spec = spec.get_work_spec(work_unit.id)
@@ -48,10 +65,11 @@ def get_contractors_and_workers_amounts_for_work(work_unit: WorkUnit, contractor
         raise IncorrectAmountOfWorker(f"ScheduleSpec assigns too many workers for work {work_unit.id}")
 
     # get contractors borders
-    contractors_amounts = np.array([[worker_pool[req.kind][contractor.id].count
-                                     if contractor.id in worker_pool[req.kind] else -1
-                                     for req in work_reqs]
-                                    for contractor in contractors])
+    if contractors_capacity is None:
+        contractors_capacity = get_contractors_capacity(contractors, worker_pool)
+    missing = np.full(len(contractors), -1)
+    contractors_amounts = np.array([contractors_capacity.get(req.kind, missing) for req in work_reqs],
+                                   dtype=int).reshape(len(work_reqs), len(contractors)).T
 
     # make bool mask of contractors that satisfy min amounts of workers
     contractors_mask = (contractors_amounts >= min_req_amounts).all(axis=1)
@@ -84,6 +102,93 @@ def get_contractors_and_workers_amounts_for_work(work_unit: WorkUnit, contractor
     return accepted_contractors, workers_amounts
 
 
+@dataclass
+class WorkAssignmentOptions:
+    """
+    Contractors, that can perform the head node, with workers amounts assigned to them
+    and estimated durations of the node's inseparable chain
+    """
+    contractor_indices: list[int]
+    workers_amounts: np.ndarray
+    # None if the work estimator is not deterministic, then durations are estimated on every run
+    durations: np.ndarray | None
+
+
+@dataclass
+class LFTPreparedData:
+    """
+    The part of LFT scheduling, that doesn't depend on random choices.
+    Nodes are referenced by ids and contractors by indices, so the data can be shared between
+    equal graphs and contractors lists
+    """
+    node_id2parent_ids: dict[str, set[str]]
+    node_id2child_ids: dict[str, set[str]]
+    # options for each head node in the order of `WorkGraphArrays.head_nodes()`
+    options: list[WorkAssignmentOptions]
+    # indices of chosen options and order of head nodes of the deterministic LFT run
+    solution: tuple[list[int], list[int]] | None = None
+
+
+LFT_CACHE_SIZE = 16
+_lft_cache: OrderedDict[Hashable, LFTPreparedData] = OrderedDict()
+
+
+def clear_lft_cache():
+    _lft_cache.clear()
+
+
+def get_work_assignment_options(head_nodes: list[GraphNode], contractors: list[Contractor], spec: ScheduleSpec,
+                                worker_pool: WorkerContractorPool, work_estimator: WorkTimeEstimator | None) \
+        -> list[WorkAssignmentOptions]:
+    """
+    Computes contractors and workers amounts for each head node.
+
+    :param work_estimator: estimator to compute chain durations with, if None durations aren't computed
+    """
+    contractor2index = {id(contractor): i for i, contractor in enumerate(contractors)}
+    contractors_capacity = get_contractors_capacity(contractors, worker_pool)
+    options = []
+    for node in head_nodes:
+        accepted_contractors, workers_amounts = get_contractors_and_workers_amounts_for_work(node.work_unit,
+                                                                                             contractors,
+                                                                                             spec,
+                                                                                             worker_pool,
+                                                                                             contractors_capacity)
+        durations = None if work_estimator is None \
+            else np.array([get_chain_duration(node, amounts, work_estimator) for amounts in workers_amounts])
+        options.append(WorkAssignmentOptions([contractor2index[id(contractor)] for contractor in accepted_contractors],
+                                             workers_amounts, durations))
+    return options
+
+
+def get_lft_prepared_data(wg: WorkGraph, contractors: list[Contractor], spec: ScheduleSpec,
+                          worker_pool: WorkerContractorPool, work_estimator: WorkTimeEstimator) -> LFTPreparedData:
+    """
+    Returns cached LFT data for the content of the given graph, contractors, spec and work estimator.
+    The cache is shared between schedulers, e.g. GA runs `RandomizedLFTScheduler` many times on the same input.
+    """
+    estimator_key = work_estimator.get_cache_key()
+    key = (wg.arrays.content_hash,
+           contractors_key(contractors),
+           spec.get_assigned_workers_key(),
+           estimator_key)
+
+    prepared = _lft_cache.get(key)
+    if prepared is not None:
+        _lft_cache.move_to_end(key)
+        return prepared
+
+    head_nodes, node_id2parent_ids, node_id2child_ids = get_head_nodes_with_connections_mappings(wg)
+    options = get_work_assignment_options(head_nodes, contractors, spec, worker_pool,
+                                          work_estimator if estimator_key is not None else None)
+    prepared = LFTPreparedData(node_id2parent_ids, node_id2child_ids, options)
+
+    _lft_cache[key] = prepared
+    if len(_lft_cache) > LFT_CACHE_SIZE:
+        _lft_cache.popitem(last=False)
+    return prepared
+
+
 class LFTScheduler(Scheduler):
     """
     Scheduler, which assigns contractors evenly, allocates maximum resources
@@ -97,6 +202,9 @@ class LFTScheduler(Scheduler):
         super().__init__(scheduler_type, None, work_estimator)
         self._timeline_type = timeline_type
         self._prioritization = partial(lft_prioritization, core_f=lft_prioritization_core)
+        # whether contractors assignment and prioritization don't depend on random choices,
+        # so the result can be cached
+        self._is_deterministic = True
 
     def schedule_with_cache(self,
                             wg: WorkGraph,
@@ -107,18 +215,8 @@ class LFTScheduler(Scheduler):
                             timeline: Timeline | None = None,
                             landscape: LandscapeConfiguration() = LandscapeConfiguration()
                             ) -> list[tuple[Schedule, Time, Timeline, list[GraphNode]]]:
-        # get contractors borders
         worker_pool = get_worker_contractor_pool(contractors)
-
-        # get head nodes with mappings
-        head_nodes, node_id2parent_ids, node_id2child_ids = get_head_nodes_with_connections_mappings(wg)
-
-        # first of all assign workers and contractors to head nodes
-        # and estimate head nodes' durations
-        node_id2duration = self._contractor_workers_assignment(head_nodes, contractors, worker_pool, spec)
-
-        # order head nodes based on estimated durations
-        ordered_nodes = self._prioritization(head_nodes, node_id2parent_ids, node_id2child_ids, node_id2duration)
+        ordered_nodes, _ = self.prioritize(wg, contractors, spec, worker_pool)
 
         if not isinstance(timeline, self._timeline_type):
             timeline = self._timeline_type(worker_pool, landscape)
@@ -138,6 +236,28 @@ class LFTScheduler(Scheduler):
 
         return [(schedule, schedule_start_time, timeline, ordered_nodes)]
 
+    def prioritize(self,
+                   wg: WorkGraph,
+                   contractors: list[Contractor],
+                   spec: ScheduleSpec = ScheduleSpec(),
+                   worker_pool: WorkerContractorPool | None = None) \
+            -> tuple[list[GraphNode], dict[str, tuple[Contractor, list[Worker]]]]:
+        """
+        Assigns contractors and workers to head nodes and orders them, but doesn't build the schedule
+
+        :return: ordered head nodes and assigned contractor with workers for each of them
+        """
+        # get contractors borders
+        if worker_pool is None:
+            worker_pool = get_worker_contractor_pool(contractors)
+
+        # get head nodes and cached assignment options for them
+        head_nodes = wg.arrays.head_nodes()
+        prepared = get_lft_prepared_data(wg, contractors, spec, worker_pool, self.work_estimator)
+
+        ordered_nodes = self._assign_and_prioritize(head_nodes, contractors, worker_pool, spec, prepared)
+        return ordered_nodes, self._node_id2workers
+
     def build_scheduler(self,
                         ordered_nodes: list[GraphNode],
                         contractors: list[Contractor],
@@ -184,26 +304,56 @@ class LFTScheduler(Scheduler):
 
         return node2swork.values(), assigned_parent_time, timeline
 
+    def _assign_and_prioritize(self, head_nodes: list[GraphNode], contractors: list[Contractor],
+                               worker_pool: WorkerContractorPool, spec: ScheduleSpec,
+                               prepared: LFTPreparedData) -> list[GraphNode]:
+        """
+        Assigns workers and contractors to head nodes and orders head nodes based on estimated durations.
+        Deterministic runs with cached durations reuse the previous result.
+        """
+        is_cacheable = self._is_deterministic and all(options.durations is not None for options in prepared.options)
+        if is_cacheable and prepared.solution is not None:
+            chosen, order = prepared.solution
+            self._node_id2workers = {node.id: self._get_assigned_workers(node, contractors, worker_pool,
+                                                                         options, option_index)
+                                     for node, options, option_index in zip(head_nodes, prepared.options, chosen)}
+            return [head_nodes[i] for i in order]
+
+        chosen = []
+        node_id2duration = self._contractor_workers_assignment(head_nodes, contractors, worker_pool, spec,
+                                                               prepared.options, chosen)
+        ordered_nodes = self._prioritization(head_nodes, prepared.node_id2parent_ids, prepared.node_id2child_ids,
+                                             node_id2duration)
+
+        if is_cacheable:
+            node2index = {node.id: i for i, node in enumerate(head_nodes)}
+            prepared.solution = (chosen, [node2index[node.id] for node in ordered_nodes])
+
+        return ordered_nodes
+
     def _contractor_workers_assignment(self, head_nodes: list[GraphNode], contractors: list[Contractor],
-                                       worker_pool: WorkerContractorPool, spec: ScheduleSpec = ScheduleSpec()
-                                       ) -> dict[str, int]:
+                                       worker_pool: WorkerContractorPool, spec: ScheduleSpec = ScheduleSpec(),
+                                       options: list[WorkAssignmentOptions] | None = None,
+                                       chosen: list[int] | None = None) -> dict[str, int]:
+        """
+        :param options: precomputed assignment options for head nodes
+        :param chosen: list to collect indices of chosen options to
+        :return: estimated durations of head nodes
+        """
+        if options is None:
+            options = get_work_assignment_options(head_nodes, contractors, spec, worker_pool, None)
         # counter for contractors assignments to the works
         contractors_assignments_count = np.ones_like(contractors)
         # mapper of nodes and assigned workers
         self._node_id2workers = {}
         # mapper of nodes and estimated duration
         node_id2duration = {}
-        for node in head_nodes:
-            work_unit = node.work_unit
-            # get contractors that can perform this work and workers amounts for them
-            accepted_contractors, workers_amounts = get_contractors_and_workers_amounts_for_work(work_unit,
-                                                                                                 contractors,
-                                                                                                 spec,
-                                                                                                 worker_pool)
-
-            # estimate chain durations for each accepted contractor
-            durations = np.array([get_chain_duration(node, amounts, self.work_estimator)
-                                  for amounts in workers_amounts])
+        for node, node_options in zip(head_nodes, options):
+            # estimate chain durations for each accepted contractor if they aren't cached
+            durations = node_options.durations
+            if durations is None:
+                durations = np.array([get_chain_duration(node, amounts, self.work_estimator)
+                                      for amounts in node_options.workers_amounts])
 
             # assign a score for each contractor equal to the sum of the ratios of
             # the duration of this work for this contractor to all durations
@@ -215,24 +365,29 @@ class LFTScheduler(Scheduler):
 
             # assign contractor based on received scores by implemented strategy
             contractor_index = self._get_contractor_index(scores)
-            assigned_contractor = accepted_contractors[contractor_index]
-
-            # get workers amounts of the assigned contractor
-            assigned_amount = workers_amounts[contractor_index]
+            if chosen is not None:
+                chosen.append(contractor_index)
 
             # increase the counter for the assigned contractor
             contractors_assignments_count[contractor_index] += 1
 
             # get workers of the assigned contractor and assign them to the node in mapper
-            workers = [worker_pool[req.kind][assigned_contractor.id].copy().with_count(amount)
-                       for req, amount in zip(work_unit.worker_reqs, assigned_amount)]
-            self._node_id2workers[node.id] = (assigned_contractor, workers)
+            self._node_id2workers[node.id] = self._get_assigned_workers(node, contractors, worker_pool,
+                                                                        node_options, contractor_index)
 
             # assign the received duration to the node
             node_id2duration[node.id] = durations[contractor_index]
 
         return node_id2duration
 
+    @staticmethod
+    def _get_assigned_workers(node: GraphNode, contractors: list[Contractor], worker_pool: WorkerContractorPool,
+                              options: WorkAssignmentOptions, option_index: int) -> tuple[Contractor, list[Worker]]:
+        assigned_contractor = contractors[options.contractor_indices[option_index]]
+        workers = [worker_pool[req.kind][assigned_contractor.id].copy().with_count(amount)
+                   for req, amount in zip(node.work_unit.worker_reqs, options.workers_amounts[option_index])]
+        return assigned_contractor, workers
+
     def _get_contractor_index(self, scores: np.ndarray) -> int:
         return np.argmax(scores)
 
@@ -251,6 +406,7 @@ class RandomizedLFTScheduler(LFTScheduler):
         super().__init__(scheduler_type, timeline_type, work_estimator)
         self._random = rand
         self._prioritization = partial(lft_prioritization, rand=self._random, core_f=lft_randomized_prioritization_core)
+        self._is_deterministic = False
 
     def _get_contractor_index(self, scores: np.ndarray) -> int:
         return self._random.choices(np.arange(len(scores)), weights=scores)[0] if scores.size > 1 else 0
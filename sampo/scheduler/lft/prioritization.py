@@ -1,3 +1,4 @@
+from collections import defaultdict
 from typing import Callable
 from itertools import chain
 
@@ -76,19 +77,19 @@ def lft_randomized_prioritization_core(head_nodes: list[GraphNode],
     """
     node_id2group_priority = {node.id: i for i, group in enumerate(groups) for node in group}
 
-    def is_eligible(node_id):
-        return node_id2parent_ids[node_id].issubset(selected_ids_set)
-
     nodes2lft, nodes2lst = map_lft_lst(head_nodes, node_id2child_ids, node_id2duration)
 
+    # number of not yet selected parents of each node, node is eligible when all of its parents are selected
+    parents_left = {node_id: len(parent_ids) for node_id, parent_ids in node_id2parent_ids.items()}
+    # eligible nodes split by priority groups, dict is used as insertion-ordered set
+    group2eligibles: dict[int, dict[str, None]] = defaultdict(dict)
+    group2eligibles[node_id2group_priority[head_nodes[0].id]][head_nodes[0].id] = None
+
     ordered_node_ids = []
-    selected_ids_set = set()
-    candidates = {head_nodes[0].id}
 
-    while candidates:
-        eligibles = [node_id for node_id in candidates if is_eligible(node_id)]
-        min_group_priority = min(node_id2group_priority[node_id] for node_id in eligibles)
-        eligibles = [node_id for node_id in eligibles if node_id2group_priority[node_id] == min_group_priority]
+    while group2eligibles:
+        min_group_priority = min(group2eligibles)
+        eligibles = list(group2eligibles[min_group_priority])
 
         priority_mapper = nodes2lft if rand.random() < 0.5 else nodes2lst
 
@@ -99,10 +100,15 @@ def lft_randomized_prioritization_core(head_nodes: list[GraphNode],
         selected_id = rand.choices(eligibles, weights=weights)[0]
 
         ordered_node_ids.append(selected_id)
-        selected_ids_set.add(selected_id)
-        candidates.remove(selected_id)
-        candidates.update([child_id for child_id in node_id2child_ids[selected_id]])
-
-    ordered_nodes = sorted(head_nodes, key=lambda node: ordered_node_ids.index(node.id))
+        del group2eligibles[min_group_priority][selected_id]
+        if not group2eligibles[min_group_priority]:
+            del group2eligibles[min_group_priority]
+        for child_id in node_id2child_ids[selected_id]:
+            parents_left[child_id] -= 1
+            if parents_left[child_id] == 0:
+                group2eligibles[node_id2group_priority[child_id]][child_id] = None
+
+    node_id2position = {node_id: i for i, node_id in enumerate(ordered_node_ids)}
+    ordered_nodes = sorted(head_nodes, key=lambda node: node_id2position[node.id])
 
     return ordered_nodes
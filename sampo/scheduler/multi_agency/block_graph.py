@@ -118,6 +118,22 @@ class BlockGraph:
 
         return ans
 
+    def levels(self) -> list[list[BlockNode]]:
+        """
+        Splits current 'BlockGraph' into levels: each block is placed to the level next to its latest parent,
+        so the blocks of one level don't depend on each other
+
+        :return: list of levels, each one is ordered as in `toposort`
+        """
+        depth = {}
+        levels = []
+        for node in self.toposort():
+            depth[node] = max((depth[parent] + 1 for parent in node.blocks_from), default=0)
+            if depth[node] == len(levels):
+                levels.append([])
+            levels[depth[node]].append(node)
+        return levels
+
     @staticmethod
     def add_edge(start: BlockNode, end: BlockNode):
         start.blocks_to.append(end)
@@ -1,16 +1,23 @@
+import os
+import time
+from concurrent.futures import Executor
 from copy import deepcopy
 from dataclasses import dataclass
+from functools import partial
+from math import ceil
 from typing import Callable
 
 import numpy as np
 import torch
 
+from sampo.base import SAMPO
 from sampo.scheduler.base import Scheduler
 from sampo.scheduler.generic import GenericScheduler
 from sampo.scheduler.multi_agency.block_graph import BlockGraph, BlockNode
 from sampo.scheduler.multi_agency.exception import NoSufficientAgents
 from sampo.scheduler.selection.neural_net import NeuralNetTrainer
 from sampo.scheduler.timeline.base import Timeline
+from sampo.scheduler.timeline.journal import JournaledTimeline, Checkpoint
 from sampo.scheduler.utils.obstruction import Obstruction
 from sampo.schemas import WorkerProductivityMode
 from sampo.schemas.contractor import Contractor
@@ -32,22 +39,41 @@ class Agent:
         self._contractors = contractors
         self._last_task_executed = Time(0)
         self._downtime = Time(0)
+        self._offer_checkpoint: Checkpoint | None = None
 
     def offer(self, wg: WorkGraph, parent_time: Time) -> tuple[Time, Time, Schedule, Timeline]:
         """
         Computes the offer from agent to manager. Handles all works from given wg.
+        The block is scheduled right into the agent's timeline after the checkpoint,
+        so the previous not confirmed offer is withdrawn.
+        If the timeline isn't journaled, the block is scheduled into its copy.
 
         :param wg: the given block of tasks
         :param parent_time: max end time of parent blocks
-        :return: offered start time, end time, resulting schedule and timeline before offering
+        :return: offered start time, end time, resulting schedule and timeline after offering
 
-        To apply returned offer, use `Agent#confirm`.
+        To apply returned offer, use `Agent#confirm`, otherwise `Agent#withdraw`.
         """
+        self.withdraw()
+        timeline = self._timeline
+        if isinstance(timeline, JournaledTimeline):
+            self._offer_checkpoint = timeline.checkpoint()
+        elif timeline is not None:
+            # the changes of the timeline can't be undone
+            timeline = deepcopy(timeline)
         schedule, start_time, timeline, _ = \
             self._scheduler.schedule_with_cache(wg, self._contractors,
-                                                assigned_parent_time=parent_time, timeline=deepcopy(self._timeline))[0]
+                                                assigned_parent_time=parent_time, timeline=timeline)[0]
         return start_time, schedule.execution_time, schedule, timeline
 
+    def withdraw(self):
+        """
+        Rolls back the agent's timeline to the state before the last not confirmed offer.
+        """
+        if self._offer_checkpoint is not None:
+            self._timeline.rollback(self._offer_checkpoint)
+            self._offer_checkpoint = None
+
     def confirm(self, timeline: Timeline, start: Time, end: Time):
         """
         Applies the given offer.
@@ -56,6 +82,12 @@ class Agent:
         :param start: global start time of confirmed block
         :param end: global end time of confirmed block
         """
+        if timeline is not self._timeline:
+            # the offer was computed on the other timeline, e.g. its copy or in the other process
+            self.withdraw()
+        elif self._offer_checkpoint is not None:
+            self._timeline.commit(self._offer_checkpoint)
+            self._offer_checkpoint = None
         self._timeline = timeline
         self.update_stat(start)
         # update last task statistic
@@ -121,44 +153,150 @@ class ScheduledBlock:
         return str(self)
 
 
+def _offers(wg: WorkGraph, parent_time: Time, agents: list[Agent]) -> list[tuple[Time, Time, Schedule, Timeline]]:
+    return [agent.offer(wg, parent_time) for agent in agents]
+
+
+def _split(agents: list[Agent], n_parts: int) -> list[list[Agent]]:
+    """
+    Splits the agents into at most `n_parts` consecutive parts of the same size
+    """
+    size = ceil(len(agents) / n_parts)
+    return [agents[i:i + size] for i in range(0, len(agents), size)]
+
+
+def _speculative_offers(agent: Agent, wgs: list[WorkGraph], parent_times: list[Time]) -> list[tuple[Time, Time]]:
+    """
+    Computes the agent's offers for the blocks one by one, each of them is withdrawn by the next one
+
+    :return: offered start and end times for each block
+    """
+    try:
+        return [agent.offer(wg, parent_time)[:2] for wg, parent_time in zip(wgs, parent_times)]
+    finally:
+        agent.withdraw()
+
+
 class Manager:
     """
     Manager entity representation in the multi-agent model
     Manager interact with agents
 
     :param agents: list of agents that has own scheduling algorithm and set of contractors
+    :param executor: if given, the agents make their offers concurrently by it, otherwise one by one.
+        The agents are split into one task per CPU, so the block is sent once to each task.
+        The agents shouldn't share the state, e.g. the schedulers. With the process executor the agents
+        are pickled for each auction, and the changes of their state except the offered timeline are lost.
+        The blocks of one level are auctioned speculatively, see `Manager#run_level_auctions`,
+        so the agents' schedulers should be deterministic
     """
-    def __init__(self, agents: list[Agent]):
+    def __init__(self, agents: list[Agent], executor: Executor | None = None):
         if len(agents) == 0:
             raise NoSufficientAgents('Manager can not work with empty list of agents')
         self._agents = agents
+        self._executor = executor
+        # wall times of the auctions in ms
+        self.auction_times: list[float] = []
+
+    def collect_offers(self, wg: WorkGraph, parent_time: Time) -> list[tuple[Time, Time, Schedule, Timeline]]:
+        """
+        Asks all agents for offers, concurrently if the manager has the executor.
+
+        :param wg: the given block of tasks
+        :param parent_time: max end time of parent blocks
+        :return: offers of the agents in the agents' order
+        """
+        if self._executor is not None and len(self._agents) > 1:
+            parts = _split(self._agents, min(len(self._agents), os.cpu_count() or 1))
+            return [offer for offers in self._executor.map(partial(_offers, wg, parent_time), parts)
+                    for offer in offers]
+        return _offers(wg, parent_time, self._agents)
 
-    # TODO Upgrade to supply the best parallelism
     def manage_blocks(self, bg: BlockGraph, logger: Callable[[str], None] = None) -> dict[str, ScheduledBlock]:
         """
         Runs the multi-agent system based on auction on given BlockGraph.
+        The blocks are auctioned level by level, see `Manager#run_level_auctions`.
         
         :param bg: 
         :param logger:
         :return: an index of resulting `ScheduledBlock`s built by ids of corresponding `WorkGraph`s
         """
         id2sblock = {}
-        for i, block in enumerate(bg.toposort()):
-            max_parent_time = max((id2sblock[parent.id].end_time for parent in block.blocks_from), default=Time(0)) + 1
-            start_time, end_time, agent_schedule, agent \
-                = self.run_auction_with_obstructions(block.wg, max_parent_time, block.obstruction)
-
-            assert start_time >= max_parent_time, f'Scheduler {agent._scheduler} does not handle parent_time!'
-
-            if logger and not block.is_service():
-                logger(f'{agent._scheduler}')
-            sblock = ScheduledBlock(wg=block.wg, agent=agent, schedule=agent_schedule,
-                                    start_time=start_time,
-                                    end_time=end_time)
-            id2sblock[sblock.id] = sblock
+        for level in bg.levels():
+            parent_times = [max((id2sblock[parent.id].end_time for parent in block.blocks_from), default=Time(0)) + 1
+                            for block in level]
+            auctions = self.run_level_auctions(level, parent_times)
+
+            for block, max_parent_time, (start_time, end_time, agent_schedule, agent) \
+                    in zip(level, parent_times, auctions):
+                assert start_time >= max_parent_time, f'Scheduler {agent._scheduler} does not handle parent_time!'
+
+                if logger and not block.is_service():
+                    logger(f'{agent._scheduler}')
+                sblock = ScheduledBlock(wg=block.wg, agent=agent, schedule=agent_schedule,
+                                        start_time=start_time,
+                                        end_time=end_time)
+                id2sblock[sblock.id] = sblock
 
         return id2sblock
 
+    def run_level_auctions(self, blocks: list[BlockNode], parent_times: list[Time]) \
+            -> list[tuple[Time, Time, Schedule, Agent]]:
+        """
+        Runs the auctions on the independent blocks of one level.
+        Without the executor the auctions are run one by one.
+        With the executor each agent computes its offers for all the blocks, agents do it concurrently,
+        against the agents' state before the level. Then the auctions are reconciled in the blocks' order:
+        the agents, that have won the previous blocks of the level, offer again, and the winner makes its offer
+        on its own timeline, so the result is the same as of the sequential auctions.
+        It holds only if the agents' schedulers are deterministic, i.e. schedule the same block on the same timeline
+        in the same way regardless of the previous calls. The randomized schedulers, e.g. the genetic one,
+        give the different result, because the speculative offers change the order of their random calls.
+
+        :param blocks: blocks, that don't depend on each other
+        :param parent_times: max parent time of each block
+        :return: results of `Manager#run_auction` for each block
+        """
+        if len(blocks) == 1 or self._executor is None:
+            return [self.run_auction_with_obstructions(block.wg, parent_time, block.obstruction)
+                    for block, parent_time in zip(blocks, parent_times)]
+
+        for block in blocks:
+            if block.obstruction:
+                block.obstruction.generate(block.wg)
+
+        n_agents = len(self._agents)
+        speculative_offers = list(self._executor.map(
+            partial(_speculative_offers, wgs=[block.wg for block in blocks], parent_times=parent_times),
+            self._agents))
+
+        auctions = []
+        winners: set[int] = set()
+        for i, (block, parent_time) in enumerate(zip(blocks, parent_times)):
+            start = time.time()
+            offers = {j: speculative_offers[j][i] for j in range(n_agents)}
+            for j in sorted(winners):
+                offers[j] = self._agents[j].offer(block.wg, parent_time)
+
+            best = min(range(n_agents), key=lambda j: offers[j][1])
+            best_agent = self._agents[best]
+            if best not in winners:
+                # only the times of the speculative offer are known, the agent makes it on its own timeline
+                offers[best] = best_agent.offer(block.wg, parent_time)
+            best_start_time, best_end_time, best_schedule, best_timeline = offers[best]
+
+            best_agent.confirm(best_timeline, best_start_time, best_end_time)
+            for agent in self._agents:
+                if agent.name != best_agent.name:
+                    agent.withdraw()
+                    agent.update_stat(best_start_time)
+            winners.add(best)
+
+            self._log_auction_time(block.wg, start)
+            auctions.append((best_start_time, best_end_time, best_schedule, best_agent))
+
+        return auctions
+
     def run_auction_with_obstructions(self, wg: WorkGraph, parent_time: Time = Time(0),
                                       obstruction: Obstruction | None = None):
         if obstruction:
@@ -173,13 +311,14 @@ class Manager:
         :param parent_time: max parent time of given block
         :return: best start time, end time and the agent that is able to support this working time
         """
+        start = time.time()
         best_start_time = 0
         best_end_time = Time.inf()
         best_schedule = None
         best_timeline = None
         best_agent = None
 
-        offers = [(agent, agent.offer(wg, parent_time)) for agent in self._agents]
+        offers = zip(self._agents, self.collect_offers(wg, parent_time))
 
         for offered_agent, (offered_start_time, offered_end_time, offered_schedule, offered_timeline) in offers:
             if offered_end_time < best_end_time:
@@ -188,16 +327,21 @@ class Manager:
                 best_schedule = offered_schedule
                 best_timeline = offered_timeline
                 best_agent = offered_agent
-        # To simulate stochastic behaviour
-        best_start_time, best_end_time, best_schedule, best_timeline = best_agent.offer(wg, parent_time)
+
         best_agent.confirm(best_timeline, best_start_time, best_end_time)
         for agent in self._agents:
             if agent.name != best_agent.name:
+                agent.withdraw()
                 agent.update_stat(best_start_time)
 
-        # print(best_agent.name)
+        self._log_auction_time(wg, start)
         return best_start_time, best_end_time, best_schedule, best_agent
 
+    def _log_auction_time(self, wg: WorkGraph, start: float):
+        auction_time = (time.time() - start) * 1000
+        self.auction_times.append(auction_time)
+        SAMPO.logger.info(f'Auction for block {wg.start.id} took {auction_time} ms')
+
 
 class StochasticManager(Manager):
     """
@@ -205,8 +349,8 @@ class StochasticManager(Manager):
     Manager interact with agents
     """
 
-    def __init__(self, agents: list[Agent]):
-        super().__init__(agents)
+    def __init__(self, agents: list[Agent], executor: Executor | None = None):
+        super().__init__(agents, executor)
         self._confidence = {agent.name: 1 for agent in agents}
 
     def run_auction(self, wg: WorkGraph, parent_time: Time = Time(0)) -> tuple[Time, Time, Schedule, Agent]:
@@ -217,14 +361,14 @@ class StochasticManager(Manager):
         :param parent_time: max parent time of given block
         :return: best start time, end time and the agent that is able to support this working time
         """
+        start = time.time()
         best_end_time = Time.inf()
         best_agent = None
 
-        def get_offer(agent: Agent):
+        for agent in self._agents:
             agent._scheduler.work_estimator.set_productivity_mode(WorkerProductivityMode.Static)
-            return agent, agent.offer(wg, parent_time)
 
-        offers = [get_offer(agent) for agent in self._agents]
+        offers = zip(self._agents, self.collect_offers(wg, parent_time))
 
         for offered_agent, (offered_start_time, offered_end_time, _, _) in offers:
             offered_end_time = offered_start_time + (offered_end_time - offered_start_time) * self._confidence[offered_agent.name]
@@ -246,10 +390,25 @@ class StochasticManager(Manager):
 
         for agent in self._agents:
             if agent.name != best_agent.name:
+                agent.withdraw()
                 agent.update_stat(best_start_time)
 
+        self._log_auction_time(wg, start)
         return best_start_time, best_end_time, best_schedule, best_agent
 
+    def run_level_auctions(self, blocks: list[BlockNode], parent_times: list[Time]) \
+            -> list[tuple[Time, Time, Schedule, Agent]]:
+        """
+        Runs the auctions on the independent blocks of one level sequentially.
+        The winner makes its offer in the stochastic mode, so the offers can't be collected speculatively.
+
+        :param blocks: blocks, that don't depend on each other
+        :param parent_times: max parent time of each block
+        :return: results of `StochasticManager#run_auction` for each block
+        """
+        return [self.run_auction_with_obstructions(block.wg, parent_time, block.obstruction)
+                for block, parent_time in zip(blocks, parent_times)]
+
 
 class NeuralManager:
     """
@@ -280,6 +439,22 @@ class NeuralManager:
         self.algorithms = algorithms
         self.blocks = blocks
         self.encoding_blocks = encoding_blocks
+        self._predictions: dict[str, tuple[int, np.ndarray]] | None = None
+
+    def predict_blocks(self) -> dict[str, tuple[int, np.ndarray]]:
+        """
+        Predicts the scheduling algorithm and the contractor's resources for all the blocks at once.
+        The predictions are computed with one batched forward pass of each network and cached.
+
+        :return: index of the predicted algorithm and the predicted resources by ids of the blocks
+        """
+        if self._predictions is None:
+            encodings = torch.stack(self.encoding_blocks)
+            algorithms = self.algo_trainer.predict(encodings)
+            contractors = np.asarray(self.contractor_trainer.predict(encodings))
+            self._predictions = {block.id: (int(algorithm), contractor)
+                                 for block, algorithm, contractor in zip(self.blocks, algorithms, contractors)}
+        return self._predictions
 
     # TODO Upgrade to supply the best parallelism
     def manage_blocks(self, logger: Callable[[str], None] = None) -> dict[str, ScheduledBlock]:
@@ -324,11 +499,8 @@ class NeuralManager:
         :return: best start time, end time and the agent that is able to support this working time
         """
 
-        wg_encoding = [self.encoding_blocks[index]]
-        predicted = self.algo_trainer.predict(wg_encoding)
-        predict_proba = self.algo_trainer.predict_proba(wg_encoding)
-        best_algo = type(self.algorithms[int(predicted)])
-        best_contractor = np.asarray(self.contractor_trainer.predict([self.encoding_blocks[index]]))[0]
+        predicted, best_contractor = self.predict_blocks()[self.blocks[index].id]
+        best_algo = type(self.algorithms[predicted])
 
         time_algo_agents = []
         not_time_algo_agents = []
@@ -34,3 +34,28 @@ class ResourceOptimizer(ABC):
         :param get_finish_time: optimization function that should give execution time based on worker team
         """
         ...
+
+
+def memoize_finish_time(get_finish_time: Callable[[list[Worker]], Time]) -> Callable[[list[Worker]], Time]:
+    """
+    Wraps finish time function with memo table keyed by amounts of workers in the team.
+    Search algorithms probe the same amounts many times, and the result doesn't change during one search.
+
+    :param get_finish_time: optimization function that should give execution time based on worker team
+    :return: memoized function
+    """
+    if getattr(get_finish_time, 'is_memoized', False):
+        return get_finish_time
+
+    memo: dict[tuple[int, ...], Time] = {}
+
+    def memoized_finish_time(worker_team: list[Worker]) -> Time:
+        key = tuple(int(worker.count) for worker in worker_team)
+        finish_time = memo.get(key)
+        if finish_time is None:
+            finish_time = get_finish_time(worker_team)
+            memo[key] = finish_time
+        return finish_time
+
+    memoized_finish_time.is_memoized = True
+    return memoized_finish_time
@@ -2,7 +2,7 @@ from typing import Callable
 
 import numpy as np
 
-from sampo.scheduler.resource.base import ResourceOptimizer
+from sampo.scheduler.resource.base import ResourceOptimizer, memoize_finish_time
 from sampo.scheduler.utils import WorkerContractorPool
 from sampo.schemas.resources import Worker
 from sampo.schemas.time import Time
@@ -35,6 +35,8 @@ class CoordinateDescentResourceOptimizer(ResourceOptimizer):
         :param get_finish_time: optimization function that should give execution time based on the worker team
         """
 
+        get_finish_time = memoize_finish_time(get_finish_time)
+
         def fitness(worker_count: np.ndarray):
             """
             Function that counts finish time with a current set of resources.
@@ -2,7 +2,7 @@ from typing import Callable
 
 import numpy as np
 
-from sampo.scheduler.resource.base import ResourceOptimizer
+from sampo.scheduler.resource.base import ResourceOptimizer, memoize_finish_time
 from sampo.scheduler.resource.coordinate_descent import CoordinateDescentResourceOptimizer
 from sampo.scheduler.utils import WorkerContractorPool
 from sampo.schemas.resources import Worker
@@ -35,6 +35,8 @@ class FullScanResourceOptimizer(ResourceOptimizer):
         :param get_finish_time: optimization function that should give execution time based on worker team
         """
 
+        get_finish_time = memoize_finish_time(get_finish_time)
+
         # TODO Handle optimize_array
         def fitness(worker_count: np.ndarray):
             """
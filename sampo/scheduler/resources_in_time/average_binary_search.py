@@ -1,6 +1,9 @@
 from copy import deepcopy
+from functools import partial
 
+from sampo.base import SAMPO
 from sampo.scheduler.base import Scheduler
+from sampo.scheduler.generic import GenericScheduler
 from sampo.scheduler.resource.average_req import AverageReqResourceOptimizer
 from sampo.scheduler.timeline.base import Timeline
 from sampo.schemas.contractor import Contractor
@@ -10,17 +13,26 @@ from sampo.schemas.landscape import LandscapeConfiguration
 from sampo.schemas.schedule import Schedule
 from sampo.schemas.schedule_spec import ScheduleSpec
 from sampo.schemas.time import Time
+from sampo.schemas.time_estimator import WorkTimeEstimator
 
 
 class AverageBinarySearchResourceOptimizingScheduler:
     """
     The scheduler optimizes resources to deadline.
-    Scheduler uses binary search over the resources to optimize them.
+    Scheduler uses k-ary search over the resources to optimize them:
+    on each round `arity - 1` values of the average coefficient are scheduled by the computational backend.
     """
 
-    def __init__(self, base_scheduler: Scheduler):
+    def __init__(self, base_scheduler: Scheduler, arity: int = 2):
+        """
+        :param base_scheduler: scheduler to run with different resources
+        :param arity: number of parts the search interval is split into on each round, 2 gives binary search.
+        The greater values are useful with the backend, that computes the values of the round in parallel
+        """
+        assert arity >= 2
         self._base_scheduler = base_scheduler
         self._resource_optimizer = AverageReqResourceOptimizer()
+        self._arity = arity
         base_scheduler.resource_optimizer = self._resource_optimizer
 
     def schedule_with_cache(self, wg: WorkGraph,
@@ -31,6 +43,25 @@ class AverageBinarySearchResourceOptimizingScheduler:
                             assigned_parent_time: Time = Time(0),
                             landscape: LandscapeConfiguration = LandscapeConfiguration()) \
             -> tuple[tuple[Schedule, Time, Timeline, list[GraphNode]], ScheduleSpec]:
+        if not isinstance(self._base_scheduler, GenericScheduler):
+            return self._search(wg, contractors, deadline, spec, validate, assigned_parent_time, landscape)
+
+        # prioritization doesn't depend on resources, so it's computed once for the whole search
+        prioritization = self._base_scheduler.prioritization
+        self._base_scheduler.prioritization = _cache_prioritization(prioritization)
+        try:
+            return self._search(wg, contractors, deadline, spec, validate, assigned_parent_time, landscape)
+        finally:
+            self._base_scheduler.prioritization = prioritization
+
+    def _search(self, wg: WorkGraph,
+                contractors: list[Contractor],
+                deadline: Time,
+                spec: ScheduleSpec,
+                validate: bool,
+                assigned_parent_time: Time,
+                landscape: LandscapeConfiguration) \
+            -> tuple[tuple[Schedule, Time, Timeline, list[GraphNode]], ScheduleSpec]:
         def call_scheduler(k: float, inner_spec: ScheduleSpec) \
                 -> tuple[tuple[Schedule, Time, Timeline, list[GraphNode]], ScheduleSpec]:
             self._resource_optimizer.k = k
@@ -42,10 +73,10 @@ class AverageBinarySearchResourceOptimizingScheduler:
                 return (None, Time.inf(), None, None), inner_spec
 
         def fitness(k: float, inner_spec: ScheduleSpec):
-            result = call_scheduler(k, inner_spec)[0][0].execution_time
+            schedule = call_scheduler(k, inner_spec)[0][0]
             # if result > deadline:
             #     result = Time.inf()
-            return result
+            return schedule.execution_time if schedule is not None else Time.inf()
 
         copied_spec = deepcopy(spec)
         # FIXME Investigate why `spec` given to this method can be saved from previous call and remove this
@@ -87,19 +118,47 @@ class AverageBinarySearchResourceOptimizingScheduler:
             best_right_m = k_min
 
             while k_max - k_min > 0.05:
-                m = (k_min + k_max) / 2
-                time_m = fitness(m, copied_spec)
-                if time_m > deadline:
-                    if abs(time_m.value - deadline.value) <= best_right_fit:
-                        best_right_fit = abs(time_m.value - deadline.value)
-                        best_right_m = m
-                    k_max = m
-                else:
-                    if abs(time_m.value - deadline.value) <= best_left_fit:
-                        best_left_fit = abs(time_m.value - deadline.value)
-                        best_left_m = m
-                    k_min = m
+                ms = [k_min + (k_max - k_min) * i / self._arity for i in range(1, self._arity)]
+                # the values of the round are independent, so the backend can compute them in parallel
+                times = SAMPO.backend.map_with_timeout(partial(fitness, inner_spec=copied_spec), ms)
+
+                # the new interval ends at the first value that breaks the deadline
+                new_k_min, new_k_max = k_min, k_max
+                for m, time_m in zip(ms, times):
+                    if time_m > deadline:
+                        if abs(time_m.value - deadline.value) <= best_right_fit:
+                            best_right_fit = abs(time_m.value - deadline.value)
+                            best_right_m = m
+                        new_k_max = min(new_k_max, m)
+                    else:
+                        if abs(time_m.value - deadline.value) <= best_left_fit:
+                            best_left_fit = abs(time_m.value - deadline.value)
+                            best_left_m = m
+                        if m < new_k_max:
+                            new_k_min = m
+                k_min, k_max = new_k_min, new_k_max
 
             if best_left_fit < Time.inf():
                 return call_scheduler(best_left_m, copied_spec)
             return call_scheduler(best_right_m, copied_spec)
+
+
+def _cache_prioritization(prioritization):
+    """
+    Caches the prioritization by the identities of the head nodes and the work estimator,
+    so the same graph is prioritized once, and the other arguments get their own result
+    """
+    # the cached values keep the nodes and the estimator alive, so their identities aren't reused
+    cache: dict[tuple, tuple[list[GraphNode], WorkTimeEstimator]] = {}
+
+    def cached_prioritization(head_nodes: list[GraphNode],
+                              node_id2parent_ids: dict[str, set[str]],
+                              node_id2child_ids: dict[str, set[str]],
+                              work_estimator: WorkTimeEstimator) -> list[GraphNode]:
+        key = (tuple(map(id, head_nodes)), id(work_estimator))
+        if key not in cache:
+            cache[key] = (prioritization(head_nodes, node_id2parent_ids, node_id2child_ids, work_estimator),
+                          work_estimator)
+        return cache[key][0]
+
+    return cached_prioritization
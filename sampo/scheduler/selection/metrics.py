@@ -1,12 +1,13 @@
-from collections import defaultdict
 from math import ceil
+from typing import TYPE_CHECKING
 
 import numpy as np
-import torch
 
-from sampo.scheduler.topological.base import TopologicalScheduler
 from sampo.schemas.graph import WorkGraph
 
+if TYPE_CHECKING:
+    import torch
+
 
 def one_hot_encode(v, max_v):
     res = [float(0) for _ in range(max_v)]
@@ -14,7 +15,7 @@ def one_hot_encode(v, max_v):
     return res
 
 
-def one_hot_decode(v: torch.Tensor):
+def one_hot_decode(v: 'torch.Tensor'):
     for i in range(len(v)):
         if v[i] == 1:
             return i
@@ -28,44 +29,52 @@ def metric_resource_constrainedness(wg: WorkGraph) -> list[float]:
     :param wg: Work graph
     :return: List of RC coefficients for each resource type
     """
-    resource_dict = defaultdict(lambda: [0, 0])
+    arrays = wg.arrays
+    return (arrays.req_mask.sum(axis=0) / arrays.req_volume.sum(axis=0)).tolist()
+
+
+def _neighbours(indptr: np.ndarray, indices: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+    """
+    Concatenates the CSR rows of the given vertices
+    """
+    starts = indptr[vertices]
+    lengths = indptr[vertices + 1] - starts
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return indices[np.repeat(starts, lengths) + offsets]
+
+
+def _node_depths(wg: WorkGraph) -> np.ndarray:
+    """
+    Computes the length of the longest path from the start to each node with the layered Kahn's algorithm
+
+    :param wg: Work graph
+    :return: depth of each node in the order of `wg.nodes`
+    """
+    arrays = wg.arrays
+    in_degree = np.diff(arrays.parents_indptr)
+    depths = np.zeros(arrays.vertex_count, dtype=np.int64)
 
-    for node in wg.nodes:
-        for req in node.work_unit.worker_reqs:
-            resource_dict[req.kind][0] += 1
-            resource_dict[req.kind][1] += req.volume
+    level = np.flatnonzero(in_degree == 0)
+    depth = 0
+    while len(level) > 0:
+        depths[level] = depth
+        children = _neighbours(arrays.children_indptr, arrays.children_indices, level)
+        np.subtract.at(in_degree, children, 1)
+        level = np.unique(children[in_degree[children] == 0])
+        depth += 1
 
-    return [value[0] / value[1] for name, value in resource_dict.items()]
+    return depths
 
 
 def metric_graph_parallelism_degree(wg: WorkGraph) -> list[float]:
+    """
+    The widths of the graph's levels relative to the vertex count, aggregated into 8 batches
+
+    :param wg: Work graph
+    :return: List of the mean relative widths of the levels' batches
+    """
     batches = 8
-    parallelism_degree = []
-    current_node = wg.start
-    node_count = wg.vertex_count
-
-    stack = [current_node]
-    while stack:
-        tmp_stack = set()
-        parallelism_coef = 0
-
-        for i in range(len(stack)):
-            if stack[i] == 0:
-                continue
-            for j in range(i + 1, len(stack)):
-                if stack[j] == 0:
-                    continue
-                if stack[j] in stack[i].children:
-                    stack[j] = 0
-
-        for node in stack:
-            if node == 0:
-                continue
-            parallelism_coef += 1
-            for child in node.children:
-                tmp_stack.add(child)
-        parallelism_degree.append(parallelism_coef / node_count)
-        stack = list(tmp_stack)
+    parallelism_degree = np.bincount(_node_depths(wg)) / wg.vertex_count
 
     step = ceil(len(parallelism_degree) / batches)
     aggregated_degree = [0] * batches
@@ -76,19 +85,7 @@ def metric_graph_parallelism_degree(wg: WorkGraph) -> list[float]:
 
 
 def metric_longest_path(wg: WorkGraph) -> float:
-    scheduler = TopologicalScheduler()
-    stack = scheduler.prioritization(wg, None)
-
-    dist = {}
-    for node in stack:
-        dist[node.id] = 0
-
-    while stack:
-        node = stack.pop()
-        for child in node.children:
-            dist[child.id] = max(dist[child.id], dist[node.id] + 1)
-
-    return max(dist.values())
+    return int(_node_depths(wg).max())
 
 
 def metric_vertex_count(wg: WorkGraph) -> float:
@@ -100,16 +97,16 @@ def metric_average_work_per_activity(wg: WorkGraph) -> float:
 
 
 def metric_relative_max_children(wg: WorkGraph) -> float:
-    return max((len(node.children) for node in wg.nodes if node.children)) / wg.vertex_count
+    return int(np.diff(wg.arrays.children_indptr).max()) / wg.vertex_count
 
 
 def metric_average_resource_usage(wg: WorkGraph) -> float:
-    return sum(sum((req.min_count + req.max_count) / 2 for req in node.work_unit.worker_reqs)
-               for node in wg.nodes) / wg.vertex_count
+    arrays = wg.arrays
+    return float(((arrays.req_min + arrays.req_max) / 2)[arrays.req_mask].sum()) / wg.vertex_count
 
 
 def metric_relative_max_parents(wg: WorkGraph) -> float:
-    return max((len(node.parents) for node in wg.nodes if node.parents)) / wg.vertex_count
+    return int(np.diff(wg.arrays.parents_indptr).max()) / wg.vertex_count
 
 
 def encode_graph(wg: WorkGraph) -> list[float]:
@@ -35,7 +35,8 @@ class NeuralNet(nn.Module):
     def forward(self, X):
         X = self.model(X)
         if self.task_type == NeuralNetType.CLASSIFICATION:
-            X = F.softmax(X, dim=0)
+            # the last dim is the dim of the classes both for the single sample and for the batch
+            X = F.softmax(X, dim=-1)
         else:
             X = X
         return X
@@ -104,37 +105,35 @@ class NeuralNetTrainer:
         )
         return val_score / total, val_loss / total
 
-    def predict(self, x: list):
+    def _forward_batch(self, x) -> torch.Tensor:
+        """
+        Runs one forward pass over all the given samples on the model's device.
+        Each row of the result is equal to the model's output on the corresponding sample.
+
+        :param x: samples as np.ndarray, tensor or list of tensors
+        :return: outputs on CPU
+        """
         if isinstance(x, np.ndarray):
             x = torch.from_numpy(x.astype(np.float32))
-        result = []
+        elif not isinstance(x, torch.Tensor):
+            x = torch.stack([torch.as_tensor(image) for image in x])
 
-        with torch.no_grad():
-            for image in x:
-                image = image.to(self._device)
-                outputs = self.model(image)
+        with torch.inference_mode():
+            outputs = self.model(x.to(next(self.model.parameters()).device))
+        return outputs.cpu()
 
-                if self.model.task_type is NeuralNetType.CLASSIFICATION:
-                    _, predicted = torch.max(outputs.data, 0)
-                    result.append(torch.tensor(one_hot_encode(predicted, 2)))
-                elif self.model.task_type is NeuralNetType.REGRESSION:
-                    result.append(outputs)
+    def predict(self, x: list):
+        outputs = self._forward_batch(x)
 
         if self.model.task_type is NeuralNetType.CLASSIFICATION:
-            return np.asarray([torch.max(v) for v in result])
+            predicted = torch.argmax(outputs, dim=1)
+            result = torch.tensor([one_hot_encode(int(v), 2) for v in predicted])
+            return torch.max(result, dim=1).values.numpy()
         elif self.model.task_type is NeuralNetType.REGRESSION:
-            return np.asarray([v.numpy() for v in result])
+            return outputs.numpy()
 
     def predict_proba(self, x: list) -> np.array:
-        if isinstance(x, np.ndarray):
-            x = torch.from_numpy(x.astype(np.float32))
-        result = []
-        with torch.no_grad():
-            for image in x:
-                # image = image.to(self._device)
-                outputs = self.model(image)
-                result.append(outputs)
-        return np.array([v.numpy() for v in result])
+        return self._forward_batch(x).numpy()
 
     def save_checkpoint(self, tmp_checkpoint_dir, file_name):
         checkpoint_path = os.path.join(tmp_checkpoint_dir, file_name)
@@ -1,9 +1,11 @@
 import math
 from collections import defaultdict
+from typing import Iterator
 
 from sortedcontainers import SortedList
 
 from sampo.scheduler.timeline.base import BaseSupplyTimeline
+from sampo.scheduler.timeline.journal import JournaledTimeline
 from sampo.scheduler.timeline.platform_timeline import PlatformTimeline
 from sampo.schemas.exceptions import NotEnoughMaterialsInDepots, NoDepots, NoAvailableResources
 from sampo.schemas.graph import GraphNode
@@ -11,32 +13,15 @@ from sampo.schemas.landscape import LandscapeConfiguration, ResourceHolder, Vehi
 from sampo.schemas.landscape_graph import LandGraphNode
 from sampo.schemas.resources import Material
 from sampo.schemas.time import Time
-from sampo.schemas.types import ScheduleEvent, EventType
+from sampo.schemas.types import ScheduleEvent, EventType, schedule_event_cmp
 
 
-class HybridSupplyTimeline(BaseSupplyTimeline):
+class HybridSupplyTimeline(BaseSupplyTimeline, JournaledTimeline):
     """
     Material Timeline that implements the hybrid approach of resource supply -
     compares the time of resource delivery to work start and the time of delivery starting from the work start
     """
     def __init__(self, landscape_config: LandscapeConfiguration):
-
-        def event_cmp(event: ScheduleEvent | Time | tuple[Time, int, int]) -> tuple[Time, int, int]:
-            if isinstance(event, ScheduleEvent):
-                if event.event_type is EventType.INITIAL:
-                    return Time(-1), -1, event.event_type.priority
-
-                return event.time, event.seq_id, event.event_type.priority
-
-            if isinstance(event, Time):
-                # instances of Time must be greater than almost all ScheduleEvents with same time point
-                return event, Time.inf().value, 2
-
-            if isinstance(event, tuple):
-                return event
-
-            raise ValueError(f'Incorrect type of value: {type(event)}')
-
         self._platform_timeline = PlatformTimeline(landscape_config)
         self._timeline: dict[str, dict[str, SortedList[ScheduleEvent]]] = {}
         self._task_index = 0
@@ -47,10 +32,14 @@ class HybridSupplyTimeline(BaseSupplyTimeline):
             for mat_id, mat_dict in resource.items():
                 self._timeline[mat_id] = {
                     mat[0]: SortedList(iterable=(ScheduleEvent(-1, EventType.INITIAL, Time(0), None, mat[1]),),
-                                       key=event_cmp)
+                                       key=schedule_event_cmp)
                     for mat in mat_dict.items()
                 }
 
+    def _journaled(self) -> Iterator[JournaledTimeline]:
+        yield self
+        yield from self._platform_timeline._journaled()
+
     @staticmethod
     def _get_necessary_vehicles_amount(depot: ResourceHolder, materials: list[Material]) -> int:
         vehicle_capacity = depot.vehicles[0].capacity
@@ -399,8 +388,7 @@ class HybridSupplyTimeline(BaseSupplyTimeline):
             res_holder_state = self._timeline[res_holder_id]
 
             for res_info in res_holder_info:
-                task_index = self._task_index
-                self._task_index += 1
+                task_index = self._increment_task_index()
 
                 res_name, res_count, start_time, end_time = res_info
                 res_state = res_holder_state[res_name]
@@ -413,9 +401,10 @@ class HybridSupplyTimeline(BaseSupplyTimeline):
 
                 for event in res_state[start_idx: end_idx]:
                     assert event.available_workers_count >= res_count
-                    event.available_workers_count -= res_count
+                    self._decrease_count(event, res_count)
 
-                res_state.add(
+                self._add_event(
+                    res_state,
                     ScheduleEvent(task_index, EventType.START, start_time, None, available_res_count - res_count)
                 )
 
@@ -426,7 +415,7 @@ class HybridSupplyTimeline(BaseSupplyTimeline):
                 else:
                     end_count = res_state[end_idx].available_workers_count + res_count
 
-                res_state.add(ScheduleEvent(task_index, EventType.END, end_time, None, end_count))
+                self._add_event(res_state, ScheduleEvent(task_index, EventType.END, end_time, None, end_count))
 
     def _validate(self, res_holder_id: str, res_info: tuple[str, int, Time, Time]):
         res_holder_state = self._timeline[res_holder_id]
@@ -442,4 +431,4 @@ class HybridSupplyTimeline(BaseSupplyTimeline):
 
         for event in res_state[start_idx: end_idx]:
             assert event.available_workers_count >= res_count
-            event.available_workers_count -= res_count
+            self._decrease_count(event, res_count)
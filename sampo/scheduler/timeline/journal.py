@@ -0,0 +1,115 @@
+from typing import Any, Iterator
+
+from sortedcontainers import SortedList
+
+from sampo.schemas.types import ScheduleEvent
+
+Checkpoint = tuple[int, ...]
+
+
+class JournaledTimeline:
+    """
+    Transactional API of the timelines.
+
+    While there is an open checkpoint, all the mutations of the timeline are journaled,
+    so the speculative scheduling can be undone by `rollback` instead of copying the whole timeline.
+    Timelines, that hold the nested ones, should list them in `_journaled`.
+    """
+
+    _journal: list[tuple] | None = None
+    _open_checkpoints: int = 0
+
+    def _journaled(self) -> Iterator['JournaledTimeline']:
+        """
+        :return: this timeline and all the nested timelines, that should be checkpointed with it
+        """
+        yield self
+
+    def checkpoint(self) -> Checkpoint:
+        """
+        Opens the checkpoint, after that all the changes of the timeline can be undone
+
+        :return: token to pass to `rollback` or `commit`
+        """
+        token = []
+        for timeline in self._journaled():
+            if timeline._journal is None:
+                timeline._journal = []
+            timeline._open_checkpoints += 1
+            token.append(len(timeline._journal))
+        return tuple(token)
+
+    def rollback(self, token: Checkpoint):
+        """
+        Undoes all the changes made after the checkpoint and closes it
+
+        :param token: token returned by `checkpoint`
+        """
+        for timeline, length in zip(self._journaled(), token):
+            journal = timeline._journal
+            while len(journal) > length:
+                _undo(*journal.pop())
+            timeline._close_checkpoint()
+
+    def commit(self, token: Checkpoint):
+        """
+        Keeps all the changes made after the checkpoint and closes it.
+        The changes still can be undone by the rollback of the outer checkpoint
+
+        :param token: token returned by `checkpoint`
+        """
+        for timeline, _ in zip(self._journaled(), token):
+            timeline._close_checkpoint()
+
+    def __getstate__(self):
+        # copies of the timeline start without the open checkpoints
+        state = self.__dict__.copy()
+        state.pop('_journal', None)
+        state.pop('_open_checkpoints', None)
+        return state
+
+    def _close_checkpoint(self):
+        self._open_checkpoints -= 1
+        if self._open_checkpoints == 0:
+            self._journal = None
+
+    def _add_event(self, state: SortedList[ScheduleEvent], event: ScheduleEvent):
+        state.add(event)
+        if self._journal is not None:
+            self._journal.append(('add', state, event))
+
+    def _decrease_count(self, event: ScheduleEvent, count: int):
+        event.available_workers_count -= count
+        if self._journal is not None:
+            self._journal.append(('decrease', event, count))
+
+    def _increment_task_index(self) -> int:
+        """
+        :return: the task index before increment
+        """
+        task_index = self._task_index
+        self._task_index += 1
+        if self._journal is not None:
+            self._journal.append(('set', self, '_task_index', task_index))
+        return task_index
+
+    def _save_list(self, items: list):
+        """
+        Saves the list content before it's changed in place
+        """
+        if self._journal is not None:
+            self._journal.append(('list', items, list(items)))
+
+
+def _undo(action: str, target: Any, *args):
+    match action:
+        case 'add':
+            target.remove(args[0])
+        case 'decrease':
+            target.available_workers_count += args[0]
+        case 'set':
+            setattr(target, *args)
+        case 'list':
+            target[:] = args[0]
+        case _:
+            raise ValueError(f'Unknown journal action: {action}')
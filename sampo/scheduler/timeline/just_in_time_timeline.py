@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import Optional, Iterator
 
 from sampo.scheduler.timeline.base import Timeline
 from sampo.scheduler.timeline.hybrid_supply_timeline import HybridSupplyTimeline
+from sampo.scheduler.timeline.journal import JournaledTimeline
 from sampo.scheduler.timeline.zone_timeline import ZoneTimeline
 from sampo.scheduler.timeline.utils import get_exec_times_from_assigned_time_for_chain
 from sampo.scheduler.utils import WorkerContractorPool
@@ -15,7 +16,7 @@ from sampo.schemas.time import Time
 from sampo.schemas.time_estimator import WorkTimeEstimator, DefaultWorkEstimator
 
 
-class JustInTimeTimeline(Timeline):
+class JustInTimeTimeline(Timeline, JournaledTimeline):
     """
     Timeline that stored the time of resources release.
     For each contractor and worker type store a descending list of pairs of time and
@@ -32,6 +33,11 @@ class JustInTimeTimeline(Timeline):
         self._material_timeline = HybridSupplyTimeline(landscape)
         self.zone_timeline = ZoneTimeline(landscape.zone_config)
 
+    def _journaled(self) -> Iterator[JournaledTimeline]:
+        yield self
+        yield from self._material_timeline._journaled()
+        yield from self.zone_timeline._journaled()
+
     def find_min_start_time_with_additional(self, node: GraphNode,
                                             worker_team: list[Worker],
                                             node2swork: dict[GraphNode, ScheduledWork],
@@ -205,6 +211,7 @@ class JustInTimeTimeline(Timeline):
             # squash all the timeline to the last point
             for worker in worker_team:
                 worker_timeline = self._timeline[(worker.contractor_id, worker.name)]
+                self._save_list(worker_timeline)
                 count_workers = sum([count for _, count in worker_timeline])
                 worker_timeline.clear()
                 worker_timeline.append((finish_time, count_workers))
@@ -215,6 +222,7 @@ class JustInTimeTimeline(Timeline):
             for worker in worker_team:
                 needed_count = worker.count
                 worker_timeline = self._timeline[(worker.contractor_id, worker.name)]
+                self._save_list(worker_timeline)
                 # Consume needed workers
                 while needed_count > 0:
                     next_time, next_count = worker_timeline.pop()
@@ -1,10 +1,11 @@
 from collections import deque
-from typing import Optional, Union
+from typing import Optional, Iterator
 
 from sortedcontainers import SortedList
 
 from sampo.scheduler.timeline.base import Timeline
 from sampo.scheduler.timeline.hybrid_supply_timeline import HybridSupplyTimeline
+from sampo.scheduler.timeline.journal import JournaledTimeline
 from sampo.scheduler.timeline.zone_timeline import ZoneTimeline
 from sampo.scheduler.timeline.utils import get_exec_times_from_assigned_time_for_chain
 from sampo.scheduler.utils import WorkerContractorPool
@@ -17,11 +18,11 @@ from sampo.schemas.schedule_spec import WorkSpec
 from sampo.schemas.scheduled_work import ScheduledWork
 from sampo.schemas.time import Time
 from sampo.schemas.time_estimator import WorkTimeEstimator, DefaultWorkEstimator
-from sampo.schemas.types import ScheduleEvent, EventType
+from sampo.schemas.types import ScheduleEvent, EventType, schedule_event_cmp
 from sampo.utilities.collections_util import build_index
 
 
-class MomentumTimeline(Timeline):
+class MomentumTimeline(Timeline, JournaledTimeline):
     """
     Timeline that stores the intervals in which resources is occupied.
     """
@@ -31,28 +32,6 @@ class MomentumTimeline(Timeline):
         This should create an empty Timeline from given a list of tasks and contractor list.
         """
 
-        # using  time, seq_id and event_type we can guarantee that
-        # there may be only one possible order in cases:
-        # (a) when events have the same time
-        # (in this cases we need both time and seq_id to properly handle available_workers processing logic)
-        # (b) when events have the same time and their start and end matches
-        # (service tasks for instance may have zero length)
-        def event_cmp(event: Union[ScheduleEvent, Time, tuple[Time, int, int]]) -> tuple[Time, int, int]:
-            if isinstance(event, ScheduleEvent):
-                if event.event_type is EventType.INITIAL:
-                    return Time(-1), -1, event.event_type.priority
-
-                return event.time, event.seq_id, event.event_type.priority
-
-            if isinstance(event, Time):
-                # instances of Time must be greater than almost all ScheduleEvents with same time point
-                return event, Time.inf().value, 2
-
-            if isinstance(event, tuple):
-                return event
-
-            raise ValueError(f'Incorrect type of value: {type(event)}')
-
         # to efficiently search for time slots for tasks to be scheduled
         # we need to keep track of starts and ends of previously scheduled tasks
         # and remember how many workers of a certain type is available at this particular moment
@@ -63,7 +42,7 @@ class MomentumTimeline(Timeline):
                     self._timeline[contractor] = {}
                 self._timeline[contractor][worker_name] = SortedList(
                     iterable=(ScheduleEvent(-1, EventType.INITIAL, Time(0), None, worker.count),),
-                    key=event_cmp
+                    key=schedule_event_cmp
                 )
 
         # internal index, earlier - task_index parameter for schedule method
@@ -71,6 +50,11 @@ class MomentumTimeline(Timeline):
         self._material_timeline = HybridSupplyTimeline(landscape)
         self.zone_timeline = ZoneTimeline(landscape.zone_config)
 
+    def _journaled(self) -> Iterator[JournaledTimeline]:
+        yield self
+        yield from self._material_timeline._journaled()
+        yield from self.zone_timeline._journaled()
+
     def find_min_start_time_with_additional(self,
                                             node: GraphNode,
                                             worker_team: list[Worker],
@@ -355,8 +339,7 @@ class MomentumTimeline(Timeline):
         # Also, add events of the start and the end to worker's specializations
         # of the chosen contractor.
 
-        task_index = self._task_index
-        self._task_index += 1
+        task_index = self._increment_task_index()
 
         # experimental logics lightening. debugging showed its efficiency.
 
@@ -370,11 +353,12 @@ class MomentumTimeline(Timeline):
             # updating all events in between the start and the end of our current task
             for event in state[start_idx: end_idx]:
                 assert event.available_workers_count >= w.count
-                event.available_workers_count -= w.count
+                self._decrease_count(event, w.count)
 
             assert available_workers_count >= w.count
 
-            state.add(ScheduleEvent(task_index, EventType.START, start, None, available_workers_count - w.count))
+            self._add_event(state, ScheduleEvent(task_index, EventType.START, start, None,
+                                                 available_workers_count - w.count))
 
             # move the index on time when resources of the work will be freed
             end_idx = state.bisect_right(end) - 1
@@ -386,7 +370,7 @@ class MomentumTimeline(Timeline):
                 # time when resources will be freed is not in timeline
                 end_count = state[end_idx].available_workers_count + w.count
 
-            state.add(ScheduleEvent(task_index, EventType.END, end, None, end_count))
+            self._add_event(state, ScheduleEvent(task_index, EventType.END, end, None, end_count))
 
     def schedule(self,
                  node: GraphNode,
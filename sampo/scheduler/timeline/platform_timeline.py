@@ -2,40 +2,24 @@ import uuid
 
 from sortedcontainers import SortedList
 
+from sampo.scheduler.timeline.journal import JournaledTimeline
 from sampo.schemas.graph import GraphNode
 from sampo.schemas.landscape import LandscapeConfiguration
 from sampo.schemas.landscape_graph import LandGraphNode
 from sampo.schemas.resources import Material
 from sampo.schemas.time import Time
-from sampo.schemas.types import ScheduleEvent, EventType
+from sampo.schemas.types import ScheduleEvent, EventType, schedule_event_cmp
 
 
-class PlatformTimeline:
+class PlatformTimeline(JournaledTimeline):
     def __init__(self, landscape_config: LandscapeConfiguration):
-
-        def event_cmp(event: ScheduleEvent | Time | tuple[Time, int, int]) -> tuple[Time, int, int]:
-            if isinstance(event, ScheduleEvent):
-                if event.event_type is EventType.INITIAL:
-                    return Time(-1), -1, event.event_type.priority
-
-                return event.time, event.seq_id, event.event_type.priority
-
-            if isinstance(event, Time):
-                # instances of Time must be greater than almost all ScheduleEvents with same time point
-                return event, Time.inf().value, 2
-
-            if isinstance(event, tuple):
-                return event
-
-            raise ValueError(f'Incorrect type of value: {type(event)}')
-
         self._timeline: dict[str, dict[str, SortedList[ScheduleEvent]]] = {}
         self._task_index = 0
         self._landscape = landscape_config
         for mat_id, mat_dict in landscape_config.get_platforms_resources().items():
             self._timeline[mat_id] = {
                 mat[0]: SortedList(iterable=(ScheduleEvent(-1, EventType.INITIAL, Time(0), None, mat[1]),),
-                                   key=event_cmp)
+                                   key=schedule_event_cmp)
                 for mat in mat_dict.items()
             }
 
@@ -122,8 +106,7 @@ class PlatformTimeline:
         res_holder_state = self._timeline[platform_id]
 
         for res_info in update_timeline_info:
-            task_index = self._task_index
-            self._task_index += 1
+            task_index = self._increment_task_index()
 
             res_name, res_count, start_time = res_info
             res_state = res_holder_state[res_name]
@@ -131,6 +114,7 @@ class PlatformTimeline:
 
             available_res_count = res_state[start_idx - 1].available_workers_count
 
-            res_state.add(
+            self._add_event(
+                res_state,
                 ScheduleEvent(task_index, EventType.START, start_time, None, available_res_count - res_count)
             )
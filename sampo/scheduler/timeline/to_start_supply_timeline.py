@@ -11,28 +11,11 @@ from sampo.schemas.landscape import LandscapeConfiguration, ResourceHolder, Vehi
 from sampo.schemas.landscape_graph import LandGraphNode
 from sampo.schemas.resources import Material
 from sampo.schemas.time import Time
-from sampo.schemas.types import ScheduleEvent, EventType
+from sampo.schemas.types import ScheduleEvent, EventType, schedule_event_cmp
 
 
 class ToStartSupplyTimeline(BaseSupplyTimeline):
     def __init__(self, landscape_config: LandscapeConfiguration):
-
-        def event_cmp(event: ScheduleEvent | Time | tuple[Time, int, int]) -> tuple[Time, int, int]:
-            if isinstance(event, ScheduleEvent):
-                if event.event_type is EventType.INITIAL:
-                    return Time(-1), -1, event.event_type.priority
-
-                return event.time, event.seq_id, event.event_type.priority
-
-            if isinstance(event, Time):
-                # instances of Time must be greater than almost all ScheduleEvents with same time point
-                return event, Time.inf().value, 2
-
-            if isinstance(event, tuple):
-                return event
-
-            raise ValueError(f'Incorrect type of value: {type(event)}')
-
         self._platform_timeline = PlatformTimeline(landscape_config)
         self._timeline: dict[str, dict[str, SortedList[ScheduleEvent]]] = {}
         self._task_index = 0
@@ -43,7 +26,7 @@ class ToStartSupplyTimeline(BaseSupplyTimeline):
             for mat_id, mat_dict in resource.items():
                 self._timeline[mat_id] = {
                     mat[0]: SortedList(iterable=(ScheduleEvent(-1, EventType.INITIAL, Time(0), None, mat[1]),),
-                                       key=event_cmp)
+                                       key=schedule_event_cmp)
                     for mat in mat_dict.items()
                 }
 
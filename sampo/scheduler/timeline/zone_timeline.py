@@ -2,34 +2,19 @@ from collections import deque
 
 from sortedcontainers import SortedList
 
+from sampo.scheduler.timeline.journal import JournaledTimeline
 from sampo.schemas.requirements import ZoneReq
 from sampo.schemas.time import Time
-from sampo.schemas.types import EventType, ScheduleEvent
+from sampo.schemas.types import EventType, ScheduleEvent, schedule_event_cmp
 from sampo.schemas.zones import ZoneConfiguration, Zone, ZoneTransition
 from sampo.utilities.collections_util import build_index
 
 
-class ZoneTimeline:
+class ZoneTimeline(JournaledTimeline):
 
     def __init__(self, config: ZoneConfiguration):
-        def event_cmp(event: ScheduleEvent | Time | tuple[Time, int, int]) -> tuple[Time, int, int]:
-            if isinstance(event, ScheduleEvent):
-                if event.event_type is EventType.INITIAL:
-                    return Time(-1), -1, event.event_type.priority
-
-                return event.time, event.seq_id, event.event_type.priority
-
-            if isinstance(event, Time):
-                # instances of Time must be greater than almost all ScheduleEvents with same time point
-                return event, Time.inf().value, 2
-
-            if isinstance(event, tuple):
-                return event
-
-            raise ValueError(f'Incorrect type of value: {type(event)}')
-
         self._timeline = {zone: SortedList([ScheduleEvent(-1, EventType.INITIAL, Time(0), None, status)],
-                                           key=event_cmp)
+                                           key=schedule_event_cmp)
                           for zone, status in config.start_statuses.items()}
         self._config = config
 
@@ -258,8 +243,9 @@ class ZoneTimeline:
                 if not self._config.statuses.match_status(start_status, zone.status) \
                 else 0
 
-            state.add(ScheduleEvent(index, EventType.START, start_time - change_cost, None, zone.status))
-            state.add(ScheduleEvent(index, EventType.END, start_time - change_cost + exec_time, None, zone.status))
+            self._add_event(state, ScheduleEvent(index, EventType.START, start_time - change_cost, None, zone.status))
+            self._add_event(state, ScheduleEvent(index, EventType.END, start_time - change_cost + exec_time, None,
+                                                 zone.status))
 
             if start_status != zone.status and zone.status != 0:
                 # if we need to change status, record it
@@ -283,8 +269,8 @@ class ZoneTimeline:
                 else 0
             finish_time = latest_time + change_cost
 
-            state.add(ScheduleEvent(Time.inf().value, EventType.START, latest_time, None, zone.status))
-            state.add(ScheduleEvent(Time.inf().value, EventType.END, finish_time, None, zone.status))
+            self._add_event(state, ScheduleEvent(Time.inf().value, EventType.START, latest_time, None, zone.status))
+            self._add_event(state, ScheduleEvent(Time.inf().value, EventType.END, finish_time, None, zone.status))
 
             if latest_status != zone.status and zone.status != 0:
                 # if we need to change status, record it
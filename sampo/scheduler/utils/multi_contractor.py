@@ -1,3 +1,4 @@
+from concurrent.futures import Executor
 from typing import Callable
 
 import numpy as np
@@ -42,7 +43,8 @@ def get_worker_borders(agents: WorkerContractorPool, contractor: Contractor, wor
 
 
 def run_contractor_search(contractors: list[Contractor],
-                          runner: Callable[[Contractor], tuple[Time, Time, list[Worker]]]) \
+                          runner: Callable[[Contractor], tuple[Time, Time, list[Worker]]],
+                          executor: Executor | None = None) \
         -> tuple[Time, Time, Contractor, list[Worker]]:
     """
     Performs the best contractor search.
@@ -50,30 +52,36 @@ def run_contractor_search(contractors: list[Contractor],
     :param contractors: contractors' list
     :param runner: a runner function, should be inner of the calling code.
         Calculates Tuple[start time, finish time, worker team] from given contractor object.
+    :param executor: if given, contractors are evaluated concurrently by it,
+        so the runner should only read the shared state, e.g. timeline
     :return: start time, finish time, the best contractor, worker team with the best contractor
     """
-    # TODO Parallelize
+    if executor is not None and len(contractors) > 1:
+        results = executor.map(runner, contractors)
+    else:
+        results = map(runner, contractors)
 
     # optimization metric
     best_finish_time = Time.inf()
     best_contractor = None
+    best_start_time = None
+    best_worker_team = None
     # heuristic: if contractors' finish times are equal, we prefer smaller one
     best_contractor_size = float('inf')
 
-    for contractor in contractors:
-        start_time, finish_time, worker_team = runner(contractor)
+    for contractor, (start_time, finish_time, worker_team) in zip(contractors, results):
         contractor_size = sum(w.count for w in contractor.workers.values())
 
         if not finish_time.is_inf() and (finish_time < best_finish_time or
                                          (finish_time == best_finish_time and contractor_size < best_contractor_size)):
+            best_start_time = start_time
             best_finish_time = finish_time
             best_contractor = contractor
+            best_worker_team = worker_team
             best_contractor_size = contractor_size
 
     if best_contractor is None:
         raise NoSufficientContractorError(f'There is no contractor that can satisfy given search; contractors: '
                                           f'{contractors}')
 
-    best_start_time, best_finish_time, best_worker_team = runner(best_contractor)
-
     return best_start_time, best_finish_time, best_contractor, best_worker_team
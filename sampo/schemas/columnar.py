@@ -0,0 +1,505 @@
+"""
+Binary columnar persistence of `WorkGraph`, contractors and `Schedule`.
+
+Each object is stored in a folder of `.npy` typed arrays plus a string table (utf-8 bytes and offsets),
+so the columns can be memory-mapped on load and only touched columns are read from disk.
+Ragged collections (requirements, edges, workers) are stored in CSR form: `<name>_indptr` plus value columns.
+"""
+import json
+import math
+import os
+from typing import Any, Callable, Iterable
+
+import numpy as np
+
+from sampo.schemas.contractor import Contractor
+from sampo.schemas.graph import WorkGraph, GraphNode, EdgeType
+from sampo.schemas.interval import IntervalGaussian, IntervalUniform
+from sampo.schemas.landscape import MaterialDelivery
+from sampo.schemas.requirements import WorkerReq, EquipmentReq, MaterialReq, ConstructionObjectReq, ZoneReq
+from sampo.schemas.resources import Worker, Equipment
+from sampo.schemas.schedule import Schedule
+from sampo.schemas.scheduled_work import ScheduledWork
+from sampo.schemas.time import Time
+from sampo.schemas.works import WorkUnit
+from sampo.schemas.zones import ZoneTransition
+
+COLUMNAR_EXTENSION = 'columnar'
+FORMAT_VERSION = 1
+
+_META_FILE = 'meta.json'
+_STRINGS_DATA = 'strings_data'
+_STRINGS_OFFSETS = 'strings_offsets'
+
+_EDGE_TYPES = list(EdgeType)
+_EDGE_TYPE2CODE = {edge_type: code for code, edge_type in enumerate(_EDGE_TYPES)}
+
+# productivity distributions of workers
+_GAUSSIAN = 0
+_UNIFORM = 1
+
+
+class StringTable:
+    """
+    Lazily decoded table of strings. Index -1 stands for None
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self._data = data
+        self._offsets = offsets
+        self._decoded: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str | None:
+        if index < 0:
+            return None
+        value = self._decoded.get(index)
+        if value is None:
+            value = bytes(self._data[self._offsets[index]:self._offsets[index + 1]]).decode('utf-8')
+            self._decoded[index] = value
+        return value
+
+    def get_many(self, indices: np.ndarray) -> list[str | None]:
+        return [self[i] for i in indices.tolist()]
+
+
+class ColumnarStore:
+    """
+    Read access to the columns of the stored object. Columns are loaded (memory-mapped by default) on first access
+    """
+
+    def __init__(self, path: str, mmap: bool = True):
+        self.path = path
+        self._mmap_mode = 'r' if mmap else None
+        with open(os.path.join(path, _META_FILE), 'r', encoding='utf-8') as read_file:
+            self.meta: dict[str, Any] = json.load(read_file)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f'Unsupported columnar format version {self.meta.get("version")} in {path}')
+        self._columns: dict[str, np.ndarray] = {}
+        self._strings: StringTable | None = None
+
+    @property
+    def object_type(self) -> str:
+        return self.meta['type']
+
+    @property
+    def strings(self) -> StringTable:
+        if self._strings is None:
+            self._strings = StringTable(self[_STRINGS_DATA], self[_STRINGS_OFFSETS])
+        return self._strings
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns or os.path.exists(self._column_file(name))
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        column = self._columns.get(name)
+        if column is None:
+            column = np.load(self._column_file(name), mmap_mode=self._mmap_mode, allow_pickle=False)
+            self._columns[name] = column
+        return column
+
+    def str_column(self, name: str) -> list[str | None]:
+        return self.strings.get_many(self[name])
+
+    def _column_file(self, name: str) -> str:
+        return os.path.join(self.path, f'{name}.npy')
+
+
+class _ColumnarWriter:
+    """
+    Collects typed columns and interns strings before writing them to the folder
+    """
+
+    def __init__(self, object_type: str):
+        self._object_type = object_type
+        self._columns: dict[str, np.ndarray] = {}
+        self._string2index: dict[str, int] = {}
+
+    def intern(self, value: str | None) -> int:
+        if value is None:
+            return -1
+        index = self._string2index.get(value)
+        if index is None:
+            index = len(self._string2index)
+            self._string2index[value] = index
+        return index
+
+    def add(self, name: str, values: Iterable, dtype) -> None:
+        self._columns[name] = np.fromiter(values, dtype=dtype)
+
+    def add_str(self, name: str, values: Iterable[str | None]) -> None:
+        self.add(name, (self.intern(value) for value in values), np.int64)
+
+    def add_ragged(self, name: str, rows: list[list], columns: dict[str, tuple[Callable[[Any], Any], Any]]) -> None:
+        """
+        Stores collection of rows with variable length in CSR form
+
+        :param name: collection name
+        :param rows: items of each row
+        :param columns: value column name -> (item getter, dtype), dtype `str` stores values in the string table
+        """
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(row) for row in rows])
+        self._columns[f'{name}_indptr'] = indptr
+        items = [item for row in rows for item in row]
+        for column, (getter, dtype) in columns.items():
+            if dtype is str:
+                self.add_str(f'{name}_{column}', (getter(item) for item in items))
+            else:
+                self.add(f'{name}_{column}', (getter(item) for item in items), dtype)
+
+    def write(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        encoded = [value.encode('utf-8') for value in self._string2index]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+        self._columns[_STRINGS_DATA] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        self._columns[_STRINGS_OFFSETS] = offsets
+
+        for name, column in self._columns.items():
+            np.save(os.path.join(path, f'{name}.npy'), column, allow_pickle=False)
+        with open(os.path.join(path, _META_FILE), 'w', encoding='utf-8') as write_file:
+            json.dump({'type': self._object_type, 'version': FORMAT_VERSION}, write_file)
+
+
+def get_columnar_path(folder_path: str, file_name: str) -> str:
+    """
+    :return: path of the folder, that contains the columns of the stored object
+    """
+    return os.path.join(folder_path, f'{file_name}.{COLUMNAR_EXTENSION}')
+
+
+def open_columnar(folder_path: str, file_name: str, mmap: bool = True) -> ColumnarStore:
+    """
+    Opens stored object for column-level access without building python objects
+
+    :param folder_path: path to the folder, where the object is saved
+    :param file_name: name of the object without extension
+    :param mmap: whether to memory-map the columns instead of reading them into memory
+    :return: store of the object's columns
+    """
+    return ColumnarStore(get_columnar_path(folder_path, file_name), mmap)
+
+
+def _open_checked(folder_path: str, file_name: str, mmap: bool, object_type: str) -> ColumnarStore:
+    store = open_columnar(folder_path, file_name, mmap)
+    if store.object_type != object_type:
+        raise ValueError(f'{store.path} contains {store.object_type}, not {object_type}')
+    return store
+
+
+# [SECTION] WorkGraph
+
+_SIMPLE_REQS = {
+    'equipment_reqs': (EquipmentReq, 'count'),
+    'material_reqs': (MaterialReq, 'count'),
+    'object_reqs': (ConstructionObjectReq, 'count'),
+    'zone_reqs': (ZoneReq, 'required_status'),
+}
+
+
+def dump_wg(wg: WorkGraph, folder_path: str, file_name: str) -> None:
+    """
+    Saves `WorkGraph` in the columnar format
+
+    :param wg: graph to save
+    :param folder_path: path to the folder where the graph should be saved
+    :param file_name: name of the graph without extension
+    """
+    nodes = wg.nodes
+    units = [node.work_unit for node in nodes]
+    id2index = {node.id: i for i, node in enumerate(nodes)}
+    writer = _ColumnarWriter('WorkGraph')
+
+    for column in ('id', 'name', 'display_name', 'group', 'volume_type'):
+        writer.add_str(column, (getattr(unit, column) for unit in units))
+    # service units, created by deserialization, can have no description, it's stored as None
+    writer.add_str('description', (getattr(unit, 'description', None) for unit in units))
+    writer.add('priority', (unit.priority for unit in units), np.int64)
+    writer.add('is_service_unit', (unit.is_service_unit for unit in units), bool)
+    writer.add('volume', (unit.volume for unit in units), np.float64)
+
+    writer.add_ragged('parent_edges', [node.edges_to for node in nodes], {
+        'parent': (lambda edge: id2index[edge.start.id], np.int64),
+        'lag': (lambda edge: math.nan if edge.lag is None else edge.lag, np.float64),
+        'type': (lambda edge: _EDGE_TYPE2CODE.get(edge.type, -1), np.int8),
+    })
+
+    writer.add_ragged('worker_reqs', [unit.worker_reqs for unit in units], {
+        'kind': (lambda req: req.kind, str),
+        'volume': (lambda req: req.volume.value if isinstance(req.volume, Time) else req.volume, np.float64),
+        'volume_is_time': (lambda req: isinstance(req.volume, Time), bool),
+        'min_count': (lambda req: req.min_count, np.int64),
+        'max_count': (lambda req: req.max_count, np.int64),
+        'name': (lambda req: req.name, str),
+    })
+    for name, (_, count_field) in _SIMPLE_REQS.items():
+        writer.add_ragged(name, [getattr(unit, name) for unit in units], {
+            'kind': (lambda req: req.kind, str),
+            'count': (lambda req, count_field=count_field: getattr(req, count_field), np.int64),
+            'name': (lambda req: req.name, str),
+        })
+
+    writer.write(get_columnar_path(folder_path, file_name))
+
+
+def load_wg(folder_path: str, file_name: str, mmap: bool = True) -> WorkGraph:
+    """
+    Loads `WorkGraph`, saved by `dump_wg`
+
+    :param folder_path: path to the folder, where the graph is saved
+    :param file_name: name of the graph without extension
+    :param mmap: whether to memory-map the columns instead of reading them into memory
+    :return: loaded graph
+    """
+    store = _open_checked(folder_path, file_name, mmap, 'WorkGraph')
+    strings = store.strings
+
+    worker_reqs = _load_ragged(store, 'worker_reqs', lambda kind, volume, volume_is_time, min_count, max_count, name:
+                               WorkerReq(strings[kind], Time(volume) if volume_is_time else volume,
+                                         min_count, max_count, strings[name]),
+                               ('kind', 'volume', 'volume_is_time', 'min_count', 'max_count', 'name'))
+    simple_reqs = {name: _load_ragged(store, name, lambda kind, count, req_name, req_type=req_type:
+                                      req_type(strings[kind], count, strings[req_name]),
+                                      ('kind', 'count', 'name'))
+                   for name, (req_type, _) in _SIMPLE_REQS.items()}
+
+    ids = store.str_column('id')
+    names = store.str_column('name')
+    display_names = store.str_column('display_name')
+    descriptions = store.str_column('description')
+    groups = store.str_column('group')
+    volume_types = store.str_column('volume_type')
+    priorities = store['priority'].tolist()
+    is_service_units = store['is_service_unit'].tolist()
+    volumes = store['volume'].tolist()
+
+    edges_indptr = store['parent_edges_indptr'].tolist()
+    edges_parent = store['parent_edges_parent'].tolist()
+    edges_lag = store['parent_edges_lag'].tolist()
+    edges_type = store['parent_edges_type'].tolist()
+
+    nodes: list[GraphNode] = []
+    for i in range(len(ids)):
+        unit = WorkUnit(ids[i], names[i],
+                        worker_reqs=worker_reqs[i],
+                        equipment_reqs=simple_reqs['equipment_reqs'][i],
+                        material_reqs=simple_reqs['material_reqs'][i],
+                        object_reqs=simple_reqs['object_reqs'][i],
+                        zone_reqs=simple_reqs['zone_reqs'][i],
+                        description=descriptions[i] or '',
+                        group=groups[i],
+                        priority=priorities[i],
+                        is_service_unit=is_service_units[i],
+                        volume=volumes[i],
+                        volume_type=volume_types[i],
+                        display_name=display_names[i])
+        if descriptions[i] is None:
+            del unit.description
+        parents = [(nodes[edges_parent[e]],
+                    None if math.isnan(edges_lag[e]) else edges_lag[e],
+                    _EDGE_TYPES[edges_type[e]] if edges_type[e] >= 0 else None)
+                   for e in range(edges_indptr[i], edges_indptr[i + 1])]
+        nodes.append(GraphNode(unit, parents))
+
+    return WorkGraph(nodes[0], nodes[-1])
+
+
+# [SECTION] Contractors
+
+def _worker_columns(get_worker: Callable[[Any], Worker]) -> dict[str, tuple[Callable[[Any], Any], Any]]:
+    return {
+        'id': (lambda item: get_worker(item).id, str),
+        'name': (lambda item: get_worker(item).name, str),
+        'count': (lambda item: get_worker(item).count, np.int64),
+        'contractor_id': (lambda item: get_worker(item).contractor_id, str),
+        'cost_one_unit': (lambda item: get_worker(item).cost_one_unit, np.float64),
+        'productivity_type': (lambda item: _UNIFORM if isinstance(get_worker(item).productivity, IntervalUniform)
+                              else _GAUSSIAN, np.int8),
+        'productivity_mean': (lambda item: getattr(get_worker(item).productivity, 'mean', math.nan), np.float64),
+        'productivity_sigma': (lambda item: getattr(get_worker(item).productivity, 'sigma', math.nan), np.float64),
+        'productivity_min': (lambda item: get_worker(item).productivity.min_val, np.float64),
+        'productivity_max': (lambda item: get_worker(item).productivity.max_val, np.float64),
+    }
+
+
+def _load_workers(store: ColumnarStore, name: str) -> list[list[Worker]]:
+    strings = store.strings
+
+    def make(worker_id, worker_name, count, contractor_id, cost_one_unit,
+             productivity_type, mean, sigma, min_val, max_val) -> Worker:
+        productivity = IntervalUniform(min_val, max_val) if productivity_type == _UNIFORM \
+            else IntervalGaussian(mean, sigma, min_val, max_val)
+        return Worker(strings[worker_id], strings[worker_name], count, strings[contractor_id],
+                      productivity, cost_one_unit)
+
+    return _load_ragged(store, name, make, ('id', 'name', 'count', 'contractor_id', 'cost_one_unit',
+                                            'productivity_type', 'productivity_mean', 'productivity_sigma',
+                                            'productivity_min', 'productivity_max'))
+
+
+def dump_contractors(contractors: list[Contractor], folder_path: str, file_name: str) -> None:
+    """
+    Saves contractors in the columnar format
+
+    :param contractors: contractors to save
+    :param folder_path: path to the folder where the contractors should be saved
+    :param file_name: name of the contractors' file without extension
+    """
+    writer = _ColumnarWriter('Contractors')
+    writer.add_str('id', (contractor.id for contractor in contractors))
+    writer.add_str('name', (contractor.name for contractor in contractors))
+    writer.add_ragged('workers', [list(contractor.workers.items()) for contractor in contractors],
+                      {'key': (lambda item: item[0], str), **_worker_columns(lambda item: item[1])})
+    writer.add_ragged('equipments', [list(contractor.equipments.items()) for contractor in contractors], {
+        'key': (lambda item: item[0], str),
+        'id': (lambda item: item[1].id, str),
+        'name': (lambda item: item[1].name, str),
+        'count': (lambda item: item[1].count, np.int64),
+        'contractor_id': (lambda item: item[1].contractor_id, str),
+    })
+    writer.write(get_columnar_path(folder_path, file_name))
+
+
+def load_contractors(folder_path: str, file_name: str, mmap: bool = True) -> list[Contractor]:
+    """
+    Loads contractors, saved by `dump_contractors`
+
+    :param folder_path: path to the folder, where the contractors are saved
+    :param file_name: name of the contractors' file without extension
+    :param mmap: whether to memory-map the columns instead of reading them into memory
+    :return: loaded contractors
+    """
+    store = _open_checked(folder_path, file_name, mmap, 'Contractors')
+    strings = store.strings
+
+    workers = _load_workers(store, 'workers')
+    worker_keys = _load_ragged(store, 'workers', lambda key: strings[key], ('key',))
+    equipments = _load_ragged(store, 'equipments',
+                              lambda key, equipment_id, name, count, contractor_id:
+                              (strings[key], Equipment(strings[equipment_id], strings[name], count,
+                                                       strings[contractor_id])),
+                              ('key', 'id', 'name', 'count', 'contractor_id'))
+
+    return [Contractor(id=contractor_id,
+                       name=name,
+                       workers=dict(zip(worker_keys[i], workers[i])),
+                       equipments=dict(equipments[i]))
+            for i, (contractor_id, name) in enumerate(zip(store.str_column('id'), store.str_column('name')))]
+
+
+# [SECTION] Schedule
+
+_ZONE_TRANSITION_COLUMNS = {
+    'name': (lambda zone: zone.name, str),
+    'from_status': (lambda zone: zone.from_status, np.int64),
+    'to_status': (lambda zone: zone.to_status, np.int64),
+    'start_time': (lambda zone: zone.start_time.value, np.int64),
+    'end_time': (lambda zone: zone.end_time.value, np.int64),
+}
+
+
+def dump_schedule(schedule: Schedule, folder_path: str, file_name: str) -> None:
+    """
+    Saves `Schedule` in the columnar format.
+    As in the JSON format, equipments, materials and objects of the scheduled works are not stored.
+
+    :param schedule: schedule to save
+    :param folder_path: path to the folder where the schedule should be saved
+    :param file_name: name of the schedule without extension
+    """
+    works: list[ScheduledWork] = list(schedule.works)
+    writer = _ColumnarWriter('Schedule')
+
+    for column in ('id', 'name', 'display_name', 'volume_type', 'contractor'):
+        writer.add_str(column, (getattr(work, column) for work in works))
+    writer.add('is_service_unit', (work.is_service_unit for work in works), bool)
+    writer.add('volume', (work.volume for work in works), np.float64)
+    writer.add('priority', (work.priority for work in works), np.int64)
+    writer.add('cost', (work.cost for work in works), np.float64)
+    writer.add('start', (work.start_time.value for work in works), np.int64)
+    writer.add('finish', (work.finish_time.value for work in works), np.int64)
+
+    writer.add_ragged('workers', [work.workers for work in works], _worker_columns(lambda worker: worker))
+    writer.add_ragged('zones_pre', [work.zones_pre for work in works], _ZONE_TRANSITION_COLUMNS)
+    writer.add_ragged('zones_post', [work.zones_post for work in works], _ZONE_TRANSITION_COLUMNS)
+
+    writer.write(get_columnar_path(folder_path, file_name))
+
+
+def load_schedule(folder_path: str, file_name: str, mmap: bool = True) -> Schedule:
+    """
+    Loads `Schedule`, saved by `dump_schedule`
+
+    :param folder_path: path to the folder, where the schedule is saved
+    :param file_name: name of the schedule without extension
+    :param mmap: whether to memory-map the columns instead of reading them into memory
+    :return: loaded schedule
+    """
+    store = _open_checked(folder_path, file_name, mmap, 'Schedule')
+    strings = store.strings
+
+    workers = _load_workers(store, 'workers')
+    zones = {name: _load_ragged(store, name,
+                                lambda zone_name, from_status, to_status, start_time, end_time:
+                                ZoneTransition(strings[zone_name], from_status, to_status,
+                                               Time(start_time), Time(end_time)),
+                                tuple(_ZONE_TRANSITION_COLUMNS))
+             for name in ('zones_pre', 'zones_post')}
+
+    ids = store.str_column('id')
+    names = store.str_column('name')
+    display_names = store.str_column('display_name')
+    volume_types = store.str_column('volume_type')
+    contractors = store.str_column('contractor')
+    is_service_units = store['is_service_unit'].tolist()
+    volumes = store['volume'].tolist()
+    priorities = store['priority'].tolist()
+    costs = store['cost'].tolist()
+    starts = store['start'].tolist()
+    finishes = store['finish'].tolist()
+
+    works = []
+    for i in range(len(ids)):
+        # bypass constructor as it requires WorkUnit, the fields are the same as in `ScheduledWork.__init__`
+        work = ScheduledWork.__new__(ScheduledWork)
+        work.__dict__ = {
+            'id': ids[i],
+            'name': names[i],
+            'display_name': display_names[i],
+            'is_service_unit': is_service_units[i],
+            'volume': volumes[i],
+            'volume_type': volume_types[i],
+            'priority': priorities[i],
+            'start_end_time': (Time(starts[i]), Time(finishes[i])),
+            'workers': workers[i],
+            'equipments': [],
+            'zones_pre': zones['zones_pre'][i],
+            'zones_post': zones['zones_post'][i],
+            'materials': MaterialDelivery(ids[i]),
+            'object': [],
+            'contractor': contractors[i],
+            'cost': costs[i],
+        }
+        works.append(work)
+
+    return Schedule.from_scheduled_works(works)
+
+
+def _load_ragged(store: ColumnarStore, name: str, make: Callable[..., Any], columns: tuple[str, ...]) \
+        -> list[list[Any]]:
+    """
+    Builds objects of the CSR-stored collection row by row
+
+    :param store: store of the object
+    :param name: collection name
+    :param make: factory of the item from the values of `columns`
+    :param columns: value columns of the collection
+    :return: list of items for each row
+    """
+    indptr = store[f'{name}_indptr'].tolist()
+    values = [store[f'{name}_{column}'].tolist() for column in columns]
+    items = [make(*item_values) for item_values in zip(*values)]
+    return [items[indptr[i]:indptr[i + 1]] for i in range(len(indptr) - 1)]
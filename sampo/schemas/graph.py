@@ -1,16 +1,17 @@
 from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
-from functools import cached_property, cache
+from functools import cached_property, lru_cache
 from random import Random
-from typing import Optional
+from typing import Iterable, Optional
 
 import dill
 import numpy as np
 import pandas as pd
-from scipy.sparse import dok_matrix
+from scipy.sparse import csr_matrix
 
 from sampo.schemas import uuid_str
+from sampo.schemas.graph_arrays import WorkGraphArrays
 from sampo.schemas.scheduled_work import ScheduledWork
 from sampo.schemas.serializable import JSONSerializable, T, JS
 from sampo.schemas.time import Time
@@ -36,7 +37,7 @@ class EdgeType(Enum):
         return edge in ('FS', 'IFS', 'FFS')
 
 
-@dataclass
+@dataclass(slots=True)
 class GraphEdge:
     """
     The edge of graph with start and finish vertexes
@@ -47,17 +48,27 @@ class GraphEdge:
     type: EdgeType | None = None
 
 
+# marks the empty slot of the lazily computed `GraphNode` attribute
+_NOT_CACHED = object()
+
+
 class GraphNode(JSONSerializable['GraphNode']):
     """
-    Class to describe Node in graph
+    Class to describe Node in graph.
+    The attributes are kept in slots; the '__dict__' slot holds the user-defined attributes
+    and is allocated only when the first of them is set
     """
+    __slots__ = ('_work_unit', '_parent_edges', '_children_edges',
+                 '_parents', '_parents_set', '_children', '_children_set', '_neighbors',
+                 '_inseparable_parent', '_inseparable_son', '_inseparable_chain', '__dict__')
 
     def __init__(self, work_unit: WorkUnit,
                  parent_works: list['GraphNode'] | list[tuple['GraphNode', float, EdgeType]]):
         self._work_unit = work_unit
         self._parent_edges = []
-        self.add_parents(parent_works)
         self._children_edges = []
+        self._clear_cache()
+        self.add_parents(parent_works)
 
     def __hash__(self) -> int:
         return hash(self.id)
@@ -70,6 +81,16 @@ class GraphNode(JSONSerializable['GraphNode']):
     def __repr__(self) -> str:
         return self.id
 
+    def __getstate__(self):
+        # lazily computed attributes are not stored
+        return self._work_unit, self._parent_edges, self._children_edges, self.__dict__ or None
+
+    def __setstate__(self, state):
+        self._work_unit, self._parent_edges, self._children_edges, attributes = state
+        if attributes:
+            self.__dict__.update(attributes)
+        self._clear_cache()
+
     # def __getstate__(self):
     #     # custom method to avoid calling __hash__() on GraphNode objects
     #     return self._serialize()
@@ -121,19 +142,40 @@ class GraphNode(JSONSerializable['GraphNode']):
         self._parent_edges += edges
         self.invalidate_parents_cache()
 
+    def _clear_cache(self):
+        self._parents = _NOT_CACHED
+        self._parents_set = _NOT_CACHED
+        self._children = _NOT_CACHED
+        self._children_set = _NOT_CACHED
+        self._neighbors = _NOT_CACHED
+        self._inseparable_parent = _NOT_CACHED
+        self._inseparable_son = _NOT_CACHED
+        self._inseparable_chain = _NOT_CACHED
+
     def invalidate_parents_cache(self):
-        self.__dict__.pop('parents', None)
-        self.__dict__.pop('parents_set', None)
-        self.__dict__.pop('inseparable_parent', None)
-        self.__dict__.pop('inseparable_son', None)
-        self.get_inseparable_chain.cache_clear()
+        self._parents = _NOT_CACHED
+        self._parents_set = _NOT_CACHED
+        self._neighbors = _NOT_CACHED
+        self._inseparable_parent = _NOT_CACHED
+        self._inseparable_son = _NOT_CACHED
+        self._invalidate_inseparable_chain()
 
     def invalidate_children_cache(self):
-        self.__dict__.pop('children', None)
-        self.__dict__.pop('children_set', None)
-        self.__dict__.pop('inseparable_parent', None)
-        self.__dict__.pop('inseparable_son', None)
-        self.get_inseparable_chain.cache_clear()
+        self._children = _NOT_CACHED
+        self._children_set = _NOT_CACHED
+        self._inseparable_parent = _NOT_CACHED
+        self._inseparable_son = _NOT_CACHED
+        self._invalidate_inseparable_chain()
+
+    def _invalidate_inseparable_chain(self):
+        """
+        The inseparable chain is stored in its head node,
+        so the chains of all the inseparable predecessors are dropped too
+        """
+        node = self
+        while node is not None:
+            node._inseparable_chain = _NOT_CACHED
+            node = node.inseparable_parent
 
     def is_inseparable_parent(self) -> bool:
         return self.inseparable_son is not None
@@ -143,80 +185,131 @@ class GraphNode(JSONSerializable['GraphNode']):
 
     def traverse_children(self, topologically: bool = False):
         """
-        DFS from current vertex to down
-        :param topologically: is DFS need to go in topologically way
+        BFS from current vertex to down
+        :param topologically: is BFS need to go in topologically way
         :return:
         """
+        if topologically:
+            yield from self._traverse_children_topologically()
+            return
         visited_vertexes = set()
         vertexes_to_visit = deque([self])
         while len(vertexes_to_visit) > 0:
             v = vertexes_to_visit.popleft()
-            if topologically and any(p.start not in visited_vertexes for p in v._parent_edges):
-                vertexes_to_visit.append(v)
-                continue
             if v not in visited_vertexes:
                 visited_vertexes.add(v)
                 vertexes_to_visit.extend([p.finish for p in v._children_edges])
                 yield v
 
-    @cached_property
+    def _traverse_children_topologically(self):
+        """
+        Kahn's algorithm over integer ids of the vertexes reachable from current one.
+        Vertex is yielded when all its reachable parents are yielded, so the whole traverse is O(V + E).
+        """
+        # enumerate reachable vertexes
+        node2ind: dict[int, int] = {id(self): 0}
+        nodes: list[GraphNode] = [self]
+        children: list[list[int]] = []
+        i = 0
+        while i < len(nodes):
+            v_children = []
+            for edge in nodes[i]._children_edges:
+                child_ind = node2ind.get(id(edge.finish))
+                if child_ind is None:
+                    child_ind = len(nodes)
+                    node2ind[id(edge.finish)] = child_ind
+                    nodes.append(edge.finish)
+                v_children.append(child_ind)
+            children.append(v_children)
+            i += 1
+
+        # parents unreachable from the current vertex are not taken into account
+        in_degree = [0] * len(nodes)
+        for v_children in children:
+            for child_ind in v_children:
+                in_degree[child_ind] += 1
+
+        vertexes_to_visit = deque([0])
+        while vertexes_to_visit:
+            v = vertexes_to_visit.popleft()
+            yield nodes[v]
+            for child_ind in children[v]:
+                in_degree[child_ind] -= 1
+                if in_degree[child_ind] == 0:
+                    vertexes_to_visit.append(child_ind)
+
+    @property
     def inseparable_son(self) -> Optional['GraphNode']:
         """
         Return inseparable son (amount of inseparable sons at most 1)
         :return: inseparable son
         """
-        inseparable_children = [x.finish for x in self._children_edges
-                                if x.type == EdgeType.InseparableFinishStart]
-        return inseparable_children[0] if inseparable_children else None
+        if self._inseparable_son is _NOT_CACHED:
+            inseparable_children = [x.finish for x in self._children_edges
+                                    if x.type == EdgeType.InseparableFinishStart]
+            self._inseparable_son = inseparable_children[0] if inseparable_children else None
+        return self._inseparable_son
 
-    @cached_property
+    @property
     def inseparable_parent(self) -> Optional['GraphNode']:
         """
         Return predecessor of current vertex in inseparable chain
         :return: inseparable parent
         """
-        inseparable_parents = [x.start for x in self._parent_edges if x.type == EdgeType.InseparableFinishStart]
-        return inseparable_parents[0] if inseparable_parents else None
+        if self._inseparable_parent is _NOT_CACHED:
+            inseparable_parents = [x.start for x in self._parent_edges if x.type == EdgeType.InseparableFinishStart]
+            self._inseparable_parent = inseparable_parents[0] if inseparable_parents else None
+        return self._inseparable_parent
 
-    @cached_property
+    @property
     def parents(self) -> list['GraphNode']:
         """
         Return list of predecessors of current vertex
         :return: list of parents
         """
-        return [edge.start for edge in self.edges_to if EdgeType.is_dependency(edge.type)]
+        if self._parents is _NOT_CACHED:
+            self._parents = [edge.start for edge in self.edges_to if EdgeType.is_dependency(edge.type)]
+        return self._parents
 
-    @cached_property
+    @property
     def parents_set(self) -> set['GraphNode']:
         """
         Return unique predecessors of current vertex
         :return: set of parents
         """
-        return set(self.parents)
+        if self._parents_set is _NOT_CACHED:
+            self._parents_set = set(self.parents)
+        return self._parents_set
 
-    @cached_property
+    @property
     def children(self) -> list['GraphNode']:
         """
         Return list of successors of current vertex
         :return: list of children
         """
-        return [edge.finish for edge in self.edges_from if EdgeType.is_dependency(edge.type)]
+        if self._children is _NOT_CACHED:
+            self._children = [edge.finish for edge in self.edges_from if EdgeType.is_dependency(edge.type)]
+        return self._children
 
-    @cached_property
+    @property
     def children_set(self) -> set['GraphNode']:
         """
         Return unique successors of current vertex
         :return: set of children
         """
-        return set(self.children)
+        if self._children_set is _NOT_CACHED:
+            self._children_set = set(self.children)
+        return self._children_set
 
-    @cached_property
+    @property
     def neighbors(self):
         """
         Get all edges that have types SS with current vertex
         :return: list of neighbours
         """
-        return [edge.start for edge in self._parent_edges if edge.type == EdgeType.StartStart]
+        if self._neighbors is _NOT_CACHED:
+            self._neighbors = [edge.start for edge in self._parent_edges if edge.type == EdgeType.StartStart]
+        return self._neighbors
 
     @property
     def edges_to(self) -> list[GraphEdge]:
@@ -238,18 +331,20 @@ class GraphNode(JSONSerializable['GraphNode']):
     def id(self) -> str:
         return self.work_unit.id
 
-    @cache
     def get_inseparable_chain(self) -> Optional[list['GraphNode']]:
         """
         Gets an ordered list of whole chain of nodes, connected with edges of type INSEPARABLE_FINISH_START =
         'INSEPARABLE',
         IF self NODE IS THE START NODE OF SUCH CHAIN. Otherwise, None.
+        The chain is stored in the node itself, so it lives as long as the graph.
 
         :return: list of GraphNode or None
         """
-        return [self] + self._get_inseparable_children() \
-            if self.inseparable_son and not self.inseparable_parent \
-            else None
+        if self._inseparable_chain is _NOT_CACHED:
+            self._inseparable_chain = [self] + self._get_inseparable_children() \
+                if self.inseparable_son and not self.inseparable_parent \
+                else None
+        return self._inseparable_chain
 
     def get_inseparable_chain_with_self(self) -> list['GraphNode']:
         """
@@ -318,6 +413,12 @@ def get_finish_stage(parents: list[GraphNode | tuple[GraphNode, float, EdgeType]
     return GraphNode(work, parents)
 
 
+# columns of the project DataFrame, produced by `WorkGraph.to_frame`
+FRAME_COLUMNS = ['activity_id', 'activity_name', 'granular_name', 'volume', 'measurement', 'priority',
+                 'predecessor_ids', 'connection_types', 'lags']
+FRAME_REQ_COLUMNS = ['min_req', 'max_req', 'req_volume']
+
+
 # TODO Make property for list of GraphEdges??
 @dataclass
 class WorkGraph(JSONSerializable['WorkGraph']):
@@ -330,7 +431,6 @@ class WorkGraph(JSONSerializable['WorkGraph']):
 
     # list of works (i.e. GraphNode)
     nodes: list[GraphNode] = field(init=False)
-    adj_matrix: dok_matrix = field(init=False)
     dict_nodes: dict[str, GraphNode] = field(init=False)
     vertex_count: int = field(init=False)
 
@@ -338,12 +438,25 @@ class WorkGraph(JSONSerializable['WorkGraph']):
         self.reinit()
 
     def reinit(self):
-        ordered_nodes, adj_matrix, dict_nodes = self._to_adj_matrix()
+        ordered_nodes: list[GraphNode] = list(self.start.traverse_children(topologically=True))
+        dict_nodes: dict[str, GraphNode] = {node.id: node for node in ordered_nodes}
         # To avoid field set of frozen instance errors
         object.__setattr__(self, 'nodes', ordered_nodes)
-        object.__setattr__(self, 'adj_matrix', adj_matrix)
         object.__setattr__(self, 'dict_nodes', dict_nodes)
         object.__setattr__(self, 'vertex_count', len(ordered_nodes))
+        self.__dict__.pop('arrays', None)
+        self.__dict__.pop('adj_matrix', None)
+
+    @cached_property
+    def arrays(self) -> WorkGraphArrays:
+        """
+        Compact array representation of the graph: CSR parents/children, topological order,
+        requirements matrices and inseparable chains.
+        Built on first access and dropped on `reinit`.
+
+        :return: array view of the graph
+        """
+        return WorkGraphArrays.from_nodes(self.nodes)
 
     @classmethod
     def from_nodes(cls, nodes: list[GraphNode], rand: Random | None = None):
@@ -355,67 +468,54 @@ class WorkGraph(JSONSerializable['WorkGraph']):
         finish = get_finish_stage(parents=without_successors, rand=rand)
         return WorkGraph(start, finish)
 
-    def to_frame(self, save_req=False) -> pd.DataFrame:
-        # Define the format of the output DataFrame
-        graph_df_structure = {'activity_id': [],
-                              'activity_name': [],
-                              'granular_name': [],
-                              'volume': [],
-                              'measurement': [],
-                              'priority': [],
-                              'predecessor_ids': [],
-                              'connection_types': [],
-                              'lags': []}
-
-        if save_req:
-            graph_df_structure['min_req'] = []
-            graph_df_structure['max_req'] = []
-            graph_df_structure['req_volume'] = []
-
-        # List of service 'start' and 'finish' nodes, which will not be included to the project's DataFrame
-        start_finish_service_nodes = [self.start.id, self.finish.id]
+    def to_frame(self, save_req=False, columns: Iterable[str] | None = None) -> pd.DataFrame:
+        """
+        Exports the graph to the project DataFrame without service start and finish nodes.
+        Columns are built directly from node attributes, so only requested ones are computed.
 
-        for node in self.nodes:
-            if node.id not in start_finish_service_nodes:
-                node_info_dict = node.dumpd()
-
-                # Get information about tasks from graph nodes (work units)
-                graph_df_structure['activity_id'].append(node_info_dict['work_unit']['id'])
-                graph_df_structure['activity_name'].append(node_info_dict['work_unit']['display_name'])
-                graph_df_structure['granular_name'].append(node_info_dict['work_unit']['name'])
-                graph_df_structure['volume'].append(node_info_dict['work_unit']['volume'])
-                graph_df_structure['measurement'].append(node_info_dict['work_unit']['volume_type'])
-                graph_df_structure['priority'].append(node_info_dict['work_unit']['priority'])
-
-                if save_req:
-                    min_req_dict = dict()
-                    max_req_dict = dict()
-                    req_volume_dict = dict()
-
-                    for req in node_info_dict['work_unit']['worker_reqs']:
-                        min_req_dict[req['kind']] = req['min_count']
-                        max_req_dict[req['kind']] = req['max_count']
-                        req_volume_dict[req['kind']] = req['volume']['value']
-
-                    graph_df_structure['min_req'].append(min_req_dict)
-                    graph_df_structure['max_req'].append(max_req_dict)
-                    graph_df_structure['req_volume'].append(req_volume_dict)
-
-                # Get information about connections between tasks from parent edges
-                predecessors_lst = []
-                connection_types_lst = []
-                lags_lst = []
-                for predecessor_info in node_info_dict['parent_edges']:
-                    if predecessor_info[0] not in start_finish_service_nodes:
-                        predecessors_lst.append(str(predecessor_info[0]))
-                        lags_lst.append(str(predecessor_info[1]))
-                        connection_types_lst.append(str(predecessor_info[2]))
-
-                graph_df_structure['predecessor_ids'].append(','.join(predecessors_lst))
-                graph_df_structure['lags'].append(','.join(lags_lst))
-                graph_df_structure['connection_types'].append(','.join(connection_types_lst))
-
-        return pd.DataFrame.from_dict(graph_df_structure)
+        :param save_req: whether to add 'min_req', 'max_req' and 'req_volume' columns
+        :param columns: subset of columns to export, all columns in default order if not specified
+        :return: project DataFrame
+        """
+        if columns is None:
+            columns = FRAME_COLUMNS + FRAME_REQ_COLUMNS if save_req else FRAME_COLUMNS
+        else:
+            columns = list(columns)
+            unknown = [column for column in columns if column not in FRAME_COLUMNS + FRAME_REQ_COLUMNS]
+            if unknown:
+                raise ValueError(f'Unknown WorkGraph frame columns: {unknown}')
+
+        # Service 'start' and 'finish' nodes are not included to the project's DataFrame
+        service_ids = {self.start.id, self.finish.id}
+        nodes = [node for node in self.nodes if node.id not in service_ids]
+        units = [node.work_unit for node in nodes]
+
+        @lru_cache
+        def parent_edges() -> list[list[GraphEdge]]:
+            return [[edge for edge in node.edges_to if edge.start.id not in service_ids] for node in nodes]
+
+        def reqs_column(getter) -> list[dict]:
+            return [{req.kind: getter(req) for req in unit.worker_reqs} for unit in units]
+
+        column_builders = {
+            'activity_id': lambda: [unit.id for unit in units],
+            'activity_name': lambda: [unit.display_name for unit in units],
+            'granular_name': lambda: [unit.name for unit in units],
+            'volume': lambda: [unit.volume for unit in units],
+            'measurement': lambda: [unit.volume_type for unit in units],
+            'priority': lambda: [unit.priority for unit in units],
+            'predecessor_ids': lambda: [','.join(str(edge.start.id) for edge in edges) for edges in parent_edges()],
+            'connection_types': lambda: [','.join(str(edge.type.value) for edge in edges)
+                                         for edges in parent_edges()],
+            'lags': lambda: [','.join(str(edge.lag) for edge in edges) for edges in parent_edges()],
+            'min_req': lambda: reqs_column(lambda req: req.min_count),
+            'max_req': lambda: reqs_column(lambda req: req.max_count),
+            # restructured graphs can contain plain numeric volumes
+            'req_volume': lambda: reqs_column(lambda req: req.volume.value if isinstance(req.volume, Time)
+                                              else req.volume),
+        }
+
+        return pd.DataFrame.from_dict({column: column_builders[column]() for column in columns})
 
     def __hash__(self) -> int:
         return hash(self.start) + 17 * hash(self.finish)
@@ -464,25 +564,24 @@ class WorkGraph(JSONSerializable['WorkGraph']):
 
         return WorkGraph(nodes_dict[start_id], nodes_dict[finish_id])
 
-    # TODO: Check that adj matrix is really need
-    def _to_adj_matrix(self) -> tuple[list[GraphNode], dok_matrix, dict[str, GraphNode]]:
+    @cached_property
+    def adj_matrix(self) -> csr_matrix:
         """
-        Build adjacency matrix from current graph
+        Adjacency matrix of the graph, built on first access.
+        Edge weight is the maximum volume of the parent's worker requirements.
+
+        :return: sparse adjacency matrix in the order of `nodes`
         """
-        ordered_nodes: list[GraphNode] = list(self.start.traverse_children(topologically=True))
-        node2ind: dict[GraphNode, int] = {
-            v: i for i, v in enumerate(ordered_nodes)
-        }
-        id2node: dict[str, GraphNode] = {node.id: node for node in node2ind.keys()}
-        adj_mx = dok_matrix((len(node2ind), len(node2ind)), dtype=np.short)
-        weight = 0
-        for v, i in node2ind.items():
-            for child in v.children:
-                c_i = node2ind[child]
-                weight = max((w_req.volume for w_req in v.work_unit.worker_reqs), default=0.000001)
-                adj_mx[i, c_i] = weight
-
-        return ordered_nodes, adj_mx, id2node
+        arrays = self.arrays
+        has_reqs = arrays.req_mask.any(axis=1)
+        weights = np.where(has_reqs,
+                           np.where(arrays.req_mask, arrays.req_volume, -np.inf).max(axis=1, initial=-np.inf),
+                           0.000001)
+        data = np.repeat(weights, np.diff(arrays.children_indptr)).astype(np.short)
+        adj_mx = csr_matrix((data, arrays.children_indices, arrays.children_indptr),
+                            shape=(self.vertex_count, self.vertex_count), dtype=np.short)
+        adj_mx.eliminate_zeros()
+        return adj_mx
 
 
 def recreate(state):
@@ -0,0 +1,319 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Iterable, TYPE_CHECKING
+
+import numpy as np
+
+from sampo.schemas.time import Time
+
+if TYPE_CHECKING:
+    from sampo.schemas.contractor import Contractor
+    from sampo.schemas.graph import GraphNode
+
+CAPABILITIES_CACHE_SIZE = 8
+
+
+def csr_from_lists(neighbours: list[list[int]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Packs list of adjacency lists into CSR form
+
+    :param neighbours: adjacency list for each vertex
+    :return: index pointer array and indices array
+    """
+    indptr = np.zeros(len(neighbours) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(n) for n in neighbours])
+    indices = np.fromiter((i for n in neighbours for i in n), dtype=np.int64, count=indptr[-1])
+    return indptr, indices
+
+
+def req_volume_value(volume: Time | float) -> float:
+    return float(volume.value) if isinstance(volume, Time) else float(volume)
+
+
+@dataclass
+class WorkGraphArrays:
+    """
+    Compact array view of `WorkGraph` shared by schedulers and validation.
+    Node-level arrays are indexed by positions in `WorkGraph.nodes`,
+    head-level arrays are indexed by positions in `head_order` (inseparable chains are collapsed into heads)
+    """
+    nodes: list['GraphNode']
+    id2index: dict[str, int]
+
+    # dependency edges (node.parents / node.children) of the whole graph
+    parents_indptr: np.ndarray
+    parents_indices: np.ndarray
+    children_indptr: np.ndarray
+    children_indices: np.ndarray
+
+    topological_order: np.ndarray
+    # index of the inseparable chain head for each node
+    chain_ids: np.ndarray
+    priorities: np.ndarray
+
+    # dependency edges between inseparable chain heads
+    head_order: np.ndarray
+    head_parents_indptr: np.ndarray
+    head_parents_indices: np.ndarray
+    head_children_indptr: np.ndarray
+    head_children_indices: np.ndarray
+
+    # requirements matrices of shape (nodes, worker kinds)
+    worker_kinds: list[str]
+    kind2index: dict[str, int]
+    req_volume: np.ndarray
+    req_min: np.ndarray
+    req_max: np.ndarray
+    # mask of worker kinds required by the node
+    req_mask: np.ndarray
+
+    # capability matrices of the last used contractors' keys
+    _capabilities: OrderedDict[tuple, np.ndarray] = field(default_factory=OrderedDict, init=False, repr=False)
+
+    @staticmethod
+    def from_nodes(nodes: list['GraphNode']) -> 'WorkGraphArrays':
+        """
+        Builds array view from the topologically ordered nodes
+
+        :param nodes: nodes of `WorkGraph` in topological order
+        :return: array view of graph
+        """
+        id2index = {node.id: i for i, node in enumerate(nodes)}
+        n = len(nodes)
+
+        parents_indptr, parents_indices = csr_from_lists([[id2index[p.id] for p in node.parents_set]
+                                                          for node in nodes])
+        children_indptr, children_indices = csr_from_lists([[id2index[c.id] for c in node.children_set]
+                                                            for node in nodes])
+
+        chain_ids = np.arange(n, dtype=np.int64)
+        for i, node in enumerate(nodes):
+            if node.is_inseparable_son():
+                continue
+            for inseparable in node.get_inseparable_chain_with_self():
+                chain_ids[id2index[inseparable.id]] = i
+
+        priorities = np.array([node.work_unit.priority for node in nodes], dtype=np.int64)
+
+        head_order, head_parents, head_children = _head_structure(nodes, chain_ids, parents_indptr, parents_indices,
+                                                                  children_indptr, children_indices)
+        head_parents_indptr, head_parents_indices = csr_from_lists(head_parents)
+        head_children_indptr, head_children_indices = csr_from_lists(head_children)
+
+        worker_kinds = list(dict.fromkeys(req.kind for node in nodes for req in node.work_unit.worker_reqs))
+        kind2index = {kind: i for i, kind in enumerate(worker_kinds)}
+        req_volume = np.zeros((n, len(worker_kinds)), dtype=float)
+        req_min = np.zeros((n, len(worker_kinds)), dtype=np.int64)
+        req_max = np.zeros((n, len(worker_kinds)), dtype=np.int64)
+        req_mask = np.zeros((n, len(worker_kinds)), dtype=bool)
+        for i, node in enumerate(nodes):
+            for req in node.work_unit.worker_reqs:
+                k = kind2index[req.kind]
+                req_volume[i, k] = req_volume_value(req.volume)
+                req_min[i, k] = req.min_count
+                req_max[i, k] = req.max_count
+                req_mask[i, k] = True
+
+        return WorkGraphArrays(nodes, id2index,
+                               parents_indptr, parents_indices, children_indptr, children_indices,
+                               np.arange(n, dtype=np.int64), chain_ids, priorities,
+                               head_order, head_parents_indptr, head_parents_indices,
+                               head_children_indptr, head_children_indices,
+                               worker_kinds, kind2index, req_volume, req_min, req_max, req_mask)
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.nodes)
+
+    @cached_property
+    def content_hash(self) -> str:
+        """
+        Digest of the graph content, that affects scheduling: works' ids, worker requirements, priorities,
+        dependencies and inseparable chains. Equal graphs built independently have equal digests.
+
+        :return: hex digest
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for node in self.nodes:
+            digest.update(node.id.encode('utf-8'))
+            digest.update(b'\0')
+        for kind in self.worker_kinds:
+            digest.update(kind.encode('utf-8'))
+            digest.update(b'\0')
+        for array in (self.req_volume, self.req_min, self.req_max, self.priorities,
+                      self.parents_indptr, self.parents_indices, self.chain_ids):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def parents_of(self, index: int) -> np.ndarray:
+        return self.parents_indices[self.parents_indptr[index]:self.parents_indptr[index + 1]]
+
+    def children_of(self, index: int) -> np.ndarray:
+        return self.children_indices[self.children_indptr[index]:self.children_indptr[index + 1]]
+
+    def head_parents_of(self, head_index: int) -> np.ndarray:
+        return self.head_parents_indices[self.head_parents_indptr[head_index]:
+                                         self.head_parents_indptr[head_index + 1]]
+
+    def head_children_of(self, head_index: int) -> np.ndarray:
+        return self.head_children_indices[self.head_children_indptr[head_index]:
+                                          self.head_children_indptr[head_index + 1]]
+
+    def edges(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :return: parent and child node indices of every dependency edge
+        """
+        child = np.repeat(np.arange(self.vertex_count, dtype=np.int64), np.diff(self.parents_indptr))
+        return self.parents_indices, child
+
+    def head_nodes(self) -> list['GraphNode']:
+        return [self.nodes[i] for i in self.head_order]
+
+    def requirements_matrices(self, worker_kinds: Iterable[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Realigns requirement matrices to the given worker kinds order.
+        Kinds that no node requires get zero columns.
+
+        :param worker_kinds: target worker kinds order
+        :return: volume, min and max requirement matrices of shape (nodes, given kinds)
+        """
+        columns = [self.kind2index.get(kind, -1) for kind in worker_kinds]
+        result = []
+        for matrix in (self.req_volume, self.req_min, self.req_max):
+            aligned = np.zeros((self.vertex_count, len(columns)), dtype=matrix.dtype)
+            for target, source in enumerate(columns):
+                if source >= 0:
+                    aligned[:, target] = matrix[:, source]
+            result.append(aligned)
+        return tuple(result)
+
+    def capacity_matrix(self, contractors: list['Contractor'], worker_kinds: Iterable[str] | None = None) \
+            -> np.ndarray:
+        """
+        Builds contractors x worker kinds matrix of workers' counts
+
+        :param contractors: contractors to describe
+        :param worker_kinds: worker kinds order, kinds of this graph are used by default
+        :return: capacity matrix, kinds that contractor doesn't have are filled with zeros
+        """
+        return capacity_matrix(contractors, self.worker_kinds if worker_kinds is None else worker_kinds)
+
+    def capability_matrix(self, contractors: list['Contractor']) -> np.ndarray:
+        """
+        Returns nodes x contractors matrix of whether the contractor can perform the node.
+        It's computed once for the given contractors' content,
+        the matrices of the last `CAPABILITIES_CACHE_SIZE` contractors' contents are kept.
+
+        :param contractors: contractors to check
+        :return: boolean capability matrix
+        """
+        key = contractors_key(contractors)
+        capable = self._capabilities.get(key)
+        if capable is not None:
+            self._capabilities.move_to_end(key)
+            return capable
+        capable = capability_matrix(self.req_min, self.req_mask, self.worker_kinds, contractors)
+        self._capabilities[key] = capable
+        if len(self._capabilities) > CAPABILITIES_CACHE_SIZE:
+            self._capabilities.popitem(last=False)
+        return capable
+
+
+def contractors_key(contractors: list['Contractor']) -> tuple:
+    """
+    :return: hashable snapshot of contractors' ids and workers' counts, e.g. to use as a part of cache key
+    """
+    return tuple((contractor.id, tuple((name, worker.count) for name, worker in contractor.workers.items()))
+                 for contractor in contractors)
+
+
+def capability_matrix(req_min: np.ndarray, req_mask: np.ndarray, worker_kinds: Iterable[str],
+                      contractors: list['Contractor']) -> np.ndarray:
+    """
+    Builds works x contractors matrix of whether the contractor can perform the work,
+    i.e. it has workers of each required kind in amount not less than the minimal requirement
+
+    :param req_min: works x worker kinds matrix of minimal requirements
+    :param req_mask: works x worker kinds mask of required kinds
+    :param worker_kinds: worker kinds order of requirement matrices
+    :param contractors: contractors to check
+    :return: boolean capability matrix
+    """
+    worker_kinds = list(worker_kinds)
+    capacity = capacity_matrix(contractors, worker_kinds)
+    capable = np.zeros((len(req_min), len(contractors)), dtype=bool)
+    # contractors are processed one by one to avoid works x contractors x kinds temporary arrays
+    for i, contractor in enumerate(contractors):
+        has_kind = np.array([kind in contractor.workers for kind in worker_kinds], dtype=bool)
+        capable[:, i] = (~req_mask | (has_kind & (req_min <= capacity[i]))).all(axis=1)
+    return capable
+
+
+def capacity_matrix(contractors: list['Contractor'], worker_kinds: Iterable[str]) -> np.ndarray:
+    """
+    Builds contractors x worker kinds matrix of workers' counts
+
+    :param contractors: contractors to describe
+    :param worker_kinds: worker kinds order
+    :return: capacity matrix, kinds that contractor doesn't have are filled with zeros
+    """
+    worker_kinds = list(worker_kinds)
+    capacity = np.zeros((len(contractors), len(worker_kinds)), dtype=int)
+    for i, contractor in enumerate(contractors):
+        for j, kind in enumerate(worker_kinds):
+            worker = contractor.workers.get(kind)
+            if worker is not None:
+                capacity[i, j] = worker.count
+    return capacity
+
+
+def _head_structure(nodes: list['GraphNode'],
+                    chain_ids: np.ndarray,
+                    parents_indptr: np.ndarray,
+                    parents_indices: np.ndarray,
+                    children_indptr: np.ndarray,
+                    children_indices: np.ndarray) -> tuple[np.ndarray, list[list[int]], list[list[int]]]:
+    """
+    Collapses inseparable chains into their heads and orders heads topologically.
+    Heads are sorted level by level, and inside each level by id, so the order matches `toposort_flatten(sort=True)`.
+    """
+    heads = [i for i in range(len(nodes)) if chain_ids[i] == i]
+    node2head_pos = {}
+
+    # parents and children of heads in node indices
+    head_parent_nodes: dict[int, set[int]] = {head: set() for head in heads}
+    head_child_nodes: dict[int, set[int]] = {head: set() for head in heads}
+    for i in range(len(nodes)):
+        head = int(chain_ids[i])
+        head_parent_nodes[head].update(int(chain_ids[p]) for p in parents_indices[parents_indptr[i]:
+                                                                                   parents_indptr[i + 1]])
+        head_child_nodes[head].update(int(chain_ids[c]) for c in children_indices[children_indptr[i]:
+                                                                                   children_indptr[i + 1]])
+    for head in heads:
+        head_parent_nodes[head].discard(head)
+        head_child_nodes[head].discard(head)
+
+    # layered Kahn's algorithm
+    in_degree = {head: len(head_parent_nodes[head]) for head in heads}
+    level = [head for head in heads if in_degree[head] == 0]
+    order = []
+    while level:
+        level.sort(key=lambda h: nodes[h].id)
+        order.extend(level)
+        next_level = []
+        for head in level:
+            for child in head_child_nodes[head]:
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    next_level.append(child)
+        level = next_level
+
+    for pos, head in enumerate(order):
+        node2head_pos[head] = pos
+
+    head_parents = [[node2head_pos[p] for p in head_parent_nodes[head]] for head in order]
+    head_children = [[node2head_pos[c] for c in head_child_nodes[head]] for head in order]
+
+    return np.array(order, dtype=np.int64), head_parents, head_children
@@ -1,11 +1,13 @@
+import heapq
 from copy import deepcopy
 from datetime import datetime
 from functools import lru_cache
 from typing import Iterable, Union
 
+import numpy as np
 from pandas import DataFrame
 
-from sampo.schemas.graph import WorkGraph, GraphNode
+from sampo.schemas.graph import WorkGraph
 from sampo.schemas.scheduled_work import ScheduledWork
 from sampo.schemas.serializable import JSONSerializable, T
 from sampo.schemas.time import Time
@@ -31,10 +33,13 @@ class Schedule(JSONSerializable['Schedule']):
     @property
     def full_schedule_df(self) -> DataFrame:
         """
-        The full schedule DataFrame with all works, data columns and a distinct column for ScheduledWork objects
+        The full schedule DataFrame with all works, data columns and a distinct column for ScheduledWork objects.
+        It's built on the first access.
 
         :return: Full schedule DataFrame.
         """
+        if self._schedule is None:
+            self._schedule = self._build_df()
         return self._schedule
 
     @property
@@ -44,10 +49,7 @@ class Schedule(JSONSerializable['Schedule']):
 
         :return: Pure schedule DataFrame.
         """
-        return self._schedule[~self._schedule.apply(
-            lambda row: row[self._scheduled_work_column].is_service_unit,
-            axis=1
-        )][self._data_columns]
+        return self.full_schedule_df[~self._is_service_unit][self._data_columns]
 
     @property
     def works(self) -> Iterable[ScheduledWork]:
@@ -56,7 +58,7 @@ class Schedule(JSONSerializable['Schedule']):
 
         :return: Iterable collection of all the scheduled works.
         """
-        return self._schedule.scheduled_work_object
+        return self._works
 
     @property
     def to_schedule_work_dict(self) -> ScheduleWorkDict:
@@ -65,7 +67,21 @@ class Schedule(JSONSerializable['Schedule']):
 
         :return: ScheduleWorkDict with all the scheduled works.
         """
-        return {r['task_id']: r['scheduled_work_object'] for _, r in self._schedule.iterrows()}
+        return {work.id: work for work in self._works}
+
+    @property
+    def start_times(self) -> np.ndarray:
+        """
+        :return: start times of the works in the Schedule order
+        """
+        return self._start
+
+    @property
+    def finish_times(self) -> np.ndarray:
+        """
+        :return: finish times of the works in the Schedule order
+        """
+        return self._finish
 
     @property
     def execution_time(self) -> Time:
@@ -74,22 +90,45 @@ class Schedule(JSONSerializable['Schedule']):
 
         :return: Finish time of the last work.
         """
-        return Time(self._schedule.iloc[-1].finish)
+        return Time(int(self._finish[-1]))
 
-    def __init__(self, schedule: DataFrame) -> None:
+    def __init__(self, works: list[ScheduledWork], idx: np.ndarray | None = None) -> None:
         """
-        Initializes new `Schedule` object as a wrapper around `DataFrame` with specific structure.
+        Initializes new `Schedule` object as a wrapper around ordered list of `ScheduledWork`.
         Do not use manually. Create Schedule `objects` via `from_scheduled_works` factory method.
 
-        :param schedule: Prepared schedule `DataFrame`.
+        :param works: ordered scheduled works
+        :param idx: positions of the works in the collection the schedule was created from
         """
-        self._schedule = schedule
+        self._works = works
+        self._idx = idx if idx is not None else np.arange(len(works))
+        times = np.array([[t.value for t in work.start_end_time] for work in works], dtype=np.int64).reshape(-1, 2)
+        self._start = times.min(axis=1)
+        self._finish = times.max(axis=1)
+        self._is_service_unit = np.fromiter((work.is_service_unit for work in works), dtype=bool, count=len(works))
+        self._schedule: DataFrame | None = None
+
+    def _build_df(self) -> DataFrame:
+        data_frame = [(i,                                                 # idx
+                       w.id,                                              # task_id
+                       w.display_name,                                    # task_name
+                       w.name,                                            # task_name_mapped
+                       w.contractor,                                      # contractor info
+                       w.cost,                                            # work cost
+                       w.volume,                                          # work volume
+                       w.volume_type,                                     # work volume type
+                       start, finish, finish - start,                     # start, end, duration
+                       repr(dict((i.name, i.count) for i in w.workers)),  # workers
+                       w  # full ScheduledWork info
+                       ) for i, w, start, finish in zip(self._idx.tolist(), self._works,
+                                                        self._start.tolist(), self._finish.tolist())]
+        return DataFrame.from_records(data_frame, columns=Schedule._columns)
 
     # [SECTION] JSONSerializable overrides
     def _serialize(self) -> T:
         # Method described in base class
         return {
-            'works': [sw._serialize() for sw in self._schedule.scheduled_work_object]
+            'works': [sw._serialize() for sw in self._works]
         }
 
     @classmethod
@@ -105,7 +144,7 @@ class Schedule(JSONSerializable['Schedule']):
         :param offset: Start of schedule, to add as an offset.
         :return: Shifted schedule DataFrame with merged tasks.
         """
-        result = fix_split_tasks(offset_schedule(self._schedule, offset))
+        result = fix_split_tasks(offset_schedule(self.full_schedule_df, offset))
         return result
 
     def unite_stages(self) -> 'Schedule':
@@ -113,7 +152,7 @@ class Schedule(JSONSerializable['Schedule']):
         Merge stages and reconstruct the `Schedule`
         :return: `Schedule` with inseparable chains united
         """
-        merged_df = fix_split_tasks(self._schedule)
+        merged_df = fix_split_tasks(self.full_schedule_df)
 
         def f(row):
             swork: ScheduledWork = deepcopy(row[self._scheduled_work_column])
@@ -139,44 +178,16 @@ class Schedule(JSONSerializable['Schedule']):
         :param works: Iterable collection of ScheduledWork's.
         :return: Schedule.
         """
+        works = list(works)
         ordered_task_ids = order_nodes_by_start_time(works, wg) if wg else None
 
-        def sed(time1, time2, swork) -> tuple:
-            """
-            Sorts times and calculates difference.
-            :param time1: time 1.
-            :param time2: time 2.
-            :return: tuple: start, end, duration.
-            """
-            start, end = tuple(sorted((time1, time2)))
-            return start, end, end - start
+        if not ordered_task_ids:
+            return Schedule(works)
 
-        data_frame = [(i,                                                 # idx
-                       w.id,                                              # task_id
-                       w.display_name,                                    # task_name
-                       w.name,                                            # task_name_mapped
-                       w.contractor,                                      # contractor info
-                       w.cost,                                            # work cost
-                       w.volume,                                          # work volume
-                       w.volume_type,                                     # work volume type
-                       *sed(*(t.value for t in w.start_end_time), w),     # start, end, duration
-                       repr(dict((i.name, i.count) for i in w.workers)),  # workers
-                       w  # full ScheduledWork info
-                       ) for i, w in enumerate(works)]
-        data_frame = DataFrame.from_records(data_frame, columns=Schedule._columns)
-
-        data_frame = data_frame.set_index('idx', drop=False)
-
-        if ordered_task_ids:
-            data_frame.task_id = data_frame.task_id.astype('category')
-            data_frame.task_id = data_frame.task_id.cat.set_categories(ordered_task_ids)
-            data_frame = data_frame.sort_values(['task_id'])
-            data_frame.task_id = data_frame.task_id.astype(str)
-
-        data_frame = data_frame.reindex(columns=Schedule._columns)
-        data_frame = data_frame.reset_index(drop=True)
-
-        return Schedule(data_frame)
+        task_order = {task_id: i for i, task_id in enumerate(ordered_task_ids)}
+        # works, that are absent in the ordering, go to the end
+        idx = sorted(range(len(works)), key=lambda i: task_order.get(works[i].id, len(task_order)))
+        return Schedule([works[i] for i in idx], np.array(idx, dtype=np.int64))
 
 
 def order_nodes_by_start_time(works: Iterable[ScheduledWork], wg: WorkGraph) -> list[str]:
@@ -185,42 +196,34 @@ def order_nodes_by_start_time(works: Iterable[ScheduledWork], wg: WorkGraph) ->
     1. Ascending order by start time
     2. Toposort
 
+    Works are sorted with Kahn's algorithm, where the ready works are popped from the heap by start time.
+    Only dependencies between works with equal start times are taken into account.
+
     :param works:
     :param wg:
     :return:
     """
+    works = sorted(works, key=lambda item: item.start_time)
+    # ranks follow start times, so the heap of ranks pops ready works in start time order
+    rank = {work.id: i for i, work in enumerate(works)}
+
+    children: list[list[int]] = [[] for _ in works]
+    in_degree = [0] * len(works)
+    for i, work in enumerate(works):
+        for parent in wg[work.id].parents:
+            j = rank.get(parent.id)
+            if j is not None and works[j].start_time == work.start_time:
+                children[j].append(i)
+                in_degree[i] += 1
+
+    ready = [i for i, degree in enumerate(in_degree) if degree == 0]
     res = []
-    order_by_start_time = [(item.start_time, item.id) for item in
-                           sorted(works, key=lambda item: item.start_time)]
-
-    cur_time = 0
-    cur_class: set[GraphNode] = set()
-    for start_time, work in order_by_start_time:
-        node = wg[work]
-        if len(cur_class) == 0:
-            cur_time = start_time
-        if start_time == cur_time:
-            cur_class.add(node)
-            continue
-        # TODO Perform real toposort
-        cur_not_added: set[GraphNode] = set(cur_class)
-        while len(cur_not_added) > 0:
-            for cur_node in cur_class:
-                if any(parent_node in cur_not_added for parent_node in cur_node.parents):
-                    continue  # we add this node later
-                res.append(cur_node.id)
-                cur_not_added.remove(cur_node)
-            cur_class = set(cur_not_added)
-        cur_time = start_time
-        cur_class = {node}
-
-    cur_not_added: set[GraphNode] = set(cur_class)
-    while len(cur_not_added) > 0:
-        for cur_node in cur_class:
-            if any(parent_node in cur_not_added for parent_node in cur_node.parents):
-                continue  # we add this node later
-            res.append(cur_node.id)
-            cur_not_added.remove(cur_node)
-        cur_class = set(cur_not_added)
+    while ready:
+        i = heapq.heappop(ready)
+        res.append(works[i].id)
+        for child in children[i]:
+            in_degree[child] -= 1
+            if in_degree[child] == 0:
+                heapq.heappush(ready, child)
 
     return res
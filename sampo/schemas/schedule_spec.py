@@ -56,3 +56,10 @@ class ScheduleSpec:
 
     def get_work_spec(self, work_id: str) -> WorkSpec:
         return self._work2spec[work_id]
+
+    def get_assigned_workers_key(self) -> tuple:
+        """
+        :return: hashable snapshot of workers assigned to works, e.g. to use as a part of cache key
+        """
+        return tuple((work_id, tuple(work_spec.assigned_workers.items()))
+                     for work_id, work_spec in self._work2spec.items() if work_spec.assigned_workers)
@@ -41,6 +41,7 @@ class Serializable(ABC, Generic[T, S]):
     :param ABC: helper class to create custom abstract classes
     :param Generic[T, S]: base class to make Serializable as universal class, using user's types T, S
     """
+    __slots__ = ()
 
     @property
     @abstractmethod
@@ -176,6 +177,7 @@ class JSONSerializable(Serializable[dict[str,
     :param Generic[JS]: base class to make JSONSerializable as universal class, 
     using user's types JS and it's descendants
     """
+    __slots__ = ()
 
     @abstractmethod
     def _serialize(self) -> T:
@@ -2,7 +2,7 @@ from abc import ABC, abstractmethod
 from enum import Enum
 from operator import attrgetter
 from random import Random
-from typing import Optional, Type
+from typing import Hashable, Optional, Type
 
 import numpy.random
 import math
@@ -50,6 +50,13 @@ class WorkTimeEstimator(ABC):
     def get_recreate_info(self) -> tuple[Type, tuple]:
         ...
 
+    def get_cache_key(self) -> Hashable | None:
+        """
+        :return: hashable description of the estimator state, that determines estimated times,
+                 or None if estimations are not deterministic and shouldn't be cached
+        """
+        return None
+
 
 class DefaultWorkEstimator(WorkTimeEstimator):
 
@@ -126,6 +133,12 @@ class DefaultWorkEstimator(WorkTimeEstimator):
     def get_recreate_info(self) -> tuple[Type, tuple]:
         return DefaultWorkEstimator, ()
 
+    def get_cache_key(self) -> Hashable | None:
+        if self._productivity_mode is not WorkerProductivityMode.Static:
+            return None
+        return (type(self), self._use_idle, self._estimation_mode,
+                tuple((name, tuple(productivities.items())) for name, productivities in self._productivity.items()))
+
 
 def communication_coefficient(groups_count: int, max_groups: int) -> float:
     n = groups_count
@@ -34,3 +34,29 @@ class ScheduleEvent:
     time: Time
     swork: Optional['ScheduledWork']
     available_workers_count: int
+
+
+def schedule_event_cmp(event: ScheduleEvent | Time | tuple[Time, int, int]) -> tuple[Time, int, int]:
+    """
+    The sort key of ScheduleEvents in timelines.
+
+    Using time, seq_id and event_type we can guarantee that there may be only one possible order in cases:
+    (a) when events have the same time
+    (in this cases we need both time and seq_id to properly handle available_workers processing logic)
+    (b) when events have the same time and their start and end matches
+    (service tasks for instance may have zero length)
+    """
+    if isinstance(event, ScheduleEvent):
+        if event.event_type is EventType.INITIAL:
+            return Time(-1), -1, event.event_type.priority
+
+        return event.time, event.seq_id, event.event_type.priority
+
+    if isinstance(event, Time):
+        # instances of Time must be greater than almost all ScheduleEvents with same time point
+        return event, Time.inf().value, 2
+
+    if isinstance(event, tuple):
+        return event
+
+    raise ValueError(f'Incorrect type of value: {type(event)}')
@@ -15,6 +15,23 @@ from sampo.userinput.parser.general_build import add_graph_info, topsort_graph_d
 from sampo.userinput.parser.history import set_connections_info
 from sampo.utilities.name_mapper import NameMapper
 
+# columns, which are cast by the preprocessing of the works' info
+PREPROCESSED_COLUMNS = ['activity_id', 'granular_name', 'volume', 'min_req', 'max_req',
+                        'predecessor_ids', 'connection_types', 'lags', 'counts']
+
+
+def infer_numeric_columns(graph_df: pd.DataFrame):
+    """
+    Casts the columns, that are read as strings, to numbers, if all the values are numeric
+
+    :param graph_df: works' info
+    """
+    for column in graph_df.columns.difference(PREPROCESSED_COLUMNS):
+        try:
+            graph_df[column] = pd.to_numeric(graph_df[column])
+        except (ValueError, TypeError):
+            pass
+
 
 class CSVParser:
 
@@ -25,7 +42,9 @@ class CSVParser:
                         sep_history: str = ';',
                         name_mapper: NameMapper | None = None,
                         all_connections: bool = False,
-                        change_connections_info: bool = False) -> pd.DataFrame:
+                        change_connections_info: bool = False,
+                        connections_cache_dir: str | None = None,
+                        chunk_size: int | None = None) -> pd.DataFrame:
         """
         Read the input data about work graph and preprocess it.
 
@@ -73,22 +92,37 @@ class CSVParser:
         :param change_connections_info: whether it is necessary to change connections' information based on history data?
         :param sep_wg: separating character. It's mandatory if you send the WorkGraph .csv
         :param sep_history: separating character. It's mandatory if you send the HistoryData .csv file path
+        :param connections_cache_dir: folder to cache the connections restored from history data.
+        The repeated reading with the same history data loads them instead of computing
+        :param chunk_size: number of works read and preprocessed at once. It bounds the memory used for parsing
+        of the large files. If it's None, all the works are processed at once
         :return: preprocessed info about works
         """
-        graph_df = pd.read_csv(project_info, sep=sep_wg, header=0) if isinstance(project_info,
-                                                                                 str) else project_info.copy()
+        if isinstance(project_info, str):
+            # the chunks are read as strings, so the types of the columns don't depend on the chunk
+            chunks = pd.read_csv(project_info, sep=sep_wg, header=0, chunksize=chunk_size, dtype=str) \
+                if chunk_size is not None else [pd.read_csv(project_info, sep=sep_wg, header=0)]
+        else:
+            step = chunk_size or max(len(project_info.index), 1)
+            chunks = (project_info.iloc[begin:begin + step].copy()
+                      for begin in range(0, max(len(project_info.index), 1), step))
         history_df = pd.read_csv(history_data, sep=sep_history) if isinstance(history_data,
                                                                               str) else history_data.copy()
 
-        if 'predecessor_ids' not in graph_df.columns and history_df.shape[0] == 0:
-            raise InputDataException(
-                'you have neither history data about tasks nor tasks\' connection info in received .csv file.')
-
-        graph_df = preprocess_graph_df(graph_df, name_mapper)
+        graph_df = []
+        for chunk in chunks:
+            if 'predecessor_ids' not in chunk.columns and history_df.shape[0] == 0:
+                raise InputDataException(
+                    'you have neither history data about tasks nor tasks\' connection info in received .csv file.')
+            graph_df.append(preprocess_graph_df(chunk, name_mapper))
+        graph_df = pd.concat(graph_df, ignore_index=True)
+        if isinstance(project_info, str) and chunk_size is not None:
+            infer_numeric_columns(graph_df)
         id2ind = {graph_df.loc[i, 'activity_id']: i for i in range(len(graph_df.index))}
         works_info = set_connections_info(graph_df, history_df, mapper=name_mapper,
                                           all_connections=all_connections,
-                                          change_connections_info=change_connections_info, id2ind=id2ind)
+                                          change_connections_info=change_connections_info, id2ind=id2ind,
+                                          cache_dir=connections_cache_dir)
 
         return break_loops_in_input_graph(works_info)
 
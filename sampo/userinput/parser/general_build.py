@@ -1,5 +1,7 @@
+import heapq
 import math
 from collections import defaultdict
+from itertools import chain, compress
 from typing import Callable, Any
 from uuid import uuid4
 from ast import literal_eval
@@ -28,83 +30,203 @@ class Graph:
     def add_edge(self, u, v, weight=None):
         self.graph[u].append((v, weight))
 
-    def dfs_cycle(self, u, visited):
-        stack = [u]
-
-        while len(stack) > 0:
-            v = stack.pop()
-            if visited[v] == 1:
-                visited[v] = 2
-                continue
-            if visited[v] == 2:
+    def strongly_connected_components(self) -> list[list]:
+        """
+        Finds strongly connected components with the iterative Tarjan's algorithm
+
+        :return: list of components in reverse topological order
+        """
+        vertices = dict.fromkeys([u for u in self.graph] + [v for edges in self.graph.values() for v, _ in edges])
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+
+        for root in vertices:
+            if root in index:
                 continue
-            visited[v] = 1
-            stack.append(v)
-            for neighbour, weight in self.graph[v]:
-                if visited[neighbour] == 0:
-                    stack.append(neighbour)
-                elif visited[neighbour] == 1:
-                    return True
-        return False
-
-    def find_cycle(self):
-        visited = {}
-        for key, value in self.graph.items():
-            for v in value:
-                visited[v[0]] = 0
-            visited[key] = 0
-        path = []
-
-        for key, value in visited.items():
-            if value == 0:
-                if self.dfs_cycle(key, visited):
-                    v = key
-                    path.append(v)
-                    while v not in path[:-1]:
-                        for n, _ in self.graph[v]:
-                            if visited[n] == 1:
-                                v = n
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.graph.get(root, ())))]
+            while work:
+                u, edges = work[-1]
+                for v, _ in edges:
+                    if v not in index:
+                        index[v] = lowlink[v] = len(index)
+                        stack.append(v)
+                        on_stack.add(v)
+                        work.append((v, iter(self.graph.get(v, ()))))
+                        break
+                    if v in on_stack:
+                        lowlink[u] = min(lowlink[u], index[v])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[u])
+                    if lowlink[u] == index[u]:
+                        component = []
+                        while True:
+                            v = stack.pop()
+                            on_stack.discard(v)
+                            component.append(v)
+                            if v == u:
                                 break
-                        path.append(v)
-                    for v in path:
-                        visited[v] = 2
-                    return path
+                        components.append(component)
+        return components
+
+    def feedback_arc_set(self, component: list) -> list[tuple[list, list]]:
+        """
+        Finds edges, which removal makes the strongly connected component acyclic.
+        The vertices are ordered by the greedy heuristic of Eades, Lin and Smyth on the weighted degrees,
+        the backward edges of the order are the candidates to remove. They are returned back from the heaviest one,
+        if the cycles, which they close, can be broken by removing lighter edges.
+        Finally, each edge, that doesn't close a cycle anymore, is returned back.
+
+        :param component: vertices of the strongly connected component
+        :return: removed edges (u, v) with the cycles, which they close, as the paths [u, v, ..., u]
+        """
+        vertices = set(component)
+        # parallel edges are removed together, so their weights are summed
+        weights = defaultdict(int)
+        for u in component:
+            for v, weight in self.graph.get(u, ()):
+                if v in vertices:
+                    weights[(u, v)] += 1 if weight is None else weight
+
+        removed = [((u, v), [u, u]) for u, v in weights if u == v]
+        out_edges = defaultdict(dict)
+        in_edges = defaultdict(dict)
+        for (u, v), weight in weights.items():
+            if u != v:
+                out_edges[u][v] = weight
+                in_edges[v][u] = weight
+        if not out_edges:
+            return removed
+
+        out_weight = {u: sum(out_edges[u].values()) for u in component}
+        in_weight = {u: sum(in_edges[u].values()) for u in component}
+        out_degree = {u: len(out_edges[u]) for u in component}
+        in_degree = {u: len(in_edges[u]) for u in component}
+        position = {u: i for i, u in enumerate(component)}
+        # lazy heap of the vertices by the difference of weighted degrees, the outdated entries are skipped
+        heap = [(in_weight[u] - out_weight[u], position[u], u) for u in component]
+        heapq.heapify(heap)
+        sinks, sources = [], []
+        remaining = set(component)
+        left, right = [], []
+
+        def take(u, side: list):
+            remaining.discard(u)
+            side.append(u)
+            for v, weight in out_edges[u].items():
+                if v in remaining:
+                    in_weight[v] -= weight
+                    in_degree[v] -= 1
+                    if in_degree[v] == 0:
+                        sources.append(v)
+                    heapq.heappush(heap, (in_weight[v] - out_weight[v], position[v], v))
+            for v, weight in in_edges[u].items():
+                if v in remaining:
+                    out_weight[v] -= weight
+                    out_degree[v] -= 1
+                    if out_degree[v] == 0:
+                        sinks.append(v)
+                    heapq.heappush(heap, (in_weight[v] - out_weight[v], position[v], v))
+
+        while remaining:
+            if sinks:
+                u = sinks.pop()
+                if u in remaining:
+                    take(u, right)
+            elif sources:
+                u = sources.pop()
+                if u in remaining:
+                    take(u, left)
+            else:
+                delta, _, u = heapq.heappop(heap)
+                if u in remaining and delta == in_weight[u] - out_weight[u]:
+                    take(u, left)
+
+        order = {u: i for i, u in enumerate(left + right[::-1])}
+        backward = sorted(((u, v) for (u, v) in weights if u != v and order[u] > order[v]),
+                          key=lambda edge: (-weights[edge], order[edge[0]], order[edge[1]]))
+        kept = defaultdict(list)
+        for (u, v) in weights:
+            if u != v and order[u] < order[v]:
+                kept[u].append(v)
+
+        for u, v in backward:
+            # the edge is returned back, if the cycles, which it closes, can be broken by the lighter edges
+            replaced = []
+            replaced_weight = 0
+            path = self._find_path(kept, v, u)
+            while path is not None:
+                lightest = min(zip(path, path[1:]), key=weights.get)
+                replaced_weight += weights[lightest]
+                if replaced_weight >= weights[(u, v)]:
+                    break
+                kept[lightest[0]].remove(lightest[1])
+                replaced.append((lightest, [u] + path))
+                path = self._find_path(kept, v, u)
 
+            if path is None:
+                kept[u].append(v)
+                removed.extend(replaced)
+            else:
+                for (a, b), _ in replaced:
+                    kept[a].append(b)
+                removed.append(((u, v), [u] + path))
+
+        # the edges, which cycles were broken by the later removals, are not necessary to remove
+        necessary = []
+        for (u, v), cycle in sorted(removed, key=lambda item: -weights[item[0]]):
+            if u != v and self._find_path(kept, v, u) is None:
+                kept[u].append(v)
+            else:
+                necessary.append(((u, v), cycle))
+        return necessary
+
+    @staticmethod
+    def _find_path(edges: dict[Any, list], source, target) -> list | None:
+        parents = {source: None}
+        stack = [source]
+        while stack:
+            u = stack.pop()
+            if u == target:
+                path = []
+                while u is not None:
+                    path.append(u)
+                    u = parents[u]
+                return path[::-1]
+            for v in edges.get(u, ()):
+                if v not in parents:
+                    parents[v] = u
+                    stack.append(v)
         return None
 
-    def eliminate_cycle(self, cycle):
-        min_weight = float('inf')
-        min_edge = None
-
-        for i in range(len(cycle) - 1):
-            u = cycle[i]
-            v = cycle[i + 1]
-
-            for neighbor, weight in self.graph[u]:
-                if weight is None:
-                    weight = 1
-                if neighbor == v and weight <= min_weight:
-                    min_weight = weight
-                    min_edge = (u, v)
-
-        u, v = min_edge
-        self.graph[u] = [(neighbor, weight) for neighbor, weight in self.graph[u] if neighbor != v]
-
     def eliminate_cycles(self, is_eliminate_cycle: bool = True) -> list | None:
-        cycle = self.find_cycle()
-        cycles = []
+        """
+        Removes the edges, that close cycles. Each strongly connected component is processed independently,
+        see `Graph#feedback_arc_set`
 
-        while cycle is not None:
-            for i in range(len(cycle)):
-                if cycle[i] == cycle[-1]:
-                    cycle = cycle[i:]
-                    break
-            if not is_eliminate_cycle:
+        :param is_eliminate_cycle: if it's False, the found cycles are returned, otherwise the edges lose weights
+        :return: the cycles, that were broken, if `is_eliminate_cycle` is False
+        """
+        cycles = []
+        for component in self.strongly_connected_components():
+            if len(component) == 1 and all(v != component[0] for v, _ in self.graph.get(component[0], ())):
+                continue
+            removed = self.feedback_arc_set(component)
+            removed_children = defaultdict(set)
+            for (u, v), cycle in removed:
+                removed_children[u].add(v)
                 cycles.append(cycle)
-                self.eliminate_cycle(cycle)
-            else:
-                self.eliminate_cycle(cycle)
-            cycle = self.find_cycle()
+            for u, children in removed_children.items():
+                self.graph[u] = [(v, weight) for v, weight in self.graph[u] if v not in children]
+
         if not is_eliminate_cycle:
             if cycles:
                 return cycles
@@ -122,36 +244,51 @@ def break_loops_in_input_graph(works_info: pd.DataFrame) -> pd.DataFrame:
     :return: work info without cycles
     """
     graph = Graph()
-    for _, row in works_info.iterrows():
-        for pred_id, con_type, lag, counts in zip(row['predecessor_ids'], row['connection_types'], row['lags'],
-                                                  row['counts']):
+    for activity_id, predecessor_ids, counts in zip(works_info['activity_id'], works_info['predecessor_ids'],
+                                                    works_info['counts']):
+        for pred_id, count in zip(predecessor_ids, counts):
             if pred_id == '-1':
                 continue
-            graph.add_edge(pred_id, row['activity_id'], counts)
+            graph.add_edge(pred_id, activity_id, count)
 
     graph.eliminate_cycles()
-    for _, row in works_info.iterrows():
+    for row in zip(works_info['activity_id'], works_info['predecessor_ids'], works_info['connection_types'],
+                   works_info['lags'], works_info['counts']):
+        activity_id, predecessor_ids = row[0], row[1]
         i = 0
-        while i < len(row['predecessor_ids']):
-            if row['predecessor_ids'][i] not in graph.graph:
+        while i < len(predecessor_ids):
+            if predecessor_ids[i] not in graph.graph:
                 i += 1
                 continue
-            if row['activity_id'] in graph.graph[row['predecessor_ids'][i]]:
+            if activity_id in graph.graph[predecessor_ids[i]]:
                 i += 1
                 continue
-            del row['predecessor_ids'][i]
-            del row['connection_types'][i]
-            del row['lags'][i]
-            del row['counts'][i]
+            for column in row[1:]:
+                del column[i]
     return works_info.drop(columns=['counts'])
 
 
 def fix_df_column_with_arrays(column: pd.Series, cast: Callable[[str], Any] | None = str,
                               none_elem: Any | None = NONE_ELEM) -> pd.Series:
-    new_column = column.copy().astype(str).apply(
-        lambda elems: [cast(elem) if elem != '' and elem != str(math.nan) else none_elem for elem in
-                       elems.split(',')] if (elems != str(math.nan) and elems.split(',') != '') else [none_elem])
-    return new_column
+    """
+    Splits the comma separated values of the column into lists.
+    The whole column is split at once and each unique value is cast only once.
+
+    :param column: column of comma separated values
+    :param cast: cast of the values
+    :param none_elem: value of the empty and missing elements
+    :return: column of lists
+    """
+    cells = column.astype(str)
+    cells = cells.where(cells != str(math.nan), '')
+    elems = pd.Series(','.join(cells).split(','), dtype=object)
+    casts = {elem: cast(elem) if elem != '' and elem != str(math.nan) else none_elem for elem in elems.unique()}
+    values = elems.map(casts).tolist()
+
+    lengths = cells.str.count(',').to_numpy() + 1
+    ends = np.cumsum(lengths)
+    return pd.Series([values[begin:end] for begin, end in zip(ends - lengths, ends)],
+                     index=column.index, dtype=object)
 
 
 def preprocess_graph_df(frame: pd.DataFrame,
@@ -187,28 +324,30 @@ def preprocess_graph_df(frame: pd.DataFrame,
     for col in ['predecessor_ids', 'connection_types', 'lags', 'counts']:
         frame[col] = frame[col].astype(object)
 
-    for _, row in frame.iterrows():
-        frame.at[_, 'counts'] = [np.iinfo(np.int64).max] * len(frame.at[_, 'lags'])
+    frame['counts'] = pd.Series([[np.iinfo(np.int64).max] * len(lags) for lags in frame['lags']],
+                                index=frame.index, dtype=object)
 
     return frame
 
 
 def add_graph_info(frame: pd.DataFrame) -> pd.DataFrame:
-    existed_ids = set(frame['activity_id'])
-
-    predecessor_ids, connection_types, lags = [], [], []
-    for _, row in frame[['predecessor_ids', 'connection_types', 'lags']].iterrows():
-        predecessor_ids.append([])
-        connection_types.append([])
-        lags.append([])
-        for index in range(len(row['predecessor_ids'])):
-            if row['predecessor_ids'][index] in existed_ids:
-                predecessor_ids[-1].append(row['predecessor_ids'][index])
-                connection_types[-1].append(row['connection_types'][index])
-                lags[-1].append(row['lags'][index])
-    frame['predecessor_ids'], frame['connection_types'], frame['lags'] = predecessor_ids, connection_types, lags
-
-    frame['edges'] = frame[['predecessor_ids', 'connection_types', 'lags']].apply(lambda row: list(zip(*row)), axis=1)
+    # the edges of all works are flattened into arrays, the edges to the unknown works are filtered out
+    lengths = np.fromiter(map(len, frame['predecessor_ids']), dtype=np.int64, count=len(frame))
+    predecessor_ids = pd.Series(list(chain.from_iterable(frame['predecessor_ids'])), dtype=object)
+    existed = predecessor_ids.isin(set(frame['activity_id'])).to_numpy()
+    rows = np.repeat(np.arange(len(frame)), lengths)[existed]
+    bounds = np.searchsorted(rows, np.arange(len(frame) + 1))
+
+    predecessor_ids = predecessor_ids[existed].tolist()
+    connection_types = list(compress(chain.from_iterable(frame['connection_types']), existed))
+    lags = list(compress(chain.from_iterable(frame['lags']), existed))
+
+    def split(values: list) -> list[list]:
+        return [values[begin:end] for begin, end in zip(bounds[:-1], bounds[1:])]
+
+    frame['predecessor_ids'], frame['connection_types'], frame['lags'] = \
+        split(predecessor_ids), split(connection_types), split(lags)
+    frame['edges'] = split(list(zip(predecessor_ids, connection_types, lags)))
     return frame
 
 
@@ -220,13 +359,13 @@ def topsort_graph_df(frame: pd.DataFrame) -> pd.DataFrame:
     :return: topologically sorted DataFrame
     """
     G = nx.DiGraph()
-    for _, row in frame.iterrows():
-        G.add_node(row['activity_id'])
-        for pred_id, con_type, lag in row['edges']:
-            G.add_edge(pred_id, row['activity_id'])
+    for activity_id, edges in zip(frame['activity_id'], frame['edges']):
+        G.add_node(activity_id)
+        for pred_id, con_type, lag in edges:
+            G.add_edge(pred_id, activity_id)
 
-    sorted_nodes = list(nx.topological_sort(G))
-    frame['sort_key'] = frame['activity_id'].apply(lambda x: sorted_nodes.index(x))
+    sorted_nodes = {node: i for i, node in enumerate(nx.topological_sort(G))}
+    frame['sort_key'] = frame['activity_id'].map(sorted_nodes)
     frame = frame.sort_values('sort_key')
 
     return frame
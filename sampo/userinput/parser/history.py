@@ -1,5 +1,7 @@
 import datetime
+import hashlib
 import math
+import os
 from typing import Tuple
 
 import numpy as np
@@ -8,28 +10,9 @@ import pandas as pd
 from sampo.schemas.graph import EdgeType
 from sampo.utilities.name_mapper import NameMapper
 
+CONNECTIONS_CACHE_VERSION = 1
 
-def get_all_connections(graph_df: pd.DataFrame,
-                        use_mapper: bool = False,
-                        mapper: NameMapper | None = None) \
-        -> Tuple[dict[str, list], dict[str, list]]:
-
-    task_name_column = 'granular_name'
-
-    num_tasks = len(graph_df)
-    # Get the upper triangular indices to avoid duplicate pairs
-    indices = np.triu_indices(num_tasks, k=1)
-    works1_ids = graph_df['activity_id'].values[indices[0]]
-    works1_names = graph_df[task_name_column].values[indices[0]]
-
-    works2_ids = graph_df['activity_id'].values[indices[1]]
-    works2_names = graph_df[task_name_column].values[indices[1]]
-
-    if use_mapper:
-        works1_names = np.vectorize(mapper.get)(works1_names)
-        works2_names = np.vectorize(mapper.get)(works2_names)
-
-    return {"ids": works1_ids, "names": works1_names}, {"ids": works2_ids, "names": works2_names}
+_CONNECTION_TYPES = ['FS', 'SS', 'FFS']
 
 
 def get_delta_between_dates(first: str, second: str) -> int:
@@ -103,12 +86,190 @@ def gather_links_types_statistics(s1: str, f1: str, s2: str, f2: str) \
         ffs21, ffs21_lags, ffs21_percent_lags
 
 
+def _date_ordinal(date: str) -> int:
+    parts = date.split('-')
+    return datetime.date(int(parts[0]), int(parts[1]), int(parts[2])).toordinal()
+
+
+def _history_intervals(history_data: pd.DataFrame, column_name: str) -> pd.DataFrame:
+    """
+    Builds the index of the works' intervals: the works of each name on each site are sorted by the dates
+    and ranked, so the works of two names are compared by the equal ranks
+
+    :param history_data: history data of the works
+    :param column_name: column of the works' names
+    :return: intervals with 'site', 'name', 'rank', 'start', 'finish' and 'valid' columns
+    """
+    intervals = history_data[['upper_works', column_name, 'first_day', 'last_day']] \
+        .set_axis(['site', 'name', 'start', 'finish'], axis=1) \
+        .dropna(subset=['site', 'name']) \
+        .sort_values(by=['site', 'name', 'start', 'finish'], kind='stable') \
+        .reset_index(drop=True)
+    intervals['rank'] = intervals.groupby(['site', 'name'], sort=False).cumcount()
+    # the missing dates are read as float NaNs
+    intervals['valid'] = np.array([type(start) != float and type(finish) != float
+                                   for start, finish in zip(intervals['start'], intervals['finish'])], dtype=bool)
+    return intervals
+
+
+def _sequences_statistic(intervals: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, list[list[float]]]]:
+    """
+    Counts the statistics of the mutual arrangement of the works for all pairs of names,
+    that occurred within the same site. It's the same as `gather_links_types_statistics` over all
+    the compared works.
+
+    :param intervals: index built by `_history_intervals`
+    :return: counts of the arrangements by the pairs of names and lists of percent lags
+    of 'ffs12', 'ffs21', 'ss12' and 'ss21' arrangements in the order of the counts' rows
+    """
+    valid = intervals[intervals['valid']]
+    pairs = valid.merge(valid, on=['site', 'rank'], suffixes=('1', '2'))
+    pairs = pairs[pairs['name1'] != pairs['name2']] \
+        .sort_values(by=['name1', 'name2', 'site', 'rank'], kind='stable') \
+        .reset_index(drop=True)
+
+    s1, f1 = pairs['start1'].to_numpy(), pairs['finish1'].to_numpy()
+    s2, f2 = pairs['start2'].to_numpy(), pairs['finish2'].to_numpy()
+    ordinals = {date: _date_ordinal(date) for date in np.unique(np.concatenate([s1, f1, s2, f2]))}
+    os1, of1, os2, of2 = (np.array([ordinals[date] for date in dates], dtype=np.int64) for dates in (s1, f1, s2, f2))
+
+    equal = (s1 == s2) & (f1 == f2)
+    fs21 = f2 <= s1
+    fs12 = ~fs21 & (s2 >= f1)
+    overlap = ~fs21 & ~fs12
+    ffs12 = overlap & (s2 >= s1) & (f2 >= f1)
+    ss12 = overlap & (s2 >= s1) & (f2 < f1)
+    ffs21 = overlap & (s2 < s1) & (f2 <= f1)
+    ss21 = overlap & (s2 < s1) & (f2 > f1)
+
+    # the deltas between dates are not less than 1 day
+    percent_lags12 = np.maximum(os2 - os1, 1) / np.maximum(of1 - os1, 1)
+    percent_lags21 = np.maximum(os1 - os2, 1) / np.maximum(of2 - os2, 1)
+
+    pair_codes = pairs.groupby(['name1', 'name2'], sort=False).ngroup().to_numpy()
+    statistic = pd.DataFrame({'name1': pairs['name1'], 'name2': pairs['name2'], 'total': 1,
+                              'fs12': fs12, 'fs21': fs21, 'ss12': ss12, 'ss21': ss21,
+                              'ffs12': equal.astype(int) + ffs12, 'ffs21': ffs21}) \
+        .groupby(['name1', 'name2'], sort=False).sum().reset_index()
+
+    def split_lags(masks: list[np.ndarray], values: list[np.ndarray]) -> list[list[float]]:
+        # the lags of each pair are listed in the order of the compared works, the masks' order breaks ties
+        rows = np.concatenate([np.flatnonzero(mask) for mask in masks])
+        lags = np.concatenate([value[mask] for mask, value in zip(masks, values)])
+        order = np.argsort(rows, kind='stable')
+        rows, lags = rows[order], lags[order].tolist()
+        bounds = np.searchsorted(pair_codes[rows], np.arange(len(statistic) + 1))
+        return [lags[begin:end] for begin, end in zip(bounds[:-1], bounds[1:])]
+
+    percent_lags = {
+        'ffs12': split_lags([equal, ffs12], [np.full(len(pairs), 0.01), percent_lags12]),
+        'ffs21': split_lags([ffs21], [percent_lags21]),
+        'ss12': split_lags([ss12], [percent_lags12]),
+        'ss21': split_lags([ss21], [percent_lags21]),
+    }
+    return statistic, percent_lags
+
+
+def get_connections_statistic(history_data: pd.DataFrame, column_name: str) \
+        -> dict[tuple[str, str], tuple[int, str, float, int]]:
+    """
+    Restores the connections between all pairs of names, that occurred within the same site
+
+    :param history_data: history data of the works
+    :param column_name: column of the works' names
+    :return: order (1 if the first name is the predecessor, else 2), type, lag and count of the connections
+    by the pairs of names
+    """
+    statistic, percent_lags = _sequences_statistic(_history_intervals(history_data, column_name))
+
+    connections = {}
+    for i, row in enumerate(statistic.itertuples(index=False)):
+        if row.fs12 + row.ffs12 + row.ss12 >= row.fs21 + row.ffs21 + row.ss21:
+            order_con, fs, ffs, ss = 1, row.fs12, row.ffs12, row.ss12
+            ffs_lags, ss_lags = percent_lags['ffs12'][i], percent_lags['ss12'][i]
+        else:
+            order_con, fs, ffs, ss = 2, row.fs21, row.ffs21, row.ss21
+            ffs_lags, ss_lags = percent_lags['ffs21'][i], percent_lags['ss21'][i]
+
+        if max([fs, ss, ffs]) == 0:
+            continue
+        if fs > ss:
+            if ffs > 0:
+                connection = 'FFS', find_min_without_outliers(ffs_lags)
+            else:
+                connection = 'FS', 0.0
+        elif ss > ffs:
+            connection = 'SS', find_min_without_outliers(ss_lags)
+        else:
+            connection = 'FFS', find_min_without_outliers(ffs_lags)
+        connections[(row.name1, row.name2)] = order_con, *connection, int(row.total)
+
+    return connections
+
+
+def history_hash(history_data: pd.DataFrame, column_name: str) -> str:
+    """
+    Digest of the history data content, that affects the connections statistic
+
+    :param history_data: history data of the works
+    :param column_name: column of the works' names
+    :return: hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{CONNECTIONS_CACHE_VERSION}:{column_name}'.encode('utf-8'))
+    columns = history_data[['upper_works', column_name, 'first_day', 'last_day']]
+    digest.update(pd.util.hash_pandas_object(columns, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def dump_connections(connections: dict[tuple[str, str], tuple[int, str, float, int]], path: str):
+    """
+    Saves the connections statistic to the .npz file
+
+    :param connections: result of `get_connections_statistic`
+    :param path: path to the file
+    """
+    names = list(connections.keys())
+    order_con, types, lags, counts = zip(*connections.values()) if connections else ([], [], [], [])
+    # the file is written to the temporary one first, so the concurrent readers never see a partial file
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as file:
+        np.savez(file,
+                 names1=np.array([name1 for name1, _ in names], dtype=str),
+                 names2=np.array([name2 for _, name2 in names], dtype=str),
+                 order_con=np.array(order_con, dtype=np.int8),
+                 types=np.array([_CONNECTION_TYPES.index(connection_type) for connection_type in types], dtype=np.int8),
+                 lags=np.array(lags, dtype=np.float64),
+                 counts=np.array(counts, dtype=np.int64))
+    os.replace(tmp_path, path)
+
+
+def load_connections(path: str) -> dict[tuple[str, str], tuple[int, str, float, int]]:
+    """
+    Loads the connections statistic saved by `dump_connections`
+
+    :param path: path to the file
+    :return: connections by the pairs of names
+    """
+    with np.load(path, allow_pickle=False) as data:
+        return {(name1, name2): (order_con, _CONNECTION_TYPES[connection_type], lag, count)
+                for name1, name2, order_con, connection_type, lag, count
+                in zip(data['names1'].tolist(), data['names2'].tolist(), data['order_con'].tolist(),
+                       data['types'].tolist(), data['lags'].tolist(), data['counts'].tolist())}
+
+
 def get_all_seq_statistic(history_data: pd.DataFrame,
                           graph_df: pd.DataFrame,
                           use_model_name: bool = False,
-                          mapper: NameMapper | None = None):
-    df_grouped = history_data.copy()
+                          mapper: NameMapper | None = None,
+                          cache_dir: str | None = None):
+    """
+    Restores the connections between the works of the graph based on history data
 
+    :param cache_dir: folder of the connections statistic cache. If it's given, the statistic is computed
+    only once for each content of history data and then is loaded from the folder
+    :return: predecessors' info of each work
+    """
     if use_model_name:
         column_name = 'model_name'
     else:
@@ -116,113 +277,45 @@ def get_all_seq_statistic(history_data: pd.DataFrame,
             history_data['granular_name'] = [activity_name for activity_name in history_data['work_name']]
         column_name = 'granular_name'
 
-    df_grouped = df_grouped.groupby('upper_works')[column_name].apply(list).reset_index(name="Works")
-    works1, works2 = get_all_connections(graph_df, use_model_name, mapper)
+    if cache_dir is None:
+        connections = get_connections_statistic(history_data, column_name)
+    else:
+        path = os.path.join(cache_dir, f'connections_{history_hash(history_data, column_name)}.npz')
+        if os.path.exists(path):
+            connections = load_connections(path)
+        else:
+            connections = get_connections_statistic(history_data, column_name)
+            os.makedirs(cache_dir, exist_ok=True)
+            dump_connections(connections, path)
 
     # Declare structure with updated connections
 
-    tasks_names = list(zip(works1['names'], works2['names']))
-    tasks_ids = list(zip(works1['ids'], works2['ids']))
-
     predecessors_info_dict = {w_id: [] for w_id in graph_df['activity_id']}
 
-    if len(tasks_names) != 0:
-        for i in range(len(tasks_names)):
-            w1, w2 = tasks_names[i]
-            w1_id, w2_id = tasks_ids[i]
-
-            if w1 != w2:
-                fs12, fs21, ss12, ss21 = 0, 0, 0, 0
-                ss12_lags, ss12_percent_lags, ss21_lags, ss21_percent_lags = [], [], [], []
-
-                count = 0
-
-                ffs12, ffs21 = 0, 0
-                ffs12_lags, ffs12_percent_lags, ffs21_lags, ffs21_percent_lags = [], [], [], []
-
-                for i, work_list in df_grouped.iterrows():
-                    # Looking to see if this pair of works occurred within the same site in the historical data
-                    if w1 in work_list['Works'] and w2 in work_list['Works']:
-                        ind1 = history_data.loc[(history_data['upper_works'] == work_list['upper_works']) &
-                                                (history_data[column_name] == w1)]
-                        ind2 = history_data.loc[(history_data['upper_works'] == work_list['upper_works']) &
-                                                (history_data[column_name] == w2)]
-
-                        ind1_sorted = ind1.sort_values(by=['first_day', 'last_day']).reset_index(drop=True)
-                        ind2_sorted = ind2.sort_values(by=['first_day', 'last_day']).reset_index(drop=True)
-
-                        for l in range(min(len(ind1_sorted), len(ind2_sorted))):
-                            s1, f1 = ind1_sorted.loc[l, 'first_day'], ind1_sorted.loc[l, 'last_day']
-
-                            s2, f2 = ind2_sorted.loc[l, 'first_day'], ind2_sorted.loc[l, 'last_day']
-
-                            if not any([type(x) == float for x in [s1, s2, f1, f2]]):
-                                tasks_fs12, tasks_fs21, tasks_ss12, tasks_ss12_lags, tasks_ss12_percent_lags, tasks_ss21, tasks_ss21_lags, \
-                                    tasks_ss21_percent_lags, tasks_ffs12, tasks_ffs12_lags, tasks_ffs12_percent_lags, tasks_ffs21, tasks_ffs21_lags, tasks_ffs21_percent_lags = gather_links_types_statistics(
-                                    s1, f1, s2, f2)
-
-                                count += 1
-
-                                fs12 += tasks_fs12
-                                fs21 += tasks_fs21
-
-                                ss12 += tasks_ss12
-                                ss12_lags.extend(tasks_ss12_lags)
-                                ss12_percent_lags.extend(tasks_ss12_percent_lags)
-                                ss21 += tasks_ss21
-                                ss21_lags.extend(tasks_ss21_lags)
-                                ss21_percent_lags.extend(tasks_ss21_percent_lags)
-
-                                ffs12 += tasks_ffs12
-                                ffs12_lags.extend(tasks_ffs12_lags)
-                                ffs12_percent_lags.extend(tasks_ffs12_percent_lags)
-                                ffs21 += tasks_ffs21
-                                ffs21_lags.extend(tasks_ffs21_lags)
-                                ffs21_percent_lags.extend(tasks_ffs21_percent_lags)
-
-                if fs12 + ffs12 + ss12 >= fs21 + ffs21 + ss21:
-                    order_con = 1
-                    fs = fs12
-                    ffs = ffs12
-                    ss = ss12
-                else:
-                    order_con = 2
-                    fs = fs21
-                    ffs = ffs21
-                    ss = ss21
-
-                if max([fs, ss, ffs]) != 0:
-                    if fs > ss:
-                        if ffs > 0:
-                            if order_con == 1:
-                                predecessors_info_dict[w2_id].append([w1_id, 'FFS',
-                                                                      find_min_without_outliers(ffs12_percent_lags),
-                                                                      count])
-                            else:
-                                predecessors_info_dict[w1_id].append([w2_id, 'FFS',
-                                                                      find_min_without_outliers(ffs21_percent_lags),
-                                                                      count])
-                        else:
-                            if order_con == 1:
-                                predecessors_info_dict[w2_id].append([w1_id, 'FS', 0.0, count])
-                            else:
-                                predecessors_info_dict[w1_id].append([w2_id, 'FS', 0.0, count])
-                    elif ss > ffs:
-                        if order_con == 1:
-                                predecessors_info_dict[w2_id].append([w1_id, 'SS',
-                                                                      find_min_without_outliers(ss12_percent_lags),
-                                                                      count])
-                        else:
-                            predecessors_info_dict[w1_id].append([w2_id, 'SS',
-                                                                  find_min_without_outliers(ss21_percent_lags), count])
-                    else:
-                        if order_con == 1:
-                                predecessors_info_dict[w2_id].append([w1_id, 'FFS',
-                                                                      find_min_without_outliers(ffs12_percent_lags),
-                                                                      count])
-                        else:
-                            predecessors_info_dict[w1_id].append([w2_id, 'FFS',
-                                                                  find_min_without_outliers(ffs21_percent_lags), count])
+    names = graph_df['granular_name'].values
+    if use_model_name:
+        names = np.vectorize(mapper.get)(names)
+    ids = graph_df['activity_id'].values
+    name2positions = {}
+    for i, name in enumerate(names):
+        name2positions.setdefault(name, []).append(i)
+
+    # pairs of works (i < j) with the connected names in the row-major order of the upper triangle
+    works1, works2 = [], []
+    for name1, name2 in connections:
+        for i in name2positions.get(name1, []):
+            for j in name2positions.get(name2, []):
+                if i < j:
+                    works1.append(i)
+                    works2.append(j)
+
+    for k in np.lexsort((works2, works1)):
+        i, j = works1[k], works2[k]
+        order_con, connection_type, lag, count = connections[(names[i], names[j])]
+        if order_con == 1:
+            predecessors_info_dict[ids[j]].append([ids[i], connection_type, lag, count])
+        else:
+            predecessors_info_dict[ids[i]].append([ids[j], connection_type, lag, count])
 
     return predecessors_info_dict
 
@@ -233,13 +326,15 @@ def set_connections_info(graph_df: pd.DataFrame,
                          mapper: NameMapper | None = None,
                          change_connections_info: bool = False,
                          all_connections: bool = False,
-                         id2ind: dict[str, int] = None) \
+                         id2ind: dict[str, int] = None,
+                         cache_dir: str | None = None) \
         -> pd.DataFrame:
     """
     Restore tasks' connection based on history data
 
     :param: change_connections_info - whether existing connections' information should be modified based on history data
     :param: expert_connections_info - whether existing connections should not be modified based on connection history data
+    :param: cache_dir - folder of the connections statistic cache, the statistic isn't cached if it's None
     :return: repaired DataFrame
     """
 
@@ -277,11 +372,9 @@ def set_connections_info(graph_df: pd.DataFrame,
         return tasks_df
 
     # | ----------- for cache data ----------- |
-    connections_dict = get_all_seq_statistic(history_data, graph_df, use_model_name, mapper)
-    # with open('dormitory.json', 'w') as f:
-    #     json.dump(connections_dict, f)
+    connections_dict = get_all_seq_statistic(history_data, graph_df, use_model_name, mapper, cache_dir)
 
-    all_works = tasks_df['activity_id'].values
+    all_works = set(tasks_df['activity_id'].values)
 
     for task_id, pred_info_lst in connections_dict.items():
         if str(task_id) not in all_works:
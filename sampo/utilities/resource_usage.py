@@ -1,33 +1,106 @@
-import numpy as np
-from collections import defaultdict
-from sortedcontainers import SortedList
+from dataclasses import dataclass
 from typing import Iterable
+from weakref import WeakKeyDictionary
+
+import numpy as np
 
 from sampo.schemas.schedule import Schedule
 from sampo.schemas.time import Time
 
 
-def get_total_resources_usage(schedule: Schedule, resources_names: Iterable[str] | None = None) -> dict[str, np.ndarray]:
-    df = schedule.full_schedule_df
-    points = df[['start', 'finish']].to_numpy()
-    points = SortedList(set(points.flatten()))
-    usage = defaultdict(lambda: np.zeros_like(points))
+@dataclass(frozen=True)
+class ResourcesUsageProfile:
+    """
+    Step-function profile of the resources usage in the schedule.
+    `usage[kinds[name], i]` workers of the kind `name` are busy in the interval [points[i], points[i + 1]).
+
+    :param points: sorted unique start and finish times of the works
+    :param kinds: resource kind name to the row of the arrays
+    :param usage: busy workers of each kind in each interval
+    :param amounts: summary usage (count * duration) of each kind
+    :param costs: summary cost (cost * duration) of each kind
+    """
+    points: np.ndarray
+    kinds: dict[str, int]
+    usage: np.ndarray
+    amounts: np.ndarray
+    costs: np.ndarray
+
+    @staticmethod
+    def from_schedule(schedule: Schedule) -> 'ResourcesUsageProfile':
+        """
+        Builds the profile with the sweep-line over the works' starts and finishes
+
+        :param schedule:
+        :return: usage profile of the given schedule
+        """
+        starts, finishes = schedule.start_times, schedule.finish_times
+        points = np.unique(np.concatenate([starts, finishes]))
+
+        kinds: dict[str, int] = {}
+        work_index, kind_index, counts, costs = [], [], [], []
+        for i, work in enumerate(schedule.works):
+            for worker in work.workers:
+                work_index.append(i)
+                kind_index.append(kinds.setdefault(worker.name, len(kinds)))
+                counts.append(worker.count)
+                costs.append(worker.get_cost())
+
+        work_index = np.array(work_index, dtype=np.int64)
+        kind_index = np.array(kind_index, dtype=np.int64)
+        counts = np.array(counts, dtype=np.int64)
+        costs = np.array(costs, dtype=np.float64)
+
+        # each team is added to the usage at its work's start and removed at the finish
+        deltas = np.zeros((len(kinds), len(points) + 1), dtype=np.int64)
+        np.add.at(deltas, (kind_index, np.searchsorted(points, starts[work_index])), counts)
+        np.subtract.at(deltas, (kind_index, np.searchsorted(points, finishes[work_index])), counts)
+        usage = np.cumsum(deltas, axis=1)[:, :-1]
+
+        durations = (finishes - starts)[work_index]
+        amounts = np.zeros(len(kinds), dtype=np.int64)
+        np.add.at(amounts, kind_index, counts * durations)
+        kind_costs = np.zeros(len(kinds), dtype=np.float64)
+        np.add.at(kind_costs, kind_index, costs * durations)
+
+        return ResourcesUsageProfile(points, kinds, usage, amounts, kind_costs)
+
+    def rows(self, resources_names: Iterable[str] | None = None) -> list[tuple[str, int]]:
+        """
+        :param resources_names: names of the resources to take, all resources if None
+        :return: names and rows of the taken resources, that are used in the schedule
+        """
+        if resources_names is None:
+            return list(self.kinds.items())
+        resources_names = set(resources_names)
+        return [(name, row) for name, row in self.kinds.items() if name in resources_names]
+
+
+_profiles: WeakKeyDictionary[Schedule, ResourcesUsageProfile] = WeakKeyDictionary()
+
+
+def get_resources_usage_profile(schedule: Schedule) -> ResourcesUsageProfile:
+    """
+    Returns the usage profile of the schedule, it's built once for each schedule
 
-    is_none = resources_names is None
-    resources_names = set(resources_names) if not is_none else {}
+    :param schedule:
+    :return: usage profile of the given schedule
+    """
+    profile = _profiles.get(schedule)
+    if profile is None:
+        profile = ResourcesUsageProfile.from_schedule(schedule)
+        _profiles[schedule] = profile
+    return profile
 
-    for swork in schedule.works:
-        start = points.bisect_left(swork.start_time)
-        finish = points.bisect_left(swork.finish_time)
-        for worker in swork.workers:
-            if is_none or worker.name in resources_names:
-                usage[worker.name][start: finish] += worker.count
 
-    return usage
+def get_total_resources_usage(schedule: Schedule, resources_names: Iterable[str] | None = None) -> dict[str, np.ndarray]:
+    profile = get_resources_usage_profile(schedule)
+    return {name: profile.usage[row].copy() for name, row in profile.rows(resources_names)}
 
 
 def get_resources_peak_usage(schedule: Schedule, resources_names: Iterable[str] | None = None) -> dict[str, int]:
-    return {res: max(res_usage) for res, res_usage in get_total_resources_usage(schedule, resources_names).items()}
+    profile = get_resources_usage_profile(schedule)
+    return {name: int(profile.usage[row].max()) for name, row in profile.rows(resources_names)}
 
 
 def resources_peaks_sum(schedule: Schedule, resources_names: Iterable[str] | None = None) -> int:
@@ -43,25 +116,13 @@ def resources_sum(schedule: Schedule, resources_names: Iterable[str] | None = No
     """
     Count the summary usage of resources in received schedule
     """
-    is_none = resources_names is None
-    resources_names = set(resources_names) if not is_none else {}
-
-    res_sum = sum([sum([worker.count * work.duration.value for worker in work.workers
-                        if worker.name in resources_names or is_none], start=0)
-                   for work in schedule.works])
-
-    return res_sum
+    profile = get_resources_usage_profile(schedule)
+    return sum(int(profile.amounts[row]) for _, row in profile.rows(resources_names))
 
 
 def resources_costs_sum(schedule: Schedule, resources_names: Iterable[str] | None = None) -> float:
     """
     Count the summary cost of resources in received schedule
     """
-    is_none = resources_names is None
-    resources_names = set(resources_names) if not is_none else {}
-
-    cost = sum([sum([worker.get_cost() * work.duration.value for worker in work.workers
-                     if worker.name in resources_names or is_none], start=0.0)
-                for work in schedule.works])
-
-    return cost
+    profile = get_resources_usage_profile(schedule)
+    return sum((float(profile.costs[row]) for _, row in profile.rows(resources_names)), start=0.0)
@@ -1,11 +1,12 @@
 from copy import deepcopy
-from operator import attrgetter, itemgetter
+from operator import itemgetter
+
+import numpy as np
 
 from sampo.schemas.contractor import Contractor
 from sampo.schemas.graph import WorkGraph
 from sampo.schemas.schedule import ScheduledWork, Schedule
 from sampo.schemas.time import Time
-from sampo.utilities.collections_util import build_index
 
 
 def validate_schedule(schedule: Schedule, wg: WorkGraph, contractors: list[Contractor]) -> None:
@@ -44,12 +45,14 @@ def _check_all_tasks_scheduled(schedule: Schedule, wg: WorkGraph) -> None:
 
 def _check_parent_dependencies(schedule: Schedule, wg: WorkGraph) -> None:
     scheduled_works: dict[str, ScheduledWork] = {work.id: work for work in schedule.works}
+    arrays = wg.arrays
 
-    for node in wg.nodes:
-        start, end = scheduled_works[node.work_unit.id].start_end_time
-        for pnode in node.parents:
-            pstart, pend = scheduled_works[pnode.work_unit.id].start_end_time
-            assert pstart <= pend <= start <= end
+    times = np.array([[t.value for t in scheduled_works[node.id].start_end_time] for node in arrays.nodes],
+                     dtype=np.int64).reshape(-1, 2)
+    parent, child = arrays.edges()
+    start, end = times[child, 0], times[child, 1]
+    pstart, pend = times[parent, 0], times[parent, 1]
+    assert ((pstart <= pend) & (pend <= start) & (start <= end)).all()
 
 
 def _check_all_tasks_have_valid_duration(schedule: Schedule) -> None:
@@ -98,6 +101,73 @@ def check_all_allocated_workers_do_not_exceed_capacity_of_contractors(schedule:
         -> dict[str, dict[str, int]]:
     # 4. at each moment sum of allocated workers of all tasks for the same contractor
     # does not exceed capacity of this contractor
+    if _sweep_capacity(schedule, initial_worker_pool, cur_worker_pool):
+        return cur_worker_pool
+    # the sweep found the violation, so the events are replayed one by one to report it
+    return _replay_capacity(schedule, initial_worker_pool, cur_worker_pool)
+
+
+def _sweep_capacity(schedule: Schedule,
+                    initial_worker_pool: dict[str, dict[str, int]],
+                    cur_worker_pool: dict[str, dict[str, int]]) -> bool:
+    """
+    Performs the capacity check as the cumulative sum over the events grouped by time
+    for each (contractor, worker kind) pair.
+    The events of the last moment aren't applied to the pool, like in `_replay_capacity`.
+
+    :return: True if the check is passed and `cur_worker_pool` is updated,
+    False if the pool isn't modified, because there is a violation
+    """
+    pairs: dict[tuple[str, str], int] = {}
+    times, pair_index, deltas = [], [], []
+    for work in schedule.works:
+        if len(work.workers) == 0:
+            continue
+        cont = work.workers[0].contractor_id
+        start, finish = work.start_time.value, work.finish_time.value
+        for w in work.workers:
+            pair = pairs.setdefault((cont, w.name), len(pairs))
+            times.extend((start, finish))
+            pair_index.extend((pair, pair))
+            deltas.extend((-w.count, w.count))
+
+    if not pairs:
+        return True
+    try:
+        available = np.array([cur_worker_pool[cont][name] for cont, name in pairs], dtype=np.int64)
+        capacity = np.array([initial_worker_pool[cont][name] for cont, name in pairs], dtype=np.int64)
+    except KeyError:
+        return False
+
+    moments, moment = np.unique(np.array(times, dtype=np.int64), return_inverse=True)
+    pair_index = np.array(pair_index, dtype=np.int64)
+    # sums of the deltas of each pair at each moment, ordered by pair and then by moment
+    keys, key_index = np.unique(pair_index * len(moments) + moment, return_inverse=True)
+    sums = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(sums, key_index, np.array(deltas, dtype=np.int64))
+    key_pair, key_moment = keys // len(moments), keys % len(moments)
+
+    applied = key_moment < len(moments) - 1
+    sums = np.where(applied, sums, 0)
+    cumulative = np.cumsum(sums)
+    first_of_pair = np.searchsorted(key_pair, key_pair)
+    state = available[key_pair] + cumulative - (cumulative[first_of_pair] - sums[first_of_pair])
+
+    if not ((state >= 0) & (state <= capacity[key_pair]))[applied].all():
+        return False
+
+    totals = np.zeros(len(pairs), dtype=np.int64)
+    np.add.at(totals, key_pair, sums)
+    pair_names = list(pairs)
+    for pair in np.unique(key_pair[applied]):
+        cont, name = pair_names[pair]
+        cur_worker_pool[cont][name] = int(available[pair] + totals[pair])
+    return True
+
+
+def _replay_capacity(schedule: Schedule,
+                     initial_worker_pool: dict[str, dict[str, int]],
+                     cur_worker_pool: dict[str, dict[str, int]]) -> dict[str, dict[str, int]]:
     ordered_start_end_events = sorted(
         (el for work in schedule.works
          for el in [('start', work.start_time, work), ('end', work.finish_time, work)]),
@@ -154,8 +224,17 @@ def check_all_allocated_workers_do_not_exceed_capacity_of_contractors(schedule:
 
 
 def _check_all_workers_correspond_to_worker_reqs(wg: WorkGraph, schedule: Schedule):
+    arrays = wg.arrays
+    indices, kinds, counts = [], [], []
     for swork in schedule.works:
-        worker2req = build_index(wg[swork.id].work_unit.worker_reqs, attrgetter('kind'))
+        index = arrays.id2index[swork.id]
         for worker in swork.workers:
-            req = worker2req[worker.name]
-            assert req.min_count <= worker.count <= req.max_count
+            indices.append(index)
+            kinds.append(arrays.kind2index[worker.name])
+            counts.append(worker.count)
+
+    indices = np.array(indices, dtype=np.int64)
+    kinds = np.array(kinds, dtype=np.int64)
+    counts = np.array(counts, dtype=np.int64)
+    assert arrays.req_mask[indices, kinds].all()
+    assert ((arrays.req_min[indices, kinds] <= counts) & (counts <= arrays.req_max[indices, kinds])).all()
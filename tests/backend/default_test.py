@@ -0,0 +1,44 @@
+import os
+import time
+
+from sampo.backend.default import DefaultComputationalBackend
+
+
+def test_map_with_timeout():
+    backend = DefaultComputationalBackend()
+    offset = 1
+
+    def action(delay: float) -> float:
+        time.sleep(delay)
+        return delay + offset
+
+    start = time.monotonic()
+    results = backend.map_with_timeout(action, [0, 0.1, 30], timeout=2)
+
+    assert results == [1, 1.1, None]
+    # the slow computation is terminated instead of waiting for it
+    assert time.monotonic() - start < 30
+
+
+def test_map_with_timeout_per_computation():
+    backend = DefaultComputationalBackend()
+
+    def action(delay: float) -> float:
+        time.sleep(delay)
+        return delay
+
+    # the slow computation doesn't take the time of the others, even if they are waiting for a free CPU
+    assert backend.map_with_timeout(action, [30] + [0.5] * os.cpu_count(), timeout=2) \
+           == [None] + [0.5] * os.cpu_count()
+
+
+def test_map_without_timeout_is_sequential():
+    backend = DefaultComputationalBackend()
+    processed = []
+
+    def action(value: int) -> int:
+        processed.append(value)
+        return os.getpid()
+
+    assert backend.map_with_timeout(action, [1, 2, 3]) == [os.getpid()] * 3
+    assert processed == [1, 2, 3]
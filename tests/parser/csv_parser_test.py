@@ -2,6 +2,7 @@ import os
 import sys
 
 import pandas as pd
+import pytest
 
 from sampo.userinput.parser.csv_parser import CSVParser
 from sampo.userinput.parser.exception import WorkGraphBuildingException
@@ -22,3 +23,17 @@ def test_work_graph_csv_parser():
         raise WorkGraphBuildingException(f'There is no way to build work graph, {e}')
 
     os.remove(os.path.join(sys.path[0], 'tests/parser/repaired.csv'))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 100])
+def test_chunked_read_graph_info(chunk_size: int):
+    history = pd.read_csv(os.path.join(sys.path[0], 'tests/parser/test_history_data.csv'), sep=';')
+    project_info = os.path.join(sys.path[0], 'tests/parser/test_wg.csv')
+
+    expected = CSVParser.read_graph_info(project_info=project_info, history_data=history)
+    works_info = CSVParser.read_graph_info(project_info=project_info, history_data=history, chunk_size=chunk_size)
+    pd.testing.assert_frame_equal(works_info, expected)
+
+    works_info = CSVParser.read_graph_info(project_info=pd.read_csv(project_info, sep=';'), history_data=history,
+                                           chunk_size=chunk_size)
+    pd.testing.assert_frame_equal(works_info, expected)
@@ -0,0 +1,69 @@
+import math
+from random import Random
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from sampo.schemas.graph import EdgeType
+from sampo.userinput.parser.general_build import Graph, fix_df_column_with_arrays, NONE_ELEM
+
+
+def random_graph(rand: Random, n: int, m: int) -> tuple[Graph, dict[tuple[str, str], int]]:
+    graph = Graph()
+    weights = {}
+    for _ in range(m):
+        u, v = rand.randrange(n), rand.randrange(n)
+        # most of the edges are directed forward, like in the real works' graphs
+        if rand.random() < 0.8 and u > v:
+            u, v = v, u
+        weight = rand.choice([None, 1, 5, 100])
+        graph.add_edge(str(u), str(v), weight)
+        weights[(str(u), str(v))] = weights.get((str(u), str(v)), 0) + (1 if weight is None else weight)
+    return graph, weights
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_eliminate_cycles(seed: int):
+    graph, weights = random_graph(Random(seed), 200, 600)
+    assert not nx.is_directed_acyclic_graph(nx.DiGraph(list(weights)))
+
+    graph.eliminate_cycles()
+
+    kept = {(u, v) for u, children in graph.graph.items() for v in children}
+    assert kept <= set(weights)
+    assert nx.is_directed_acyclic_graph(nx.DiGraph(list(kept)))
+    # each removed edge is necessary
+    for edge in set(weights) - kept:
+        assert not nx.is_directed_acyclic_graph(nx.DiGraph(list(kept | {edge})))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_found_cycles(seed: int):
+    graph, weights = random_graph(Random(seed), 50, 120)
+
+    cycles = graph.eliminate_cycles(is_eliminate_cycle=False)
+
+    kept = {(u, v) for u, children in graph.graph.items() for v, _ in children}
+    assert len(cycles) == len(set(weights) - kept)
+    for cycle in cycles:
+        assert cycle[0] == cycle[-1]
+        assert all(edge in weights for edge in zip(cycle, cycle[1:]))
+
+
+def test_fix_df_column_with_arrays():
+    def split(column: pd.Series, cast, none_elem) -> list:
+        # previous row by row implementation, it's used as a reference
+        return [[cast(elem) if elem != '' and elem != str(math.nan) else none_elem for elem in elems.split(',')]
+                if elems != str(math.nan) else [none_elem] for elems in column.astype(str)]
+
+    column = pd.Series(['1,2', np.nan, '', '3', '4,,nan', 5, 6.0, 'nan'], index=range(10, 18))
+    for cast, none_elem in [(str, NONE_ELEM), (float, NONE_ELEM), (lambda elem: elem + '!', None)]:
+        fixed = fix_df_column_with_arrays(column, cast, none_elem)
+        assert fixed.tolist() == split(column, cast, none_elem)
+        assert fixed.index.equals(column.index)
+
+    column = pd.Series(['FS,SS', np.nan, 'FFS'])
+    assert fix_df_column_with_arrays(column, EdgeType, EdgeType.FinishStart).tolist() == \
+        [[EdgeType.FinishStart, EdgeType.StartStart], [EdgeType.FinishStart], [EdgeType.LagFinishStart]]
@@ -0,0 +1,103 @@
+import datetime
+from random import Random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sampo.userinput.parser import history as history_module
+from sampo.userinput.parser.history import get_all_seq_statistic, gather_links_types_statistics, \
+    find_min_without_outliers
+
+
+def pairwise_seq_statistic(history_data: pd.DataFrame, graph_df: pd.DataFrame) -> dict[str, list]:
+    # previous implementation over all pairs of works and all sites, it's used as a reference
+    sites = history_data.groupby('upper_works')['granular_name'].apply(list)
+    names, ids = graph_df['granular_name'].values, graph_df['activity_id'].values
+    predecessors_info_dict = {w_id: [] for w_id in ids}
+
+    for i, j in zip(*np.triu_indices(len(graph_df), k=1)):
+        w1, w2 = names[i], names[j]
+        if w1 == w2:
+            continue
+        count = 0
+        stats = [0, 0, 0, [], [], 0, [], [], 0, [], [], 0, [], []]
+        for site, works in sites.items():
+            if w1 not in works or w2 not in works:
+                continue
+            ind1, ind2 = [history_data.loc[(history_data['upper_works'] == site) & (history_data['granular_name'] == w)]
+                          .sort_values(by=['first_day', 'last_day']).reset_index(drop=True) for w in (w1, w2)]
+            for k in range(min(len(ind1), len(ind2))):
+                s1, f1 = ind1.loc[k, 'first_day'], ind1.loc[k, 'last_day']
+                s2, f2 = ind2.loc[k, 'first_day'], ind2.loc[k, 'last_day']
+                if any(type(x) == float for x in [s1, s2, f1, f2]):
+                    continue
+                count += 1
+                for n, value in enumerate(gather_links_types_statistics(s1, f1, s2, f2)):
+                    stats[n] += value
+
+        fs12, fs21, ss12, _, ss12_lags, ss21, _, ss21_lags, ffs12, _, ffs12_lags, ffs21, _, ffs21_lags = stats
+        if fs12 + ffs12 + ss12 >= fs21 + ffs21 + ss21:
+            predecessor, successor, fs, ss, ffs, ss_lags, ffs_lags = ids[i], ids[j], fs12, ss12, ffs12, \
+                ss12_lags, ffs12_lags
+        else:
+            predecessor, successor, fs, ss, ffs, ss_lags, ffs_lags = ids[j], ids[i], fs21, ss21, ffs21, \
+                ss21_lags, ffs21_lags
+        if max([fs, ss, ffs]) == 0:
+            continue
+        if fs > ss:
+            connection = ['FFS', find_min_without_outliers(ffs_lags)] if ffs > 0 else ['FS', 0.0]
+        elif ss > ffs:
+            connection = ['SS', find_min_without_outliers(ss_lags)]
+        else:
+            connection = ['FFS', find_min_without_outliers(ffs_lags)]
+        predecessors_info_dict[successor].append([predecessor, *connection, count])
+
+    return predecessors_info_dict
+
+
+def random_history(rand: Random, records: int, names: list[str], sites: int) -> pd.DataFrame:
+    rows = []
+    for _ in range(records):
+        start = datetime.date(2020, 1, 1) + datetime.timedelta(days=rand.randint(0, 60))
+        finish = start + datetime.timedelta(days=rand.randint(0, 20))
+        # some dates are missing
+        rows.append((rand.choice(names),
+                     start.isoformat() if rand.random() > 0.05 else np.nan,
+                     finish.isoformat() if rand.random() > 0.05 else np.nan,
+                     f'site {rand.randint(0, sites)}'))
+    return pd.DataFrame(rows, columns=['granular_name', 'first_day', 'last_day', 'upper_works'])
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_seq_statistic_same_as_pairwise(seed: int):
+    rand = Random(seed)
+    names = [f'Work {i}' for i in range(10)]
+    history = random_history(rand, 200, names, 6)
+    graph_df = pd.DataFrame({'activity_id': [str(i) for i in range(20)],
+                             'granular_name': [rand.choice(names + ['Unknown work']) for _ in range(20)]})
+
+    assert get_all_seq_statistic(history, graph_df) == pairwise_seq_statistic(history, graph_df)
+
+
+def test_seq_statistic_cache(tmp_path, monkeypatch):
+    rand = Random(231)
+    names = [f'Work {i}' for i in range(10)]
+    history = random_history(rand, 200, names, 6)
+    graph_df = pd.DataFrame({'activity_id': [str(i) for i in range(20)],
+                             'granular_name': [rand.choice(names) for _ in range(20)]})
+
+    expected = get_all_seq_statistic(history, graph_df)
+    assert get_all_seq_statistic(history, graph_df, cache_dir=str(tmp_path)) == expected
+    assert len(list(tmp_path.iterdir())) == 1
+
+    def fail(*args):
+        raise AssertionError('the statistic should be loaded from the cache')
+
+    monkeypatch.setattr(history_module, 'get_connections_statistic', fail)
+    assert get_all_seq_statistic(history.copy(), graph_df, cache_dir=str(tmp_path)) == expected
+
+    # the other history data isn't found in the cache
+    history.loc[0, 'first_day'] = '2019-12-31'
+    with pytest.raises(AssertionError):
+        get_all_seq_statistic(history, graph_df, cache_dir=str(tmp_path))
@@ -8,3 +8,19 @@ def test_schedule_object(setup_schedule):
     swd = schedule.to_schedule_work_dict
 
     assert not schedule.execution_time.is_inf(), f'Scheduling failed on {scheduler}'
+
+
+def test_schedule_object_lazy_df(setup_schedule):
+    schedule, _, _ = setup_schedule
+    schedule = schedule.from_scheduled_works(schedule.works)
+
+    swd = schedule.to_schedule_work_dict
+
+    # the frame is built on the first access and cached
+    full_df = schedule.full_schedule_df
+    assert schedule.full_schedule_df is full_df
+    assert list(full_df['task_id']) == list(swd)
+    assert list(full_df['finish']) == schedule.finish_times.tolist()
+
+    pure_df = schedule.pure_schedule_df
+    assert list(pure_df['task_id']) == [work.id for work in schedule.works if not work.is_service_unit]
@@ -0,0 +1,23 @@
+from sampo.scheduler.genetic.base import GeneticScheduler, FIRST_POPULATION_HEURISTICS
+from sampo.schemas.time_estimator import DefaultWorkEstimator
+
+
+def test_first_population_contains_all_heuristics(setup_default_schedules):
+    (wg, _, _), init_schedules = setup_default_schedules
+
+    assert list(init_schedules.keys()) == ['lft'] + list(FIRST_POPULATION_HEURISTICS.keys())
+    for schedule, node_order, _, _ in init_schedules.values():
+        if schedule is None:
+            continue
+        assert set(schedule.full_schedule_df['task_id']) == {node.id for node in wg.nodes}
+        assert all(wg[node.id] is node for node in node_order)
+
+
+def test_first_population_skips_timed_out_heuristics(setup_scheduler_parameters):
+    wg, contractors, landscape = setup_scheduler_parameters
+
+    init_schedules = GeneticScheduler.generate_first_population(wg, contractors, landscape=landscape,
+                                                                work_estimator=DefaultWorkEstimator(), timeout=0)
+
+    assert 'lft' in init_schedules
+    assert set(init_schedules.keys()) <= {'lft'} | set(FIRST_POPULATION_HEURISTICS.keys())
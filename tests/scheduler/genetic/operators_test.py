@@ -1,5 +1,9 @@
 from tests.scheduler.genetic.fixtures import *
-from sampo.scheduler.genetic.converter import ChromosomeType
+from sampo.scheduler.genetic.converter import ChromosomeType, convert_schedule_to_chromosome, \
+    convert_assignment_to_chromosome
+from sampo.scheduler.genetic.utils import prepare_optimized_data_structures
+from sampo.scheduler.lft.base import RandomizedLFTScheduler
+from sampo.schemas.schedule_spec import ScheduleSpec
 import random
 
 
@@ -88,3 +92,35 @@ def test_mate_resources(setup_toolbox, setup_wg):
         assert tb.validate(individual2)
 
 
+def test_generate_population(setup_toolbox, setup_wg):
+    tb, resources_border, _, _, _, _ = setup_toolbox
+    _, _, _, population_size = get_params(setup_wg.vertex_count)
+
+    population = tb.population(n=population_size)
+
+    assert len(population) == population_size
+    for individual in population:
+        assert len(individual[0]) == len(set(individual[0]))
+        assert (resources_border[0] <= individual[1].T[:-1]).all() and \
+               (individual[1].T[:-1] <= resources_border[1]).all()
+        assert tb.validate(individual)
+
+
+def test_lft_chromosome_without_schedule(setup_toolbox):
+    _, _, wg, contractors, _, landscape = setup_toolbox
+    worker_pool, _, _, work_id2index, worker_name2index, _, _, contractor2index, contractor_borders, *_ = \
+        prepare_optimized_data_structures(wg, contractors, landscape)
+    spec = ScheduleSpec()
+
+    schedule, _, _, node_order = RandomizedLFTScheduler(rand=random.Random(17)) \
+        .schedule_with_cache(wg, contractors, spec, landscape=landscape)[0]
+    expected = convert_schedule_to_chromosome(work_id2index, worker_name2index, contractor2index,
+                                              contractor_borders, schedule, spec, landscape, node_order)
+
+    node_order, node_id2workers = RandomizedLFTScheduler(rand=random.Random(17)).prioritize(wg, contractors, spec)
+    chromosome = convert_assignment_to_chromosome(work_id2index, worker_name2index, contractor2index,
+                                                  contractor_borders, node_order, node_id2workers, spec, landscape)
+
+    for expected_part, part in zip(expected, chromosome):
+        if isinstance(part, np.ndarray):
+            np.testing.assert_array_equal(part, expected_part)
@@ -1,3 +1,8 @@
+from sampo.scheduler.lft.base import LFTScheduler, get_lft_prepared_data, clear_lft_cache
+from sampo.scheduler.utils import get_worker_contractor_pool
+from sampo.schemas.resources import WorkerProductivityMode
+from sampo.schemas.schedule_spec import ScheduleSpec
+from sampo.schemas.time_estimator import DefaultWorkEstimator
 from sampo.utilities.validation import validate_schedule
 from tests.scheduler.lft.fixtures import setup_schedulers_and_parameters
 
@@ -16,3 +21,41 @@ def test_lft_scheduling(setup_schedulers_and_parameters):
         validate_schedule(schedule, setup_wg, setup_contractors)
     except AssertionError as e:
         raise AssertionError(f'Scheduler {scheduler} failed validation', e)
+
+
+def test_lft_prepared_data_is_shared(setup_scheduler_parameters):
+    setup_wg, setup_contractors, _ = setup_scheduler_parameters
+    worker_pool = get_worker_contractor_pool(setup_contractors)
+    estimator = DefaultWorkEstimator()
+
+    prepared = get_lft_prepared_data(setup_wg, setup_contractors, ScheduleSpec(), worker_pool, estimator)
+    assert prepared is get_lft_prepared_data(setup_wg, setup_contractors, ScheduleSpec(), worker_pool, estimator)
+    assert all(options.durations is not None for options in prepared.options)
+
+    # the subclass can estimate the durations differently
+    class SubclassEstimator(DefaultWorkEstimator):
+        pass
+
+    subclass = get_lft_prepared_data(setup_wg, setup_contractors, ScheduleSpec(), worker_pool, SubclassEstimator())
+    assert subclass is not prepared
+
+    # stochastic estimations are not cached
+    estimator.set_productivity_mode(WorkerProductivityMode.Stochastic)
+    stochastic = get_lft_prepared_data(setup_wg, setup_contractors, ScheduleSpec(), worker_pool, estimator)
+    assert stochastic is not prepared
+    assert all(options.durations is None for options in stochastic.options)
+
+
+def test_lft_cached_result_is_the_same(setup_scheduler_parameters):
+    setup_wg, setup_contractors, setup_landscape = setup_scheduler_parameters
+    clear_lft_cache()
+
+    first, _, _, first_order = LFTScheduler().schedule_with_cache(setup_wg, setup_contractors,
+                                                                  landscape=setup_landscape)[0]
+    second, _, _, second_order = LFTScheduler().schedule_with_cache(setup_wg, setup_contractors,
+                                                                    landscape=setup_landscape)[0]
+
+    assert [node.id for node in first_order] == [node.id for node in second_order]
+    assert first.execution_time == second.execution_time
+    assert [(work.id, work.contractor, work.start_time) for work in first.works] == \
+           [(work.id, work.contractor, work.start_time) for work in second.works]
@@ -0,0 +1,178 @@
+from concurrent.futures import ThreadPoolExecutor, Executor
+from random import Random
+from uuid import uuid4
+
+import pytest
+from pytest import fixture
+
+# the multi-agency module imports the neural networks
+torch = pytest.importorskip('torch')
+
+from sampo.generator.base import SimpleSynthetic
+from sampo.scheduler.heft.base import HEFTScheduler, HEFTBetweenScheduler
+from sampo.scheduler.multi_agency.block_generator import generate_blocks, SyntheticBlockGraphType
+from sampo.scheduler.multi_agency.block_graph import BlockNode
+from sampo.scheduler.multi_agency.multi_agency import Agent, Manager, NeuralManager
+from sampo.scheduler.selection.neural_net import NeuralNet, NeuralNetTrainer, NeuralNetType
+from sampo.scheduler.timeline.momentum_timeline import MomentumTimeline
+from sampo.scheduler.topological.base import TopologicalScheduler
+from sampo.schemas.contractor import Contractor
+from sampo.schemas.graph import GraphNode, WorkGraph
+from sampo.schemas.requirements import WorkerReq
+from sampo.schemas.resources import Worker
+from sampo.schemas.time import Time
+from sampo.schemas.works import WorkUnit
+
+
+@fixture(params=[False, True], ids=['sequential', 'executor'])
+def setup_executor(request):
+    if not request.param:
+        yield None
+        return
+    with ThreadPoolExecutor(2) as executor:
+        yield executor
+
+
+@pytest.mark.parametrize('cpu_count', [1, 3])
+def test_auctions_with_executor_same_as_sequential(cpu_count: int, monkeypatch):
+    p_rand = SimpleSynthetic(rand=231)
+    contractors = [p_rand.contractor(i) for i in range(10, 101, 30)]
+    wgs = [SimpleSynthetic(rand=231 + i).work_graph(top_border=100) for i in range(3)]
+
+    def run_auctions(executor=None) -> list[tuple[Time, Time, str]]:
+        manager = Manager([Agent(f'Agent {i}', HEFTScheduler(), [contractor])
+                           for i, contractor in enumerate(contractors)], executor)
+        parent_time = Time(0)
+        results = []
+        for wg in wgs:
+            start_time, end_time, _, agent = manager.run_auction(wg, parent_time)
+            results.append((start_time, end_time, agent.name))
+            parent_time = end_time
+        return results
+
+    expected = run_auctions()
+    # the agents are split into the tasks by the CPUs
+    monkeypatch.setattr('os.cpu_count', lambda: cpu_count)
+    with ThreadPoolExecutor(2) as executor:
+        assert run_auctions(executor) == expected
+
+
+class NotJournaledTimeline:
+    """
+    Timeline, which changes can't be rolled back
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._timeline = MomentumTimeline(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        if name == '_timeline':
+            raise AttributeError(name)
+        return getattr(self._timeline, name)
+
+
+@pytest.mark.parametrize('timeline_type', [MomentumTimeline, NotJournaledTimeline])
+def test_withdrawn_offer_keeps_timeline(timeline_type):
+    p_rand = SimpleSynthetic(rand=231)
+    agent = Agent('Agent', HEFTScheduler(timeline_type=timeline_type), [p_rand.contractor(50)])
+    first_wg, second_wg = p_rand.work_graph(top_border=100), p_rand.work_graph(top_border=100)
+
+    start_time, end_time, _, timeline = agent.offer(first_wg, Time(0))
+    agent.confirm(timeline, start_time, end_time)
+
+    offer = agent.offer(second_wg, end_time)[:2]
+    agent.withdraw()
+    assert agent.offer(second_wg, end_time)[:2] == offer
+
+
+def test_level_auctions_same_as_sequential(setup_executor: Executor | None):
+    p_rand = SimpleSynthetic(rand=231)
+    contractors = [p_rand.contractor(i) for i in range(10, 101, 30)]
+    scheduler_constructors = [HEFTScheduler, HEFTBetweenScheduler, TopologicalScheduler]
+
+    def create_manager(executor=None) -> Manager:
+        return Manager([Agent(f'Agent {i}', scheduler_constructors[i % len(scheduler_constructors)](), [contractor])
+                        for i, contractor in enumerate(contractors)], executor)
+
+    bg = generate_blocks(SyntheticBlockGraphType.PARALLEL, 6, [1, 1, 1], lambda x: (30, 40), 0.5, Random(231))
+    assert max(len(level) for level in bg.levels()) > 1
+
+    manager = create_manager()
+    expected = {}
+    for level in bg.levels():
+        for block in level:
+            parent_time = max((expected[parent.id][1] for parent in block.blocks_from), default=Time(0)) + 1
+            start_time, end_time, _, agent = manager.run_auction(block.wg, parent_time)
+            expected[block.id] = (start_time, end_time, agent.name)
+
+    scheduled_blocks = create_manager(setup_executor).manage_blocks(bg)
+
+    assert {block_id: (sblock.start_time, sblock.end_time, sblock.agent.name)
+            for block_id, sblock in scheduled_blocks.items()} == expected
+
+
+def test_level_auctions_reconcile_invalidated_offers(setup_executor: Executor | None):
+    def drivers_contractor(count: int) -> Contractor:
+        contractor_id = str(uuid4())
+        return Contractor(id=contractor_id, name=f'Contractor {count}',
+                          workers={'driver': Worker(str(uuid4()), 'driver', count, contractor_id=contractor_id)},
+                          equipments={})
+
+    def create_agents() -> list[Agent]:
+        return [Agent(f'Agent {i}', HEFTScheduler(), [contractor]) for i, contractor in enumerate(contractors)]
+
+    # the works of the blocks can't be executed by the first contractor at the same time
+    contractors = [drivers_contractor(15), drivers_contractor(10)]
+    wgs = [WorkGraph.from_nodes([GraphNode(WorkUnit(f'work {i}', f'Work {i}', [WorkerReq('driver', Time(600), 10, 15)]),
+                                           [])])
+           for i in range(2)]
+    parent_times = [Time(0)] * len(wgs)
+
+    # the offers against the agents' state before the level
+    level_offers = []
+    for agent in create_agents():
+        level_offers.append([agent.offer(wg, parent_time)[:2] for wg, parent_time in zip(wgs, parent_times)])
+        agent.withdraw()
+
+    manager = Manager(create_agents())
+    expected = [(start_time, end_time, agent.name)
+                for start_time, end_time, _, agent in (manager.run_auction(wg, parent_time)
+                                                       for wg, parent_time in zip(wgs, parent_times))]
+
+    auctions = Manager(create_agents(), setup_executor).run_level_auctions([BlockNode(wg) for wg in wgs],
+                                                                            parent_times)
+
+    assert [(start_time, end_time, agent.name) for start_time, end_time, _, agent in auctions] == expected
+    # the best offer for the second block is invalidated by the first one
+    assert level_offers[0][1][1] < level_offers[1][1][1]
+    assert [agent_name for _, _, agent_name in expected] == ['Agent 0', 'Agent 1']
+
+
+def test_neural_manager_predict_blocks_same_as_per_sample():
+    torch.manual_seed(231)
+    p_rand = SimpleSynthetic(rand=231)
+    algorithms = [HEFTScheduler(), HEFTBetweenScheduler()]
+    agents = [Agent(f'Agent {i}', algorithm, [p_rand.contractor(10)]) for i, algorithm in enumerate(algorithms)]
+    blocks = generate_blocks(SyntheticBlockGraphType.PARALLEL, 6, [1, 1, 1], lambda x: (10, 20), 0.5,
+                             Random(231)).toposort()
+    encodings = [torch.rand(13) for _ in blocks]
+
+    def create_trainer(out_size: int, task_type: NeuralNetType) -> NeuralNetTrainer:
+        net = NeuralNet(13, 15, 6, out_size, task_type)
+        return NeuralNetTrainer(net, None, torch.optim.Adam(net.parameters()), None, 1)
+
+    algo_trainer = create_trainer(2, NeuralNetType.CLASSIFICATION)
+    contractor_trainer = create_trainer(6, NeuralNetType.REGRESSION)
+    manager = NeuralManager(agents, algo_trainer, contractor_trainer, algorithms, blocks, encodings)
+
+    predictions = manager.predict_blocks()
+    probabilities = algo_trainer.predict_proba(torch.stack(encodings))
+
+    for block, encoding, block_probabilities in zip(blocks, encodings, probabilities):
+        algorithm, contractor = predictions[block.id]
+        assert algorithm == algo_trainer.predict([encoding])[0]
+        assert contractor == pytest.approx(contractor_trainer.predict([encoding])[0], abs=1e-6)
+        # the batched outputs are the same as the outputs of the networks on the single samples
+        with torch.no_grad():
+            assert block_probabilities == pytest.approx(algo_trainer.model(encoding).numpy(), abs=1e-6)
+            assert contractor == pytest.approx(contractor_trainer.model(encoding).numpy(), abs=1e-6)
@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sampo.scheduler.heft.base import HEFTScheduler
+from sampo.scheduler.utils.multi_contractor import run_contractor_search
+from sampo.schemas.time import Time
+
+
+def test_contractor_search_runs_once_per_contractor(setup_scheduler_parameters):
+    _, contractors, _ = setup_scheduler_parameters
+    calls = []
+
+    def runner(contractor):
+        calls.append(contractor.id)
+        return Time(0), Time(len(calls)), []
+
+    _, finish_time, best_contractor, _ = run_contractor_search(contractors, runner)
+
+    assert calls == [contractor.id for contractor in contractors]
+    assert best_contractor is contractors[0]
+    assert finish_time == Time(1)
+
+
+def test_concurrent_contractor_search(setup_scheduler_parameters):
+    wg, contractors, landscape = setup_scheduler_parameters
+    scheduler = HEFTScheduler()
+    schedule = scheduler.schedule(wg, contractors, landscape=landscape)[0]
+
+    with ThreadPoolExecutor(4) as executor:
+        scheduler.contractor_search_executor = executor
+        concurrent_schedule = scheduler.schedule(wg, contractors, landscape=landscape)[0]
+
+    assert concurrent_schedule.execution_time == schedule.execution_time
+    assert [(work.id, work.start_time, work.contractor) for work in concurrent_schedule.works] == \
+           [(work.id, work.start_time, work.contractor) for work in schedule.works]
@@ -0,0 +1,41 @@
+import numpy as np
+
+from sampo.scheduler.resource import CoordinateDescentResourceOptimizer, FullScanResourceOptimizer
+from sampo.scheduler.resource.base import memoize_finish_time
+from sampo.schemas.resources import Worker
+from sampo.schemas.time import Time
+from sampo.utilities.base_opt import dichotomy_int
+
+
+def finish_time_function(calls: list[tuple[int, ...]]):
+    def get_finish_time(worker_team: list[Worker]) -> Time:
+        counts = tuple(worker.count for worker in worker_team)
+        calls.append(counts)
+        return Time(100 + (counts[0] - 7) ** 2 + (counts[1] - 3) ** 2)
+
+    return get_finish_time
+
+
+def test_memoize_finish_time():
+    calls = []
+    get_finish_time = memoize_finish_time(finish_time_function(calls))
+
+    first = get_finish_time([Worker('1', 'driver', 5), Worker('2', 'fitter', 1)])
+    second = get_finish_time([Worker('3', 'driver', 5), Worker('4', 'fitter', 1)])
+    other = get_finish_time([Worker('1', 'driver', 7), Worker('2', 'fitter', 3)])
+
+    assert first == second == Time(108) and other == Time(100)
+    assert calls == [(5, 1), (7, 3)]
+
+
+def test_resource_optimizers_evaluate_each_team_once():
+    # the teams found by the optimizers without memoization
+    for optimizer, expected_team in ((FullScanResourceOptimizer(), [11, 11]),
+                                     (CoordinateDescentResourceOptimizer(dichotomy_int), [7, 3])):
+        calls = []
+        worker_team = [Worker('1', 'driver', 0), Worker('2', 'fitter', 0)]
+        optimizer.optimize_resources({}, worker_team, None, np.array([1, 1]), np.array([20, 20]),
+                                     finish_time_function(calls))
+
+        assert len(calls) == len(set(calls))
+        assert [worker.count for worker in worker_team] == expected_team
@@ -114,3 +114,31 @@ def test_lexicographic_genetic_deadline_planning(setup_scheduler_parameters):
     print(f'\tLexicographic genetic: time = {time_lexicographic}, ' +
           f'peak = {resources_peaks_sum(schedule)}')
     print()
+
+
+def test_k_ary_search_matches_binary(setup_scheduler_parameters):
+    setup_wg, setup_contractors, setup_landscape = setup_scheduler_parameters
+
+    deadline = Time(5000)
+    execution_times = []
+    for arity in (2, 4):
+        base_scheduler = HEFTScheduler()
+        calls = []
+
+        def prioritization(*args, base_prioritization=base_scheduler.prioritization):
+            calls.append(args)
+            return base_prioritization(*args)
+
+        base_scheduler.prioritization = prioritization
+        scheduler = AverageBinarySearchResourceOptimizingScheduler(base_scheduler, arity=arity)
+        (schedule, _, _, _), _ = scheduler.schedule_with_cache(setup_wg, setup_contractors, deadline,
+                                                               landscape=setup_landscape)
+        assert base_scheduler.prioritization is prioritization
+        # the graph is prioritized once during the search
+        assert len(calls) == 1
+        if schedule is None:
+            pytest.skip("Given contractors can't satisfy given work graph")
+        execution_times.append(schedule.execution_time)
+
+    assert execution_times[0] == execution_times[1]
+
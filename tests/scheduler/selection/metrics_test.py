@@ -0,0 +1,128 @@
+from collections import defaultdict
+from math import ceil
+from random import Random
+
+import numpy as np
+import pytest
+
+# the selection package imports the neural networks on initialization
+pytest.importorskip('torch')
+
+from sampo.scheduler.selection.metrics import metric_resource_constrainedness, metric_graph_parallelism_degree, \
+    metric_longest_path, metric_relative_max_children, metric_average_resource_usage, metric_relative_max_parents
+from sampo.schemas.graph import WorkGraph, GraphNode
+from sampo.schemas.requirements import WorkerReq
+from sampo.schemas.time import Time
+from sampo.schemas.works import WorkUnit
+
+
+# previous implementations of the metrics, they are used as a reference
+# (with the fixed types, the previous ones compared nodes with 0 and divided by Time)
+
+def loop_resource_constrainedness(wg: WorkGraph) -> list[float]:
+    resource_dict = defaultdict(lambda: [0, 0])
+
+    for node in wg.nodes:
+        for req in node.work_unit.worker_reqs:
+            resource_dict[req.kind][0] += 1
+            resource_dict[req.kind][1] += req.volume.value if isinstance(req.volume, Time) else req.volume
+
+    return [value[0] / value[1] for name, value in resource_dict.items()]
+
+
+def loop_parallelism_degree(wg: WorkGraph) -> list[float]:
+    batches = 8
+    parallelism_degree = []
+    node_count = wg.vertex_count
+
+    stack = [wg.start]
+    while stack:
+        tmp_stack = set()
+        parallelism_coef = 0
+
+        for i in range(len(stack)):
+            if stack[i] is None:
+                continue
+            for j in range(i + 1, len(stack)):
+                if stack[j] is None:
+                    continue
+                if stack[j] in stack[i].children:
+                    stack[j] = None
+
+        for node in stack:
+            if node is None:
+                continue
+            parallelism_coef += 1
+            for child in node.children:
+                tmp_stack.add(child)
+        parallelism_degree.append(parallelism_coef / node_count)
+        stack = list(tmp_stack)
+
+    step = ceil(len(parallelism_degree) / batches)
+    aggregated_degree = [0] * batches
+    for i in range(0, len(parallelism_degree), step):
+        aggregated_degree[i // step] = np.mean(parallelism_degree[i:(i + step)])
+
+    return aggregated_degree
+
+
+def loop_longest_path(wg: WorkGraph) -> int:
+    dist = {node.id: 0 for node in wg.nodes}
+    for node in wg.nodes:
+        for child in node.children:
+            dist[child.id] = max(dist[child.id], dist[node.id] + 1)
+    return max(dist.values())
+
+
+def layered_wg(rand: Random, levels: int, max_width: int) -> WorkGraph:
+    """
+    Builds the graph, which edges connect only the adjacent levels, so each node has the only depth
+    and the previous implementation of the parallelism degree doesn't depend on the nodes' order
+    """
+    kinds = ['driver', 'fitter', 'handyman']
+    previous = []
+    for level in range(levels):
+        current = []
+        for i in range(rand.randint(1, max_width)):
+            reqs = [WorkerReq(kind, Time(rand.randint(1, 50)), 1, rand.randint(1, 10))
+                    for kind in rand.sample(kinds, rand.randint(1, len(kinds)))]
+            parents = rand.sample(previous, rand.randint(1, len(previous))) if previous else []
+            current.append(GraphNode(WorkUnit(f'{level}_{i}', f'Work {level}_{i}', reqs), parents))
+        # each node of the previous level should have a child to keep the finish at the last level
+        for node in previous:
+            if not node.children:
+                rand.choice(current).add_parents([node])
+        previous = current
+    return WorkGraph.from_nodes([node for node in _collect(previous)])
+
+
+def _collect(last_level: list[GraphNode]) -> list[GraphNode]:
+    nodes = {}
+    stack = list(last_level)
+    while stack:
+        node = stack.pop()
+        if node.id not in nodes:
+            nodes[node.id] = node
+            stack.extend(node.parents)
+    return list(nodes.values())
+
+
+def test_metrics_same_as_loops(setup_wg: WorkGraph):
+    assert metric_resource_constrainedness(setup_wg) == pytest.approx(loop_resource_constrainedness(setup_wg))
+    assert metric_longest_path(setup_wg) == loop_longest_path(setup_wg)
+    assert metric_relative_max_children(setup_wg) == \
+           max(len(node.children) for node in setup_wg.nodes if node.children) / setup_wg.vertex_count
+    assert metric_relative_max_parents(setup_wg) == \
+           max(len(node.parents) for node in setup_wg.nodes if node.parents) / setup_wg.vertex_count
+    assert metric_average_resource_usage(setup_wg) == pytest.approx(
+        sum(sum((req.min_count + req.max_count) / 2 for req in node.work_unit.worker_reqs)
+            for node in setup_wg.nodes) / setup_wg.vertex_count)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('levels', [3, 10, 30])
+def test_parallelism_degree_same_as_loop(seed: int, levels: int):
+    wg = layered_wg(Random(seed), levels, 12)
+
+    assert metric_graph_parallelism_degree(wg) == pytest.approx(loop_parallelism_degree(wg))
+    assert metric_longest_path(wg) == levels + 1
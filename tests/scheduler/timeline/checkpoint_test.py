@@ -0,0 +1,62 @@
+import pickle
+
+import pytest
+from sortedcontainers import SortedList
+
+from sampo.scheduler.heft.base import HEFTScheduler
+from sampo.scheduler.timeline.just_in_time_timeline import JustInTimeTimeline
+from sampo.scheduler.timeline.momentum_timeline import MomentumTimeline
+from sampo.scheduler.utils import get_worker_contractor_pool
+from sampo.schemas.types import ScheduleEvent
+
+
+def _freeze(obj):
+    if isinstance(obj, ScheduleEvent):
+        return obj.seq_id, obj.event_type, obj.time, obj.available_workers_count
+    if isinstance(obj, dict):
+        return {key: _freeze(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple, SortedList)):
+        return [_freeze(value) for value in obj]
+    return obj
+
+
+def _state(timeline):
+    return (_freeze(timeline._timeline),
+            _freeze(timeline.zone_timeline._timeline),
+            getattr(timeline, '_task_index', None))
+
+
+@pytest.mark.parametrize('timeline_type', [MomentumTimeline, JustInTimeTimeline])
+def test_rollback_restores_timeline(setup_scheduler_parameters, timeline_type):
+    wg, contractors, landscape = setup_scheduler_parameters
+    scheduler = HEFTScheduler(timeline_type=timeline_type)
+    timeline = timeline_type(get_worker_contractor_pool(contractors), landscape)
+
+    scheduler.schedule_with_cache(wg, contractors, timeline=timeline, landscape=landscape)
+    state = _state(timeline)
+
+    token = timeline.checkpoint()
+    inner_token = timeline.checkpoint()
+    scheduler.schedule_with_cache(wg, contractors, timeline=timeline, landscape=landscape)
+    timeline.commit(inner_token)
+    scheduler.schedule_with_cache(wg, contractors, timeline=timeline, landscape=landscape)
+    assert _state(timeline) != state
+
+    timeline.rollback(token)
+    assert _state(timeline) == state
+    assert timeline._journal is None
+
+
+@pytest.mark.parametrize('timeline_type', [MomentumTimeline, JustInTimeTimeline])
+def test_copy_drops_checkpoints(setup_scheduler_parameters, timeline_type):
+    wg, contractors, landscape = setup_scheduler_parameters
+    scheduler = HEFTScheduler(timeline_type=timeline_type)
+    timeline = timeline_type(get_worker_contractor_pool(contractors), landscape)
+
+    token = timeline.checkpoint()
+    scheduler.schedule_with_cache(wg, contractors, timeline=timeline, landscape=landscape)
+    copied = pickle.loads(pickle.dumps(timeline))
+    timeline.commit(token)
+
+    assert copied._journal is None and copied._open_checkpoints == 0
+    assert _state(copied) == _state(timeline)
@@ -0,0 +1,43 @@
+import numpy as np
+
+from sampo.schemas.columnar import dump_wg, load_wg, dump_contractors, load_contractors, dump_schedule, \
+    load_schedule, open_columnar
+from sampo.schemas.graph import WorkGraph
+
+
+def test_work_graph_round_trip(setup_wg: WorkGraph, tmp_path):
+    dump_wg(setup_wg, str(tmp_path), 'wg')
+    loaded = load_wg(str(tmp_path), 'wg')
+
+    assert loaded._serialize() == setup_wg._serialize()
+    assert [node.id for node in loaded.nodes] == [node.id for node in setup_wg.nodes]
+
+
+def test_work_graph_lazy_columns(setup_wg: WorkGraph, tmp_path):
+    dump_wg(setup_wg, str(tmp_path), 'wg')
+    store = open_columnar(str(tmp_path), 'wg')
+
+    volumes = store['volume']
+    assert isinstance(volumes, np.memmap)
+    assert volumes.tolist() == [node.work_unit.volume for node in setup_wg.nodes]
+    assert store.str_column('id') == [node.id for node in setup_wg.nodes]
+
+
+def test_contractors_round_trip(setup_scheduler_parameters, tmp_path):
+    _, contractors, _ = setup_scheduler_parameters
+    dump_contractors(contractors, str(tmp_path), 'contractors')
+    loaded = load_contractors(str(tmp_path), 'contractors', mmap=False)
+
+    assert [c._serialize() for c in loaded] == [c._serialize() for c in contractors]
+    for contractor, loaded_contractor in zip(contractors, loaded):
+        for name, worker in contractor.workers.items():
+            assert loaded_contractor.workers[name].productivity.mean == worker.productivity.mean
+
+
+def test_schedule_round_trip(setup_schedule, tmp_path):
+    schedule, _, _ = setup_schedule
+    dump_schedule(schedule, str(tmp_path), 'schedule')
+    loaded = load_schedule(str(tmp_path), 'schedule')
+
+    assert loaded._serialize() == schedule._serialize()
+    assert loaded.execution_time == schedule.execution_time
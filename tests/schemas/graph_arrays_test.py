@@ -0,0 +1,82 @@
+from copy import deepcopy
+
+from sampo.scheduler.utils import get_worker_contractor_pool
+from sampo.schemas.graph import WorkGraph
+from sampo.schemas.graph_arrays import CAPABILITIES_CACHE_SIZE
+
+
+def test_arrays_match_nodes(setup_wg: WorkGraph):
+    arrays = setup_wg.arrays
+
+    assert arrays is setup_wg.arrays
+    assert arrays.vertex_count == setup_wg.vertex_count
+
+    for i, node in enumerate(setup_wg.nodes):
+        assert arrays.id2index[node.id] == i
+        assert set(setup_wg.nodes[p].id for p in arrays.parents_of(i)) == set(p.id for p in node.parents)
+        assert set(setup_wg.nodes[c].id for c in arrays.children_of(i)) == set(c.id for c in node.children)
+        head = setup_wg.nodes[arrays.chain_ids[i]]
+        assert node in head.get_inseparable_chain_with_self()
+
+        for req in node.work_unit.worker_reqs:
+            kind = arrays.kind2index[req.kind]
+            assert arrays.req_min[i, kind] == req.min_count
+            assert arrays.req_max[i, kind] == req.max_count
+
+
+def test_head_order_is_topological(setup_wg: WorkGraph):
+    arrays = setup_wg.arrays
+
+    for pos in range(len(arrays.head_order)):
+        assert (arrays.head_parents_of(pos) < pos).all()
+        assert (arrays.head_children_of(pos) > pos).all()
+
+
+def test_arrays_dropped_on_reinit(setup_wg: WorkGraph):
+    arrays = setup_wg.arrays
+    setup_wg.reinit()
+    assert setup_wg.arrays is not arrays
+
+
+def test_capacity_matrix(setup_scheduler_parameters):
+    wg, contractors, _ = setup_scheduler_parameters
+    worker_pool = get_worker_contractor_pool(contractors)
+
+    capacity = wg.arrays.capacity_matrix(contractors, worker_pool.keys())
+
+    assert capacity.shape == (len(contractors), len(worker_pool))
+    for i, contractor in enumerate(contractors):
+        for j, kind in enumerate(worker_pool.keys()):
+            assert capacity[i, j] == contractor.workers[kind].count
+
+
+def test_capability_matrix(setup_scheduler_parameters):
+    wg, contractors, _ = setup_scheduler_parameters
+
+    capable = wg.arrays.capability_matrix(contractors)
+
+    assert capable is wg.arrays.capability_matrix(contractors)
+    assert capable.shape == (wg.vertex_count, len(contractors))
+    for i, node in enumerate(wg.nodes):
+        for j, contractor in enumerate(contractors):
+            expected = all(req.kind in contractor.workers and contractor.workers[req.kind].count >= req.min_count
+                           for req in node.work_unit.worker_reqs)
+            assert capable[i, j] == expected
+
+
+def test_capability_matrices_are_bounded(setup_scheduler_parameters):
+    wg, contractors, _ = setup_scheduler_parameters
+    capable = wg.arrays.capability_matrix(contractors)
+
+    other_contractors = [deepcopy(contractors) for _ in range(CAPABILITIES_CACHE_SIZE)]
+    for i, others in enumerate(other_contractors):
+        others[0].id = f'other {i}'
+    other_capable = wg.arrays.capability_matrix(other_contractors[0])
+
+    for others in other_contractors[1:]:
+        wg.arrays.capability_matrix(others)
+        # the recently used matrix is kept
+        assert wg.arrays.capability_matrix(contractors) is capable
+
+    # the least recently used matrix is evicted and computed again
+    assert wg.arrays.capability_matrix(other_contractors[0]) is not other_capable
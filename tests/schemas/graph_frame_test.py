@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from sampo.schemas.graph import WorkGraph, FRAME_COLUMNS, FRAME_REQ_COLUMNS
+from sampo.schemas.time import Time
+
+
+def test_to_frame_content(setup_wg: WorkGraph):
+    frame = setup_wg.to_frame(save_req=True)
+
+    assert list(frame.columns) == FRAME_COLUMNS + FRAME_REQ_COLUMNS
+    service_ids = {setup_wg.start.id, setup_wg.finish.id}
+    nodes = [node for node in setup_wg.nodes if node.id not in service_ids]
+    assert len(frame) == len(nodes)
+
+    for node, (_, row) in zip(nodes, frame.iterrows()):
+        serialized = node.dumpd()
+        assert row['activity_id'] == serialized['work_unit']['id']
+        assert row['volume'] == serialized['work_unit']['volume']
+        parents = [edge for edge in serialized['parent_edges'] if edge[0] not in service_ids]
+        assert row['predecessor_ids'] == ','.join(str(edge[0]) for edge in parents)
+        assert row['lags'] == ','.join(str(edge[1]) for edge in parents)
+        assert row['connection_types'] == ','.join(str(edge[2]) for edge in parents)
+        assert row['req_volume'] == {req.kind: req.volume.value if isinstance(req.volume, Time) else req.volume
+                                     for req in node.work_unit.worker_reqs}
+
+
+def test_to_frame_columns_subset(setup_wg: WorkGraph):
+    frame = setup_wg.to_frame(save_req=True)
+    columns = ['lags', 'activity_id', 'min_req']
+
+    pd.testing.assert_frame_equal(setup_wg.to_frame(columns=columns), frame[columns])
+
+    with pytest.raises(ValueError):
+        setup_wg.to_frame(columns=['unknown'])
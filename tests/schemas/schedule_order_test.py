@@ -0,0 +1,64 @@
+from copy import copy
+from itertools import groupby
+from random import Random
+
+import pytest
+
+from sampo.generator.base import SimpleSynthetic
+from sampo.scheduler.heft.base import HEFTScheduler
+from sampo.schemas.graph import WorkGraph
+from sampo.schemas.schedule import order_nodes_by_start_time
+from sampo.schemas.scheduled_work import ScheduledWork
+from sampo.schemas.time import Time
+
+
+def quadratic_order(works: list[ScheduledWork], wg: WorkGraph) -> list[str]:
+    # previous implementation of the ordering, it's used as a reference
+    res = []
+    for _, group in groupby(sorted(works, key=lambda item: item.start_time), key=lambda item: item.start_time):
+        cur_not_added = {wg[work.id] for work in group}
+        while cur_not_added:
+            for node in set(cur_not_added):
+                if any(parent in cur_not_added for parent in node.parents):
+                    continue
+                res.append(node.id)
+                cur_not_added.remove(node)
+    return res
+
+
+def coarsen(works: list[ScheduledWork], step: int) -> list[ScheduledWork]:
+    # rounding down keeps the precedence and gives a lot of works with equal start times
+    coarse_works = []
+    for work in works:
+        work = copy(work)
+        start, finish = work.start_end_time
+        work.start_end_time = Time(start.value // step * step), Time(finish.value // step * step)
+        coarse_works.append(work)
+    return coarse_works
+
+
+def groups(order: list[str], works: list[ScheduledWork]) -> list[tuple[Time, set[str]]]:
+    start_times = {work.id: work.start_time for work in works}
+    return [(start, set(ids)) for start, ids in groupby(order, key=lambda work_id: start_times[work_id])]
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('step', [1, 5, 20])
+def test_order_matches_quadratic(seed: int, step: int):
+    rand = Random(seed)
+    ss = SimpleSynthetic(rand)
+    wg = ss.work_graph(top_border=rand.randint(50, 150))
+    schedule = HEFTScheduler().schedule(wg, [ss.contractor(10)])[0]
+    works = coarsen(list(schedule.works), step)
+
+    order = order_nodes_by_start_time(works, wg)
+
+    assert sorted(order) == sorted(work.id for work in works)
+    assert groups(order, works) == groups(quadratic_order(works, wg), works)
+
+    position = {work_id: i for i, work_id in enumerate(order)}
+    start_times = {work.id: work.start_time for work in works}
+    for work_id in order:
+        for parent in wg[work_id].parents:
+            if start_times[parent.id] == start_times[work_id]:
+                assert position[parent.id] < position[work_id]
@@ -1,6 +1,8 @@
 from random import Random
 from typing import Iterable
 
+import pytest
+
 from sampo.generator.base import SimpleSynthetic
 from sampo.generator.pipeline import SyntheticGraphType
 from sampo.scheduler.genetic.base import GeneticScheduler
@@ -27,6 +29,8 @@ def test_one_auction():
         wg = p_rand.work_graph(top_border=200)
         start_time, end_time, schedule, agent = manager.run_auction(wg)
 
+        assert schedule.execution_time == end_time
+        assert len(manager.auction_times) == i + 1
         print(f'Round {i}: wins {agent} with submitted time {end_time - start_time}')
 
 
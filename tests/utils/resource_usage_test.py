@@ -0,0 +1,28 @@
+import numpy as np
+
+from sampo.utilities.resource_usage import get_total_resources_usage, get_resources_usage_profile, \
+    resources_peaks_sum, resources_sum, resources_costs_sum
+
+
+def test_resources_usage_profile(setup_schedule):
+    schedule, _, _ = setup_schedule
+
+    profile = get_resources_usage_profile(schedule)
+    assert profile is get_resources_usage_profile(schedule)
+
+    usage = get_total_resources_usage(schedule)
+    expected_peaks = 0
+    for name, row in profile.kinds.items():
+        expected = np.zeros(len(profile.points), dtype=np.int64)
+        for work in schedule.works:
+            for worker in work.workers:
+                if worker.name == name:
+                    expected[(work.start_time <= profile.points) & (profile.points < work.finish_time)] += worker.count
+        assert np.array_equal(usage[name], expected)
+        expected_peaks += expected.max()
+
+    assert resources_peaks_sum(schedule) == expected_peaks
+    assert resources_sum(schedule) == sum(worker.count * work.duration.value
+                                          for work in schedule.works for worker in work.workers)
+    assert np.isclose(resources_costs_sum(schedule), sum(worker.get_cost() * work.duration.value
+                                                         for work in schedule.works for worker in work.workers))
@@ -3,13 +3,17 @@ from enum import Enum
 from operator import attrgetter
 from typing import Optional
 
+import pytest
+
 from sampo.scheduler.utils import get_worker_contractor_pool, WorkerContractorPool
 from sampo.schemas.graph import WorkGraph
 from sampo.schemas.schedule import Schedule
 from sampo.utilities.collections_util import build_index
+from sampo.utilities.resource_usage import get_total_resources_usage
 from sampo.utilities.validation import _check_all_tasks_scheduled, _check_parent_dependencies, \
     _check_all_workers_correspond_to_worker_reqs, \
-    _check_all_allocated_workers_do_not_exceed_capacity_of_contractors
+    _check_all_allocated_workers_do_not_exceed_capacity_of_contractors, \
+    check_all_allocated_workers_do_not_exceed_capacity_of_contractors, _replay_capacity
 
 
 class BreakType(Enum):
@@ -82,6 +86,28 @@ def test_check_resources_validity_wrong(setup_default_schedules):
                 assert thrown
 
 
+def test_check_capacity_same_as_replay(setup_schedule):
+    schedule, _, _ = setup_schedule
+    contractor_ids = {work.workers[0].contractor_id for work in schedule.works if work.workers}
+    if len(contractor_ids) != 1:
+        pytest.skip('Usage of several contractors')
+    contractor_id = contractor_ids.pop()
+    peaks = {name: int(usage.max()) for name, usage in get_total_resources_usage(schedule).items()}
+
+    # the pool of peaks is enough and each decreased pool isn't
+    pools = [peaks] + [{**peaks, name: peak - 1} for name, peak in peaks.items() if peak > 0]
+    for pool in pools:
+        results = []
+        for check in (check_all_allocated_workers_do_not_exceed_capacity_of_contractors, _replay_capacity):
+            cur_pool = {contractor_id: dict(pool)}
+            try:
+                check(schedule, {contractor_id: dict(pool)}, cur_pool)
+                results.append((None, cur_pool))
+            except AssertionError as e:
+                results.append((str(e), cur_pool))
+        assert results[0] == results[1]
+
+
 def break_schedule(break_type: BreakType, schedule: Schedule, wg: WorkGraph,
                    agents: Optional[WorkerContractorPool] = None) -> Schedule:
     broken = deepcopy(schedule.to_schedule_work_dict)